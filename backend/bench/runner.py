@@ -0,0 +1,362 @@
+# backend/bench/runner.py
+"""
+Benchmark der Statistik- und Detection-Endpoints gegen die konfigurierte Datenbank.
+
+Die Router laufen in-process (httpx über ASGI, ohne Kamera-Worker und Modelle),
+gemessen wird also Routing + Abfragen + Serialisierung, kein Netzwerk. Pro
+Szenario:
+
+- Latenz (p50/p90/p95/p99/Mittel/Max in ms) über --requests Aufrufe nach
+  --warmup Aufwärmrunden; der Antwort-Cache wird vor jedem Aufruf geleert
+  (--warm misst stattdessen den Cache-Pfad)
+- alle SQL-Statements eines Aufrufs (Listener an beiden Engines) und dazu
+  EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) mit denselben Parametern
+
+Der JSON-Report enthält außerdem Tabellengrößen, Indexe und die Alembic-
+Revision, damit Läufe vor/nach Schema- oder Indexänderungen vergleichbar sind:
+
+    python -m backend.bench.runner -o before.json
+    alembic upgrade head
+    python -m backend.bench.runner -o after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from backend.db_async import async_engine
+from backend.db_settings import engine
+from backend.routers import detections, stats
+from backend.services.camera_cache import camera_cache
+from backend.services.response_cache import response_cache
+
+STATS = "/api/detection-stats"
+PERCENTILES = (50, 90, 95, 99)
+_EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+Params = Union[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: str
+    params: Params = field(default_factory=dict)   # oder fn(context) → params
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("stats.summary", STATS),
+    Scenario("stats.summary_alias", f"{STATS}/summary"),
+    Scenario("stats.classes", f"{STATS}/classes", {"model": "all"}),
+    Scenario("stats.classes_model", f"{STATS}/classes", {"model": "objectDetection"}),
+    Scenario("stats.daily", f"{STATS}/daily"),
+    Scenario("stats.daily_class", f"{STATS}/daily", lambda ctx: {"model": ctx["model"], "class_name": ctx["class_name"]}),
+    Scenario("stats.weekly", f"{STATS}/weekly"),
+    Scenario("stats.weekly_class", f"{STATS}/weekly", lambda ctx: {"model": ctx["model"], "class_name": ctx["class_name"]}),
+    Scenario("stats.top_classes", f"{STATS}/top-classes"),
+    Scenario("stats.top_classes_30d", f"{STATS}/top-classes", {"days": 30}),
+    Scenario("stats.camera_performance", f"{STATS}/camera-performance"),
+    Scenario("stats.hourly_pattern", f"{STATS}/hourly-pattern"),
+    Scenario("stats.hourly_pattern_camera", f"{STATS}/hourly-pattern", lambda ctx: {"camera_id": ctx["camera_id"]}),
+    Scenario("stats.weekday_pattern", f"{STATS}/weekday-pattern"),
+    Scenario("stats.real_time", f"{STATS}/real-time"),
+    Scenario("stats.real_time_seconds", f"{STATS}/real-time/seconds"),
+    Scenario("stats.real_time_breakdown", f"{STATS}/real-time/breakdown"),
+    Scenario("stats.confidence", f"{STATS}/confidence"),
+    Scenario("detections.latest", "/api/detection"),
+    Scenario("detections.latest_1000", "/api/detection", {"limit": 1000}),
+    Scenario("detections.model", "/api/detection", lambda ctx: {"model": ctx["model"]}),
+    Scenario("detections.camera", "/api/detection", lambda ctx: {"camera_id": ctx["camera_id"]}),
+    Scenario("detections.offset_10k", "/api/detection", {"offset": 10_000}),
+    Scenario("detections.cursor_10k", "/api/detection", lambda ctx: {"before": ctx["cursor_10k"]}),
+    Scenario("detections.since_unchanged", "/api/detection",
+             lambda ctx: {"since_id": ctx["since_id"], "format": "columns"}),
+    Scenario("detections.since_backlog_10k", "/api/detection",
+             lambda ctx: {"since_id": max(0, ctx["since_id"] - 10_000), "format": "columns"}),
+]
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(stats.router, prefix=STATS)
+    app.include_router(detections.router, prefix="/api")
+    return app
+
+def uncovered_routes(app: FastAPI) -> List[str]:
+    """GET-Routen der beiden Router ohne Szenario (Hinweis, wenn neue Endpoints dazukommen)."""
+    covered = {s.path for s in SCENARIOS}
+    return sorted(r.path for r in app.routes
+                  if "GET" in getattr(r, "methods", ()) and r.path.startswith("/api") and r.path not in covered)
+
+
+# ----------------------- Kontext / Metadaten -----------------------
+
+def build_context() -> Dict[str, Any]:
+    """Parameter für datenabhängige Szenarien: häufigste Kamera/Klasse, Cursor 10k Zeilen tief, höchste id."""
+    with engine.connect() as conn:
+        top = conn.execute(text(
+            "SELECT camera_id, model_type, class_name FROM detection_rollup_hour "
+            "GROUP BY 1, 2, 3 ORDER BY sum(count) DESC LIMIT 1")).first()
+        deep = conn.execute(text(
+            "SELECT timestamp, id FROM detection_events ORDER BY timestamp DESC, id DESC "
+            "OFFSET 10000 LIMIT 1")).first()
+        newest = conn.execute(text(
+            "SELECT timestamp, id FROM detection_events ORDER BY id DESC LIMIT 1")).first()
+    ctx = {"camera_id": 1, "model": "objectDetection", "class_name": "person", "cursor_10k": None,
+           "since_id": 0}
+    if top is not None:
+        ctx.update(camera_id=top[0], model=top[1] or "all", class_name=top[2] or "all")
+    if deep is not None:
+        ctx["cursor_10k"] = f"{detections.format_ts(deep[0])},{deep[1]}"
+    if newest is not None:
+        ctx["since_id"] = newest[1]
+    return ctx
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> Dict[str, Any]:
+    tables = ("detection_events", "detection_rollup_minute", "detection_rollup_hour", "detection_pattern_hour",
+              "cameras")
+    with engine.connect() as conn:
+        version = conn.execute(text("SHOW server_version")).scalar()
+        revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        sizes = {}
+        for table in tables:
+            # Partitionen mitzählen; Zeilen als Schätzung (reltuples), exaktes count(*) wäre bei 1B zu teuer
+            sizes[table] = dict(conn.execute(text(
+                "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint AS rows, "
+                "coalesce(sum(pg_total_relation_size(c.oid)), 0)::bigint AS bytes "
+                "FROM pg_class c WHERE c.oid = CAST(:t AS regclass) "
+                "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:t AS regclass))"
+            ), {"t": table}).one()._mapping)
+        indexes = {name: definition for name, definition in conn.execute(text(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = ANY(:t) ORDER BY 1"
+        ), {"t": list(tables)}).all()}
+    return {
+        "startedAt": datetime.now(timezone.utc).isoformat(),
+        "gitCommit": _git_commit(),
+        "alembicRevision": revision,
+        "serverVersion": version,
+        "tables": sizes,
+        "indexes": indexes,
+    }
+
+
+# ----------------------- SQL-Mitschnitt + EXPLAIN -----------------------
+
+class StatementCapture:
+    """Sammelt (Engine, SQL, Parameter) aller Statements, solange capturing() aktiv ist."""
+    def __init__(self, engines: Dict[str, Engine]):
+        self._active = False
+        self.statements: List[Tuple[str, str, Any]] = []
+        for name, eng in engines.items():
+            event.listen(eng, "before_cursor_execute", self._listener(name))
+
+    def _listener(self, name: str):
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            if self._active and not executemany and statement.lstrip()[:6].upper() == "SELECT" \
+                    and "FROM" in statement.upper():
+                self.statements.append((name, statement, parameters))
+        return on_execute
+
+    @contextmanager
+    def capturing(self) -> Iterator[List[Tuple[str, str, Any]]]:
+        self.statements, self._active = [], True
+        try:
+            yield self.statements
+        finally:
+            self._active = False
+
+
+def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+def summarize_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    root = plan["Plan"]
+    nodes = list(_walk(root))
+    scans = sorted({" ".join(filter(None, (n["Node Type"], n.get("Relation Name"), n.get("Index Name"))))
+                    for n in nodes if "Relation Name" in n})
+    return {
+        "planningMs": plan.get("Planning Time"),
+        "executionMs": plan.get("Execution Time"),
+        "rootNode": root["Node Type"],
+        "rows": root.get("Actual Rows"),
+        "sharedHit": root.get("Shared Hit Blocks"),
+        "sharedRead": root.get("Shared Read Blocks"),
+        "scans": scans,
+    }
+
+async def explain(statements: Sequence[Tuple[str, str, Any]], full: bool) -> List[Dict[str, Any]]:
+    out = []
+    for name, statement, parameters in statements:
+        try:
+            if name == "async":
+                async with async_engine.connect() as conn:
+                    result = await conn.exec_driver_sql(_EXPLAIN + statement, parameters)
+                    raw = result.scalar()
+            else:
+                with engine.connect() as conn:
+                    raw = conn.exec_driver_sql(_EXPLAIN + statement, parameters).scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            entry = {"sql": " ".join(statement.split()), **summarize_plan(plan)}
+            if full:
+                entry["plan"] = plan
+        except Exception as e:
+            entry = {"sql": " ".join(statement.split()), "error": str(e).splitlines()[0]}
+        out.append(entry)
+    return out
+
+
+# ----------------------- Messung -----------------------
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    arr = np.asarray(samples_ms)
+    out = {f"p{p}": round(float(np.percentile(arr, p)), 3) for p in PERCENTILES}
+    out.update(mean=round(float(arr.mean()), 3), max=round(float(arr.max()), 3), n=len(arr))
+    return out
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Dict[str, Any],
+                       capture: StatementCapture, requests: int, warmup: int, concurrency: int,
+                       warm: bool, full_plans: bool) -> Dict[str, Any]:
+    params = scenario.params(ctx) if callable(scenario.params) else scenario.params
+    if None in params.values():
+        return {"path": scenario.path, "params": params, "skipped": "no data for parameters"}
+
+    async def call() -> Tuple[float, int]:
+        if not warm:
+            response_cache.invalidate("stats")
+        t0 = time.perf_counter()
+        response = await client.get(scenario.path, params=params)
+        return (time.perf_counter() - t0) * 1000, response.status_code
+
+    for _ in range(warmup):
+        await call()
+
+    samples: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            ms, status = await call()
+            samples.append(ms)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - t0
+
+    # ein zusätzlicher Aufruf mit Mitschnitt (kalter Cache, damit die DB-Abfragen laufen)
+    with capture.capturing() as statements:
+        response_cache.invalidate("stats")
+        await client.get(scenario.path, params=params)
+    return {
+        "path": scenario.path,
+        "params": params,
+        "status": statuses,
+        "latencyMs": latency_summary(samples),
+        "throughputRps": round(len(samples) / wall, 1),
+        "queries": await explain(list(statements), full_plans),
+    }
+
+async def run(names: Optional[Sequence[str]], requests: int, warmup: int, concurrency: int,
+              warm: bool, full_plans: bool) -> Dict[str, Any]:
+    camera_cache.load()
+    app = build_app()
+    capture = StatementCapture({"sync": engine, "async": async_engine.sync_engine})
+    ctx = build_context()
+    report = {"environment": environment(), "settings": {
+        "requests": requests, "warmup": warmup, "concurrency": concurrency, "warm": warm}, "context": ctx,
+        "uncoveredRoutes": uncovered_routes(app), "scenarios": {}}
+    selected = [s for s in SCENARIOS if not names or any(s.name.startswith(n) for n in names)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in selected:
+            result = await run_scenario(client, scenario, ctx, capture, requests, warmup, concurrency,
+                                        warm, full_plans)
+            report["scenarios"][scenario.name] = result
+            print(_format_line(scenario.name, result), file=sys.stderr)
+    await async_engine.dispose()
+    return report
+
+
+# ----------------------- Ausgabe -----------------------
+
+def _format_line(name: str, result: Dict[str, Any]) -> str:
+    if "skipped" in result:
+        return f"{name:<32} skipped ({result['skipped']})"
+    lat = result["latencyMs"]
+    db_ms = sum(q.get("executionMs") or 0 for q in result["queries"])
+    return (f"{name:<32} p50 {lat['p50']:>9.2f}  p95 {lat['p95']:>9.2f}  p99 {lat['p99']:>9.2f} ms  "
+            f"{len(result['queries'])} queries, {db_ms:.2f} ms in DB")
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    """Tabelle p50/p95 vorher → nachher je Szenario."""
+    lines = [f"{'scenario':<32} {'p50 before':>11} {'p50 after':>10} {'Δ':>7}   {'p95 before':>11} {'p95 after':>10} {'Δ':>7}"]
+    for name, new in after["scenarios"].items():
+        old = before.get("scenarios", {}).get(name)
+        if not old or "latencyMs" not in old or "latencyMs" not in new:
+            continue
+        row = [f"{name:<32}"]
+        for p in ("p50", "p95"):
+            a, b = old["latencyMs"][p], new["latencyMs"][p]
+            row.append(f"{a:>11.2f} {b:>10.2f} {(b - a) / a * 100 if a else 0:>+6.0f}%")
+        lines.append("   ".join(row))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark stats/detection endpoints")
+    p.add_argument("scenarios", nargs="*", help="nur Szenarien mit diesem Präfix (z.B. stats.daily detections)")
+    p.add_argument("--requests", type=int, default=50)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--concurrency", type=int, default=1)
+    p.add_argument("--warm", action="store_true", help="Antwort-Cache nicht leeren")
+    p.add_argument("--full-plans", action="store_true", help="komplette EXPLAIN-Pläne in den Report")
+    p.add_argument("--compare", help="früheren Report zum Vergleich")
+    p.add_argument("--list", action="store_true", help="Szenarien auflisten")
+    p.add_argument("-o", "--output", help="Report als JSON (Standard: stdout)")
+    args = p.parse_args(argv)
+
+    if args.list:
+        for s in SCENARIOS:
+            print(f"{s.name:<32} {s.path}")
+        return 0
+    if engine.dialect.name != "postgresql":
+        p.error("the benchmark needs PostgreSQL (EXPLAIN ANALYZE)")
+
+    report = asyncio.run(run(args.scenarios, args.requests, args.warmup, args.concurrency,
+                             args.warm, args.full_plans))
+    data = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(data)
+    else:
+        print(data)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# backend/bench/synth.py
+"""
+Synthetische detection_events in realistischer Menge (10M … 1B Zeilen) für Benchmarks.
+
+Die Zeilen entstehen komplett im Server (INSERT … SELECT über generate_series,
+ein Statement pro Stunde) – über die Leitung geht nur das Statement, das ist
+schneller als COPY vom Client. Verteilung:
+
+- Tagesgang: Kosinus mit Spitze um --peak-hour (Ortszeit --tz), nachts
+  --night-ratio der Spitze, Wochenende × --weekend-factor, ±15 % Rauschen
+- Kameras: Zipf-verteilt (wenige sehr aktive, viele ruhige), als eigene
+  Kameras "synthetic-NNN" (stream_type "synthetic", werden nie gestartet)
+- Modelle/Klassen: gewichtete Listen (--models, --classes); pose → person
+- Zeitstempel innerhalb der Stunde aufsteigend wie beim echten Writer,
+  bbox/score/track_id gefüllt (gleiche Zeilenbreite wie im Betrieb)
+
+Fehlende Partitionen für den Zeitraum werden angelegt, danach werden Rollups
+und Tag × Stunde-Muster neu berechnet und ANALYZE ausgeführt. Achtung:
+DETECTION_RETENTION_DAYS gilt auch für diese Daten. Nur gegen eine
+lokale/Wegwerf-Datenbank laufen lassen.
+
+    python -m backend.bench.synth --events 50M --cameras 32 --days 90 --jobs 8
+    python -m backend.bench.synth --purge
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import text
+
+from backend.db_settings import engine
+from backend.services.keypoint_codec import encode_bbox_batch
+from backend.services.partitions import ensure_range, is_partitioned
+from backend.services.patterns import rebuild as rebuild_patterns
+from backend.services.rollups import backfill_rollups
+
+CAMERA_PREFIX = "synthetic-"
+DEFAULT_MODELS = "objectDetection:0.8,segmentation:0.15,pose:0.05"
+DEFAULT_CLASSES = ("person:0.55,car:0.18,bicycle:0.05,dog:0.05,truck:0.05,"
+                   "bus:0.03,motorcycle:0.03,cat:0.02,backpack:0.02,handbag:0.02")
+_BBOX_POOL = 512
+_ROWS_PER_TRACK = 25
+
+_INSERT = text("""
+INSERT INTO detection_events (model_type, timestamp, class_name, camera_id, camera_name, bbox, score, track_id)
+SELECT m.model,
+       :start + (g.i - 1 + g.r_ts) * (interval '1 hour' / :n),
+       CASE WHEN m.model = 'pose' THEN 'person'
+            ELSE (CAST(:classes AS text[]))[width_bucket(g.r_cls, CAST(:class_cum AS float8[]))] END,
+       (CAST(:camera_ids AS int[]))[c.i],
+       (CAST(:camera_names AS text[]))[c.i],
+       (CAST(:bboxes AS bytea[]))[1 + floor(g.r_box * :n_boxes)::int],
+       (0.25 + 0.75 * sqrt(g.r_score))::real,
+       :track_base + floor(g.r_track * :n_tracks)::int
+FROM (SELECT i, random() AS r_ts, random() AS r_cls, random() AS r_cam, random() AS r_model,
+             random() AS r_box, random() AS r_score, random() AS r_track
+      FROM generate_series(1, :n) AS i) g
+CROSS JOIN LATERAL (SELECT width_bucket(g.r_cam, CAST(:camera_cum AS float8[])) AS i) c
+CROSS JOIN LATERAL (SELECT (CAST(:models AS text[]))[width_bucket(g.r_model, CAST(:model_cum AS float8[]))]
+                    AS model) m
+""")
+
+
+def parse_count(value: str) -> int:
+    """'10M', '1B', '500k', '1_000_000' → int"""
+    value = value.strip().replace("_", "").lower()
+    factor = {"k": 10 ** 3, "m": 10 ** 6, "b": 10 ** 9, "g": 10 ** 9}.get(value[-1:], 1)
+    number = value[:-1] if factor > 1 else value
+    try:
+        return int(float(number) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a count: {value!r}")
+
+def parse_weights(value: str) -> List[Tuple[str, float]]:
+    """'a:0.7,b:0.3' → [(a, 0.7), (b, 0.3)] (Gewicht fehlt → 1)"""
+    out = []
+    for part in value.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name:
+            out.append((name, float(weight or 1)))
+    if not out:
+        raise argparse.ArgumentTypeError("empty weight list")
+    return out
+
+def _lower_bounds(weights: Sequence[float]) -> List[float]:
+    """Untere Klassengrenzen in [0, 1) für width_bucket (Bucket 1 … n)."""
+    total = float(sum(weights))
+    cum = np.cumsum([0.0] + [w / total for w in weights[:-1]])
+    return [float(x) for x in cum]
+
+
+# ----------------------- Verteilung -----------------------
+
+def hourly_counts(total: int, start: datetime, hours: int, tz: ZoneInfo, peak_hour: float,
+                  night_ratio: float, weekend_factor: float, rng: random.Random) -> np.ndarray:
+    """Events pro Stunde (Summe exakt total) nach Tagesgang, Wochentag und Rauschen."""
+    weights = np.empty(hours)
+    for h in range(hours):
+        local = (start + timedelta(hours=h)).astimezone(tz)
+        phase = 2 * math.pi * (local.hour + 0.5 - peak_hour) / 24
+        w = night_ratio + (1 - night_ratio) * (0.5 + 0.5 * math.cos(phase))
+        if local.weekday() >= 5:
+            w *= weekend_factor
+        weights[h] = w * rng.uniform(0.85, 1.15)
+    exact = total * weights / weights.sum()
+    counts = np.floor(exact).astype(np.int64)
+    # Rest nach größtem Bruchteil verteilen
+    rest = total - int(counts.sum())
+    if rest:
+        counts[np.argsort(counts - exact)[:rest]] += 1
+    return counts
+
+def _bbox_pool(rng: random.Random) -> List[bytes]:
+    boxes = []
+    for _ in range(_BBOX_POOL):
+        w, h = rng.uniform(0.03, 0.3), rng.uniform(0.05, 0.6)
+        boxes.append([rng.uniform(0, 1 - w), rng.uniform(0, 1 - h), w, h])
+    return encode_bbox_batch(boxes)
+
+
+# ----------------------- Datenbank -----------------------
+
+def ensure_cameras(count: int) -> Tuple[List[int], List[str]]:
+    """Kameras synthetic-001 … anlegen (vorhandene wiederverwenden)."""
+    names = [f"{CAMERA_PREFIX}{i:03d}" for i in range(1, count + 1)]
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO cameras (source_name, stream_type, stream, location, created_at) "
+            "SELECT name, 'synthetic', '', 'benchmark', now() FROM unnest(CAST(:names AS text[])) AS name "
+            "ON CONFLICT (source_name) DO NOTHING"
+        ), {"names": names})
+        ids = dict(conn.execute(text("SELECT source_name, id FROM cameras WHERE source_name = ANY(:names)"),
+                                {"names": names}).all())
+    return [ids[n] for n in names], names
+
+def ensure_partitions_for(start: datetime, end: datetime) -> None:
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            ensure_range(conn, start.date(), (end - timedelta(microseconds=1)).date())
+
+def _insert_hour(params: Dict) -> int:
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL synchronous_commit = off"))
+        conn.execute(text("SELECT setseed(:seed)"), {"seed": params.pop("seed")})
+        conn.execute(_INSERT, params)
+    return params["n"]
+
+def _rebuild_rollups(start: datetime, end: datetime, jobs: int) -> None:
+    days = []
+    day = start
+    while day < end:
+        days.append((day, min(day + timedelta(days=1), end)))
+        day += timedelta(days=1)
+
+    def run(span):
+        with engine.begin() as conn:
+            backfill_rollups(conn, *span)
+
+    with ThreadPoolExecutor(jobs) as pool:
+        list(pool.map(run, days))
+    with engine.begin() as conn:
+        rebuild_patterns(conn)
+
+def _analyze() -> None:
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("detection_events", "detection_rollup_minute", "detection_rollup_hour",
+                      "detection_pattern_hour", "cameras"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+
+def generate(events: int, cameras: int, days: int, end: datetime, tz: ZoneInfo, models, classes,
+             peak_hour: float, night_ratio: float, weekend_factor: float, zipf: float,
+             seed: int, jobs: int) -> None:
+    rng = random.Random(seed)
+    end = end.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    hours = days * 24
+    counts = hourly_counts(events, start, hours, tz, peak_hour, night_ratio, weekend_factor, rng)
+
+    camera_ids, camera_names = ensure_cameras(cameras)
+    ensure_partitions_for(start, end)
+
+    common = {
+        "models": [m for m, _ in models],
+        "model_cum": _lower_bounds([w for _, w in models]),
+        "classes": [c for c, _ in classes],
+        "class_cum": _lower_bounds([w for _, w in classes]),
+        "camera_ids": camera_ids,
+        "camera_names": camera_names,
+        "camera_cum": _lower_bounds([1 / (i + 1) ** zipf for i in range(cameras)]),
+        "bboxes": _bbox_pool(rng),
+        "n_boxes": _BBOX_POOL,
+    }
+    tasks = [
+        dict(common, start=start + timedelta(hours=h), n=int(n),
+             n_tracks=max(1, int(n) // _ROWS_PER_TRACK), track_base=(h * 100_000) % 2_000_000_000,
+             seed=((seed * 1_000_003 + h) % 2_000_000) / 1_000_000 - 1)
+        for h, n in enumerate(counts) if n
+    ]
+
+    print(f"inserting {events:,} events, {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M} UTC, "
+          f"{cameras} cameras, {len(tasks)} hourly statements, {jobs} jobs", file=sys.stderr)
+    t0 = time.perf_counter()
+    done = 0
+    next_report = 0.0
+    with ThreadPoolExecutor(jobs) as pool:
+        for n in pool.map(_insert_hour, tasks):
+            done += n
+            elapsed = time.perf_counter() - t0
+            if elapsed >= next_report or done == events:
+                print(f"  {done:>14,} / {events:,}  ({done / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+                next_report = elapsed + 10
+    print(f"inserted in {time.perf_counter() - t0:.1f}s, rebuilding rollups …", file=sys.stderr)
+    _rebuild_rollups(start, end, jobs)
+    _analyze()
+    print(f"done in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+def purge() -> int:
+    """Alle synthetischen Events + Kameras entfernen, Rollups für den Zeitraum neu rechnen."""
+    with engine.begin() as conn:
+        ids = conn.execute(text("SELECT id FROM cameras WHERE source_name LIKE :p"),
+                           {"p": CAMERA_PREFIX + "%"}).scalars().all()
+        if not ids:
+            return 0
+        lo, hi = conn.execute(text("SELECT min(timestamp), max(timestamp) FROM detection_events "
+                                   "WHERE camera_id = ANY(:ids)"), {"ids": ids}).one()
+        deleted = conn.execute(text("DELETE FROM detection_events WHERE camera_id = ANY(:ids)"),
+                               {"ids": ids}).rowcount
+        conn.execute(text("DELETE FROM cameras WHERE id = ANY(:ids)"), {"ids": ids})
+    if lo is not None:
+        _rebuild_rollups(lo, hi + timedelta(hours=1), jobs=4)
+    _analyze()
+    return deleted
+
+
+# ----------------------- CLI -----------------------
+
+def _parse_dt(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Fill detection_events with synthetic data")
+    p.add_argument("--events", type=parse_count, default="10M", help="Anzahl Events (10M, 1B, ...)")
+    p.add_argument("--cameras", type=int, default=16)
+    p.add_argument("--days", type=int, default=30, help="Zeitraum bis --end")
+    p.add_argument("--end", type=_parse_dt, default=datetime.now(timezone.utc))
+    p.add_argument("--tz", default="UTC", help="Zeitzone für den Tagesgang")
+    p.add_argument("--models", type=parse_weights, default=DEFAULT_MODELS)
+    p.add_argument("--classes", type=parse_weights, default=DEFAULT_CLASSES)
+    p.add_argument("--peak-hour", type=float, default=15.0)
+    p.add_argument("--night-ratio", type=float, default=0.1)
+    p.add_argument("--weekend-factor", type=float, default=0.6)
+    p.add_argument("--zipf", type=float, default=0.8, help="Schiefe der Kameraverteilung (0 = gleich)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--jobs", type=int, default=4, help="parallele Insert-Verbindungen")
+    p.add_argument("--purge", action="store_true", help="synthetische Daten wieder entfernen")
+    args = p.parse_args(argv)
+
+    if engine.dialect.name != "postgresql":
+        p.error("synthetic data needs PostgreSQL")
+    if args.purge:
+        print(f"deleted {purge():,} synthetic events", file=sys.stderr)
+        return 0
+    if args.events <= 0 or args.days <= 0 or args.cameras <= 0:
+        p.error("--events, --days and --cameras must be positive")
+    generate(args.events, args.cameras, args.days, args.end, ZoneInfo(args.tz), args.models, args.classes,
+             args.peak_hour, args.night_ratio, args.weekend_factor, args.zipf, args.seed, args.jobs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
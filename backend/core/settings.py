@@ -46,11 +46,107 @@ class Settings(BaseSettings):
     POSTGRES_HOST: Optional[str] = None
     POSTGRES_PORT: Optional[int] = None  # "5433" wird sauber zu int geparst
 
+    # --- Async-DB-Pool (asyncpg, backend/db_async.py) ---
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_S: float = 5.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100  # 0 hinter pgbouncer (Transaction-Pooling)
+
     # --- Sonstiges, das bei dir in .env auftaucht ---
     GRAFANA_ADMIN_USER: Optional[str] = None
     GRAFANA_ADMIN_PASSWORD: Optional[str] = None
     VITE_API_URL: Optional[str] = None  # stört dann nicht mehr, auch wenn's eher ins FE gehört
 
+    # --- Live-WebSocket ---
+    LIVE_WS_QUEUE_SIZE: int = 32  # max. ausstehende Nachrichten pro Client (ältere werden verworfen)
+
+    # --- Event-Clips (Ringpuffer der letzten JPEG-Frames pro Kamera) ---
+    CLIPS_DIR: str = "data/clips"
+    CLIP_PRE_SECONDS: float = 5.0
+    CLIP_POST_SECONDS: float = 5.0
+    CLIP_BUFFER_MAX_MB: int = 64  # Speicherbudget pro Kamera
+
+    # --- Live-Video als H.264/fMP4 (MSE im Browser), Encoder = ffmpeg/libx264 ---
+    FMP4_ENABLED: bool = True
+    FFMPEG_BIN: str = "ffmpeg"
+    FMP4_CRF: int = 26
+    FMP4_PRESET: str = "veryfast"
+    FMP4_GOP_SECONDS: float = 1.0  # jedes Fragment beginnt mit einem Keyframe
+
+    # --- Detection-Events: Hintergrund-Writer (Bulk-Inserts) ---
+    EVENT_WRITER_QUEUE_SIZE: int = 10000  # voll → neue Events werden verworfen (und gezählt)
+    EVENT_WRITER_BATCH_SIZE: int = 500
+    EVENT_WRITER_FLUSH_INTERVAL_S: float = 1.0
+
+    # --- Detection-Feed: inkrementelle Abfragen (since_id/since_ts) und Long-Poll ---
+    DETECTION_LONG_POLL_MAX_S: float = 30.0
+
+    # --- Kamera-Stammdaten-Cache ---
+    CAMERA_CACHE_TTL_S: float = 30.0  # Sicherheitsnetz bei mehreren Prozessen
+
+    # --- Pose-Frames (DbSink): spaltenweise puffern, im Hintergrund per COPY schreiben ---
+    POSE_BATCH_SIZE: int = 2000          # Zeilen pro Flush
+    POSE_FLUSH_INTERVAL_S: float = 1.0
+    POSE_MAX_PENDING_BATCHES: int = 16   # DB zu langsam → älteste Batches verwerfen
+
+    # --- detection_events: RANGE-Partitionen auf "timestamp" (nur Postgres) ---
+    DETECTION_PARTITION_INTERVAL: str = "day"   # "day" | "week"
+    DETECTION_PARTITIONS_AHEAD: int = 7         # so viele künftige Partitionen vorhalten
+    DETECTION_RETENTION_DAYS: int = 90          # 0 = nie löschen
+    DETECTION_RETENTION_MODE: str = "drop"      # "drop" | "detach" (Partition als Archivtabelle behalten)
+    PARTITION_MAINTENANCE_INTERVAL_S: float = 3600.0
+
+    # --- Statistik-Rollups (Minute/Stunde) ---
+    ROLLUP_MINUTE_RETENTION_DAYS: int = 8  # ältere Minuten-Buckets löschen (Stunden-Buckets bleiben)
+    ROLLUP_COMPACTION_INTERVAL_S: float = 3600.0
+
+    # --- Tages-/Stundenmuster in Ortszeit (aus den Rollups) ---
+    PATTERN_TIMEZONE: str = "UTC"              # IANA-Name, z.B. "Europe/Berlin"
+    PATTERN_REFRESH_DAYS: int = 2              # so viele lokale Tage pro Lauf neu aus den Minuten-Rollups
+    PATTERN_REFRESH_INTERVAL_S: float = 300.0
+
+    # --- Spill-Log: Writer-Batches bei DB-Ausfall auf Platte puffern ---
+    SPILL_DIR: str = "data/spill"
+    SPILL_SEGMENT_MAX_MB: int = 16
+    SPILL_MAX_TOTAL_MB: int = 1024       # voll → älteste Segmente werden verworfen
+    SPILL_FSYNC_INTERVAL_S: float = 1.0  # fsync höchstens so oft (gebündelt)
+    SPILL_REPLAY_INTERVAL_S: float = 5.0
+    SPILL_REPLAY_BATCH_ROWS: int = 5000  # Zeilen pro Replay-Transaktion
+    SPILL_REPLAY_MAX_ATTEMPTS: int = 5   # so oft von der DB abgelehnt → Record in die Quarantäne
+    SPILL_DB_BACKOFF_S: float = 5.0      # nach DB-Fehler so lange direkt spillen statt die DB zu fragen
+
+    # --- Response-Cache für Dashboard-Statistiken (TTL pro Endpoint) ---
+    STATS_SUMMARY_CACHE_TTL_S: float = 5.0
+    STATS_CLASSES_CACHE_TTL_S: float = 60.0
+    STATS_CACHE_INVALIDATE_ON_WRITE: bool = False  # jeder Writer-Flush leert den "stats"-Cache
+
+    # --- Live-Zähler im Speicher (Echtzeit-Statistiken) ---
+    LIVE_STATS_RECENT_EVENTS: int = 100  # so viele letzte Events vorhalten
+
+    # --- Dashboard-Push (SSE) ---
+    DASHBOARD_TICK_S: float = 2.0        # Takt des Update-Loops (= Periode der Echtzeit-View)
+    DASHBOARD_KEEPALIVE_S: float = 15.0
+
+    # --- Sketches: Konfidenz-Quantile und eindeutige Tracks pro Kamera/Klasse ---
+    SKETCH_RELATIVE_ACCURACY: float = 0.01  # DDSketch: relativer Fehler der Quantile
+    SKETCH_MIN_CONFIDENCE: float = 0.001    # kleinere Konfidenzen landen im untersten Bin
+    SKETCH_HLL_PRECISION: int = 12          # 2^12 Register → ~1.6 % Standardfehler
+    SKETCH_PERSIST_INTERVAL_S: float = 60.0
+
+    # --- Belegungs-Heatmaps pro Kamera ---
+    HEATMAP_DIR: str = "data/heatmaps"
+    HEATMAP_GRID_W: int = 160
+    HEATMAP_GRID_H: int = 90
+    HEATMAP_POINT: str = "foot"             # "foot" (Mitte Unterkante) oder "center"
+    HEATMAP_CLASSES: str = "person"         # Kommaliste, leer = alle Klassen
+    HEATMAP_HALF_LIFE_S: float = 3600.0     # 0 = kein Zerfall (kumulativ)
+    HEATMAP_SNAPSHOT_INTERVAL_S: float = 60.0
+
+    # --- Zonen und Zähllinien ---
+    CAMERA_TRACKER: str = "bytetrack.yaml"  # Ultralytics-Tracker im Kamera-Pfad (Track-IDs), leer = aus
+    ZONE_TRACK_TIMEOUT_S: float = 2.0  # Track so lange unsichtbar → verlässt seine Zonen
+
     # pydantic v2 settings-config:
     model_config = SettingsConfigDict(
         env_file=".env",
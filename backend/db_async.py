@@ -0,0 +1,63 @@
+# backend/db_async.py
+"""
+Async-Datenbankzugriff (asyncpg) für lesende Request-Handler.
+
+Sync-Engine (db_settings.engine) bleibt für Worker-Threads, Event-Writer und
+Migrationen. Handler, die `async def` sind, nehmen diese Session, damit
+Statistik-Abfragen den Event-Loop (WebSockets, Frames) nicht blockieren.
+"""
+import time
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import Pool
+
+from backend.core.settings import settings
+from backend.db_settings import ASYNC_DATABASE_URL, engine
+from backend.monitoring.metrics import metrics
+
+
+def _engine_kwargs(url: str) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_S,
+        pool_recycle=settings.DB_POOL_RECYCLE_S,
+        pool_pre_ping=True,
+        # SQLAlchemy-Cache + asyncpg-eigener Cache (beide 0 hinter pgbouncer)
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                      "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_kwargs(ASYNC_DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+# ----------------------- Pool-Metriken -----------------------
+
+def _track_pool(pool: Pool, name: str) -> None:
+    def update(*_):
+        if hasattr(pool, "checkedout"):
+            metrics.db_pool_checked_out.labels(pool=name).set(pool.checkedout())
+            metrics.db_pool_overflow.labels(pool=name).set(max(0, pool.overflow()))
+            metrics.db_pool_size.labels(pool=name).set(pool.size())
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+    update()
+
+_track_pool(async_engine.sync_engine.pool, "async")
+_track_pool(engine.pool, "sync")
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI-Dependency: eine AsyncSession pro Request."""
+    async with AsyncSessionLocal() as session:
+        t0 = time.perf_counter()
+        await session.connection()  # Verbindung jetzt holen → Wartezeit auf den Pool messen
+        metrics.db_pool_checkout_latency.labels(pool="async").observe(time.perf_counter() - t0)
+        yield session
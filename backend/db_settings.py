@@ -1,5 +1,6 @@
 # backend/db_settings.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.orm import sessionmaker
 from .models import Base
@@ -16,8 +17,23 @@ DATABASE_URL = os.getenv(
     f"postgresql://{os.getenv('POSTGRES_USER', 'user')}:{os.getenv('POSTGRES_PASSWORD', 'password')}@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', '5433')}/{os.getenv('POSTGRES_DB', 'detection_db')}"
 )
 
-# Create an engine for the PostgreSQL server
-engine = create_engine(DATABASE_URL)
+# DATABASE_URL darf sync (psycopg2) oder async (asyncpg) sein – beide Varianten werden abgeleitet
+_SYNC_DRIVERS = {"postgresql": "postgresql+psycopg2", "sqlite": "sqlite"}
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def to_sync_url(url: str) -> str:
+    u = make_url(url)
+    return u.set(drivername=_SYNC_DRIVERS.get(u.get_backend_name(), u.drivername)).render_as_string(hide_password=False)
+
+def to_async_url(url: str) -> str:
+    u = make_url(url)
+    return u.set(drivername=_ASYNC_DRIVERS.get(u.get_backend_name(), u.drivername)).render_as_string(hide_password=False)
+
+SYNC_DATABASE_URL = os.getenv("SYNC_DATABASE_URL") or to_sync_url(DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+# Sync-Engine: Worker-Threads, Event-Writer, Migrationen
+engine = create_engine(SYNC_DATABASE_URL, pool_pre_ping=True)
 
 # Create a session local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -8,6 +8,20 @@ from backend.db_settings import init_db
 from backend.routers import cameras, streams, frames, stats, admin, videos
 from backend.routers import detections as detections_router
 from backend.routers import live
+from backend.routers import export as export_router
+from backend.routers import dashboard as dashboard_router
+from backend.routers import heatmaps as heatmaps_router
+from backend.routers import zones as zones_router
+from backend.services.event_writer import event_writer
+from backend.services.camera_cache import camera_cache
+from backend.services.live_stats import live_stats
+from backend.services.sketches import detection_sketches, sketch_persister
+from backend.services.heatmaps import heatmaps, heatmap_snapshotter
+from backend.services.zones import zone_engine
+from backend.services.partitions import partition_maintainer
+from backend.services.rollups import rollup_compactor
+from backend.services.patterns import pattern_maintainer
+from backend.services.spill_log import spill_log, spill_replayer
 
 
 
@@ -22,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Since-Id", "X-Since-Ts", "X-More-Pending"],  # Paging/Refresh-Cursor für den Browser lesbar
 )
 
 app.include_router(cameras.router, prefix="/api", tags=["cameras"])
@@ -32,10 +47,39 @@ app.include_router(admin.router, prefix="/api", tags=["admin"])
 app.include_router(videos.router, prefix="/api", tags=["videos"])
 app.include_router(detections_router.router, prefix="/api", tags=["detections"])
 app.include_router(live.router)
+app.include_router(export_router.router, prefix="/api", tags=["export"])
+app.include_router(dashboard_router.router, prefix="/api", tags=["dashboard"])
+app.include_router(heatmaps_router.router, prefix="/api", tags=["heatmaps"])
+app.include_router(zones_router.router, prefix="/api", tags=["zones"])
 
 @app.on_event("startup")
 async def startup():
     init_db()
+    camera_cache.load()
+    zone_engine.load()
+    live_stats.warm_start()  # letzte Stunde aus den Minuten-Rollups
+    partition_maintainer.start()  # Partitionen anlegen/ablaufen lassen, danach periodisch
+    rollup_compactor.start()
+    pattern_maintainer.start()  # Tag × Stunde-Matrix in Ortszeit: erst komplett, dann periodisch die letzten Tage
+    spill_replayer.start()  # bei DB-Ausfall gespillte Batches nachschreiben
+    detection_sketches.load()  # Sketch-Stand vom letzten Lauf übernehmen
+    sketch_persister.start()
+    heatmaps.load()  # letzte Snapshots (klingen seitdem weiter ab)
+    heatmap_snapshotter.start()
+
+@app.on_event("shutdown")
+def shutdown():
+    partition_maintainer.stop()
+    rollup_compactor.stop()
+    pattern_maintainer.stop()
+    spill_replayer.stop()
+    sketch_persister.stop()
+    detection_sketches.close()  # letzten Stand sichern
+    heatmap_snapshotter.stop()
+    heatmaps.close()
+    # ausstehende Detection-Events noch in die DB schreiben (oder ins Spill-Log)
+    event_writer.close()
+    spill_log.close()
 
 if __name__ == "__main__":
     import uvicorn
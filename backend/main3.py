@@ -23,16 +23,24 @@ import io
 import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from threading import Lock
 from logging.handlers import RotatingFileHandler
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from backend import schemas  # Import logging
 from .db_settings import init_db, SessionLocal  # Import SessionLocal from db_settings
+from .db_async import get_async_db  # async reads (stats, detections) – keep the event loop free
 from .models import DetectionEvent, Camera
 from backend import models  # Add this import
 from .monitoring.metrics import metrics
+from .services.event_writer import event_writer
+from .services.camera_cache import camera_cache
+from .services.spill_log import spill_log, spill_replayer
+from .services.live_stats import live_stats
+from .routers import stats as stats_router
+from .routers import dashboard as dashboard_router
 
 # Create custom loggers
 app_logger = logging.getLogger('app')
@@ -78,6 +86,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Detection statistics: shared async router (same paths as before, non-blocking DB access)
+app.include_router(stats_router.router, prefix="/api/detection-stats", tags=["stats"])
+app.include_router(dashboard_router.router, prefix="/api", tags=["dashboard"])
+
 # Global variables
 video_captures = {}  # Dictionary to store VideoCapture objects for each camera
 latest_frames = {}   # Dictionary to store latest frames for each camera
@@ -383,9 +395,8 @@ def capture_frames_for_camera(camera_id):
 
 @app.get("/api/cameras")
 def get_cameras():
-    db = SessionLocal()
     try:
-        cameras = db.query(Camera).all()
+        cameras = camera_cache.all()
         camera_list = []
         for camera in cameras:
             camera_list.append({
@@ -403,8 +414,6 @@ def get_cameras():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching cameras: {str(e)}"
         )
-    finally:
-        db.close()
 
 @app.post("/api/cameras")
 def add_camera(camera: dict):
@@ -528,30 +537,14 @@ def shutdown_event():
     """Release the webcam when the application shuts down."""
     if cap is not None:
         cap.release()
+    spill_replayer.stop()
+    event_writer.close()
+    spill_log.close()
 
 def save_event_to_db(class_name, model_type, camera_id):
-    """Save detection event to database with error handling"""
-    db = SessionLocal()
-    try:
-        # Get camera info
-        camera = db.query(Camera).filter(Camera.id == camera_id).first()
-        camera_name = camera.source_name if camera else f"Camera {camera_id}"
-        
-        event = DetectionEvent(
-            class_name=class_name,
-            model_type=model_type,
-            camera_id=camera_id,
-            camera_name=camera_name,
-            timestamp=datetime.utcnow()
-        )
-        db.add(event)
-        db.commit()
-        logging.info(f"Successfully saved event: {class_name} from {camera_name}")
-    except Exception as e:
-        logging.error(f"Error saving event to database: {str(e)}")
-        db.rollback()
-    finally:
-        db.close()
+    """Queue detection event for the background batch writer (never blocks on the DB)"""
+    if not event_writer.submit(class_name, model_type, camera_id):
+        logging.warning(f"Event writer queue full, dropped event: {class_name} from camera {camera_id}")
 
 @app.post("/api/create_camera")
 async def create_camera(
@@ -581,6 +574,7 @@ async def create_camera(
         db.add(db_camera)
         db.commit()
         db.refresh(db_camera)
+        camera_cache.upsert(db_camera)
         
         result = {
             "source_name": db_camera.source_name,
@@ -612,6 +606,7 @@ async def delete_camera(camera_id: int):
         
         db.delete(camera)
         db.commit()
+        camera_cache.remove(camera_id)
         return {"message": f"Camera {camera_id} deleted successfully"}
         
     except Exception as e:
@@ -628,6 +623,9 @@ async def delete_camera(camera_id: int):
 @app.on_event("startup")
 async def startup():
     init_db()  # Initialize database
+    camera_cache.load()
+    live_stats.warm_start()
+    spill_replayer.start()
 
 @app.post("/init-db")
 async def initialize_database():
@@ -635,6 +633,7 @@ async def initialize_database():
     try:
         Base.metadata.drop_all(bind=engine)
         Base.metadata.create_all(bind=engine)
+        camera_cache.invalidate()
         return {"message": "Database initialized successfully"}
     except Exception as e:
         raise HTTPException(
@@ -642,92 +641,6 @@ async def initialize_database():
             detail=f"Error initializing database: {str(e)}"
         )
 
-@app.get("/api/detection-stats/summary")
-async def get_detection_stats_summary():
-    db = SessionLocal()
-    try:
-        stats = {
-            "totalDetections": db.query(func.count(DetectionEvent.id)).scalar(),
-            "objectDetections": db.query(func.count(DetectionEvent.id))
-                                .filter(DetectionEvent.model_type == "objectDetection").scalar(),
-            "segmentations": db.query(func.count(DetectionEvent.id))
-                                .filter(DetectionEvent.model_type == "segmentation").scalar(),  
-            "poseEstimations": db.query(func.count(DetectionEvent.id))
-                                .filter(DetectionEvent.model_type == "pose").scalar()
-        }
-        return stats
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/classes")
-async def get_detection_classes(model: str):
-    db = SessionLocal()
-    try:
-        query = db.query(DetectionEvent.class_name.distinct())
-        if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        
-        classes = query.all()
-        return [class_name[0] for class_name in classes if class_name[0]]
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/daily")
-async def get_daily_detection_stats(model: str = 'all', class_name: str = 'all'):
-    db = SessionLocal()
-    try:
-        today = datetime.utcnow().date()
-        tomorrow = today + timedelta(days=1)
-        
-        query = db.query(
-            func.date_trunc('hour', DetectionEvent.timestamp).label('hour'),
-            func.count(DetectionEvent.id).label('count')
-        )
-        
-        if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        if class_name != 'all':
-            query = query.filter(DetectionEvent.class_name == class_name)
-            
-        hourly_stats = (query
-            .filter(DetectionEvent.timestamp >= today)
-            .filter(DetectionEvent.timestamp < tomorrow)
-            .group_by(func.date_trunc('hour', DetectionEvent.timestamp))
-            .order_by(func.date_trunc('hour', DetectionEvent.timestamp))
-            .all()
-        )
-        
-        return [{"timestamp": stat.hour.isoformat(), "count": stat.count} for stat in hourly_stats]
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/weekly")
-async def get_weekly_detection_stats(model: str = 'all', class_name: str = 'all'):
-    db = SessionLocal()
-    try:
-        week_ago = datetime.utcnow().date() - timedelta(days=7)
-        
-        query = db.query(
-            func.date_trunc('day', DetectionEvent.timestamp).label('date'),
-            func.count(DetectionEvent.id).label('count')
-        )
-        
-        if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        if class_name != 'all':
-            query = query.filter(DetectionEvent.class_name == class_name)
-            
-        daily_stats = (query
-            .filter(DetectionEvent.timestamp >= week_ago)
-            .group_by(func.date_trunc('day', DetectionEvent.timestamp))
-            .order_by(func.date_trunc('day', DetectionEvent.timestamp))
-            .all()
-        )
-        
-        return [{"date": stat.date.isoformat(), "count": stat.count} for stat in daily_stats]
-    finally:
-        db.close()
-
 @app.get("/api/camera-threads")
 async def get_camera_threads():
     """Get information about currently running camera threads"""
@@ -738,165 +651,25 @@ async def get_camera_threads():
         "camera_threads": list(app.camera_threads_info.values())
     })
 
-@app.get("/api/detection-stats/real-time")
-async def get_real_time_stats():
-    """Get real-time detection statistics for the last hour"""
-    db = SessionLocal()
-    try:
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        
-        # Get detection rate per minute for the last hour
-        minute_stats = db.query(
-            func.date_trunc('minute', DetectionEvent.timestamp).label('minute'),
-            func.count(DetectionEvent.id).label('count')
-        ).filter(
-            DetectionEvent.timestamp >= one_hour_ago
-        ).group_by(
-            func.date_trunc('minute', DetectionEvent.timestamp)
-        ).order_by(
-            func.date_trunc('minute', DetectionEvent.timestamp).desc()
-        ).limit(60).all()
-        
-        # Get current active cameras
-        active_cameras = len(getattr(app, 'camera_threads_info', {}))
-        
-        # Get latest detections
-        latest_detections = db.query(DetectionEvent).order_by(
-            DetectionEvent.timestamp.desc()
-        ).limit(10).all()
-        
-        return {
-            "detectionRate": [{"time": stat.minute.isoformat(), "count": stat.count} for stat in minute_stats],
-            "activeCameras": active_cameras,
-            "latestDetections": [{
-                "id": d.id,
-                "model_type": d.model_type,
-                "class_name": d.class_name,
-                "camera_name": d.camera_name,
-                "timestamp": d.timestamp.isoformat()
-            } for d in latest_detections]
-        }
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/top-classes")
-async def get_top_classes(limit: int = 10, days: int = 7):
-    """Get top detected classes over a specified period"""
-    db = SessionLocal()
-    try:
-        since_date = datetime.utcnow() - timedelta(days=days)
-        
-        top_classes = db.query(
-            DetectionEvent.class_name,
-            func.count(DetectionEvent.id).label('count')
-        ).filter(
-            DetectionEvent.timestamp >= since_date,
-            DetectionEvent.class_name.isnot(None)
-        ).group_by(
-            DetectionEvent.class_name
-        ).order_by(
-            func.count(DetectionEvent.id).desc()
-        ).limit(limit).all()
-        
-        return [{
-            "class_name": class_name,
-            "count": count,
-            "percentage": 0  # Will be calculated in frontend
-        } for class_name, count in top_classes]
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/camera-performance")
-async def get_camera_performance():
-    """Get detection statistics per camera"""
-    db = SessionLocal()
-    try:
-        # Get all cameras
-        cameras = db.query(Camera).all()
-        
-        camera_stats = []
-        for camera in cameras:
-            # Get detection count for this camera
-            detection_count = db.query(func.count(DetectionEvent.id)).filter(
-                DetectionEvent.camera_id == camera.id
-            ).scalar()
-            
-            # Get last detection time
-            last_detection = db.query(DetectionEvent.timestamp).filter(
-                DetectionEvent.camera_id == camera.id
-            ).order_by(DetectionEvent.timestamp.desc()).first()
-            
-            # Check if camera is active
-            is_active = camera.id in getattr(app, 'camera_threads_info', {})
-            
-            camera_stats.append({
-                "id": camera.id,
-                "name": camera.source_name,
-                "location": camera.location,
-                "detectionCount": detection_count,
-                "lastDetection": last_detection[0].isoformat() if last_detection else None,
-                "isActive": is_active,
-                "uptime": "N/A"  # Could be calculated from thread info
-            })
-        
-        return camera_stats
-    finally:
-        db.close()
-
-@app.get("/api/detection-stats/hourly-pattern")
-async def get_hourly_pattern(days: int = 30):
-    """Get average detection patterns by hour of day"""
-    db = SessionLocal()
-    try:
-        since_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Get average detections by hour
-        hourly_avg = db.query(
-            func.extract('hour', DetectionEvent.timestamp).label('hour'),
-            func.count(DetectionEvent.id).label('total_count')
-        ).filter(
-            DetectionEvent.timestamp >= since_date
-        ).group_by(
-            func.extract('hour', DetectionEvent.timestamp)
-        ).order_by(
-            func.extract('hour', DetectionEvent.timestamp)
-        ).all()
-        
-        # Calculate average per hour
-        hourly_pattern = []
-        for hour, total_count in hourly_avg:
-            avg_count = total_count / days  # Average per day for this hour
-            hourly_pattern.append({
-                "hour": int(hour),
-                "avgCount": round(avg_count, 2)
-            })
-        
-        return hourly_pattern
-    finally:
-        db.close()
-
 @app.get("/api/detections")
-async def get_detections(limit: int = 100, offset: int = 0, camera_id: Optional[int] = None):
+async def get_detections(limit: int = 100, offset: int = 0, camera_id: Optional[int] = None,
+                         db: AsyncSession = Depends(get_async_db)):
     """Get detection history with pagination"""
-    db = SessionLocal()
-    try:
-        query = db.query(DetectionEvent).order_by(DetectionEvent.timestamp.desc())
-        
-        if camera_id:
-            query = query.filter(DetectionEvent.camera_id == camera_id)
-        
-        detections = query.offset(offset).limit(limit).all()
-        
-        return [{
-            "id": d.id,
-            "timestamp": d.timestamp.isoformat(),
-            "class_name": d.class_name,
-            "camera_id": d.camera_id,
-            "camera_name": d.camera_name,
-            "model_type": d.model_type
-        } for d in detections]
-    finally:
-        db.close()
+    query = select(DetectionEvent).order_by(DetectionEvent.timestamp.desc())
+    
+    if camera_id:
+        query = query.where(DetectionEvent.camera_id == camera_id)
+    
+    detections = (await db.execute(query.offset(offset).limit(limit))).scalars().all()
+    
+    return [{
+        "id": d.id,
+        "timestamp": d.timestamp.isoformat(),
+        "class_name": d.class_name,
+        "camera_id": d.camera_id,
+        "camera_name": d.camera_name,
+        "model_type": d.model_type
+    } for d in detections]
 
 # Add these new endpoints for individual camera control
 
@@ -1,18 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Date, DateTime, Float, LargeBinary, REAL, Index, JSON
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timezone
 
 Base = declarative_base()
 
+# model_type der Zonen-Ereignisse (services/zones.py): keine Detektionen, in den Statistiken ausgenommen
+ZONE_MODEL_TYPE = "zone"
+
 class DetectionEvent(Base):
+    # In Postgres per Migration RANGE-partitioniert auf "timestamp" (PK dort: id, timestamp),
+    # Partitionspflege: services/partitions.py
     __tablename__ = 'detection_events'
     
     id = Column(Integer, primary_key=True, index=True)
-    model_type = Column(String, index=True)
-    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    model_type = Column(String)
+    timestamp = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     class_name = Column(String)
-    camera_id = Column(Integer, index=True)
+    camera_id = Column(Integer)
     camera_name = Column(String)
+    clip_path = Column(String, nullable=True)  # Pre-/Post-Event-Clip (services/clip_recorder.py)
+    bbox = Column(LargeBinary, nullable=True)  # normiert x,y,w,h als 4×int16 (services/keypoint_codec.py)
+    score = Column(REAL, nullable=True)
+    track_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index('ix_detection_events_ts_id', 'timestamp', 'id'),
+        Index('ix_detection_events_camera_ts', 'camera_id', 'timestamp', 'id'),
+        Index('ix_detection_events_model_class_ts', 'model_type', 'class_name', 'timestamp'),
+    )
 
 class Camera(Base):
     __tablename__ = 'cameras'
@@ -29,4 +45,80 @@ class Camera(Base):
         self.stream_type = stream_type
         self.stream = stream
         self.location = location
-        self.created_at = datetime.utcnow()
\ No newline at end of file
+        self.created_at = datetime.utcnow()
+
+class PoseFrame(Base):
+    """Ein Track pro Frame (bbox normiert 0..1, Keypoints binär kodiert, siehe services/keypoint_codec.py)."""
+    __tablename__ = 'pose_frames'
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    session_id = Column(Integer, nullable=False)
+    ts_ms = Column(BigInteger, nullable=False)
+    track_id = Column(Integer, nullable=True)
+    label = Column(String, nullable=True)
+    score = Column(Float, nullable=True)
+    x = Column(Float)
+    y = Column(Float)
+    w = Column(Float)
+    h = Column(Float)
+    keypoints = Column(LargeBinary, nullable=True)
+
+    __table_args__ = (
+        Index('ix_pose_frames_session_ts', 'session_id', 'ts_ms'),
+    )
+
+class DetectionRollupMinute(Base):
+    """Vorverdichtete Zählung pro Minute (fortgeschrieben vom Event-Writer, services/rollups.py)."""
+    __tablename__ = 'detection_rollup_minute'
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    camera_id = Column(Integer, primary_key=True)
+    model_type = Column(String, primary_key=True)
+    class_name = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class DetectionRollupHour(Base):
+    """Wie DetectionRollupMinute, aber pro Stunde (für Tages-/Wochen-/Musterstatistiken)."""
+    __tablename__ = 'detection_rollup_hour'
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    camera_id = Column(Integer, primary_key=True)
+    model_type = Column(String, primary_key=True)
+    class_name = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class DetectionPatternHour(Base):
+    """Zählung pro lokalem Tag und lokaler Stunde (PATTERN_TIMEZONE), aus den Rollups (services/patterns.py)."""
+    __tablename__ = 'detection_pattern_hour'
+
+    day = Column(Date, primary_key=True)
+    hour = Column(SmallInteger, primary_key=True)
+    camera_id = Column(Integer, primary_key=True)
+    model_type = Column(String, primary_key=True)
+    class_name = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class DetectionSketch(Base):
+    # Persistierter Stand der Streaming-Sketches (services/sketches.py), ein Eintrag pro Schlüssel
+    __tablename__ = 'detection_sketches'
+
+    camera_id = Column(Integer, primary_key=True)       # -1 = ohne Kamera (wie in den Rollups)
+    model_type = Column(String, primary_key=True)
+    class_name = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    confidence = Column(LargeBinary, nullable=False)    # DDSketch (zlib)
+    tracks = Column(LargeBinary, nullable=True)         # HyperLogLog-Register (zlib)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+class CameraZone(Base):
+    # Zonen (Polygon) und Zähllinien pro Kamera, ausgewertet in services/zones.py
+    __tablename__ = 'camera_zones'
+
+    id = Column(Integer, primary_key=True)
+    camera_id = Column(Integer, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    kind = Column(String, nullable=False)                # "zone" | "line"
+    points = Column(JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False)  # [[x, y], ...] normiert
+    classes = Column(String, nullable=True)              # Kommaliste, NULL = alle Klassen
+    dwell_alert_s = Column(Float, nullable=True)         # nur Zonen: "dwell"-Event ab dieser Verweildauer
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
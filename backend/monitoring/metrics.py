@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Gauge, Histogram, Summary
+from prometheus_client import Counter, Gauge, Histogram
 import contextlib
 import time
 
@@ -10,6 +10,12 @@ class MetricsManager:
             'Number of currently active camera streams'
         )
 
+        self.camera_status = Gauge(
+            'camera_status',
+            'Camera stream status (1 = running, 0 = stopped)',
+            ['camera_id', 'camera_name']
+        )
+
         # Video Analysis Metrics
         self.active_video_jobs = Gauge(
             'video_jobs_active',
@@ -48,10 +54,162 @@ class MetricsManager:
             ['camera_id', 'class_name', 'model_type']
         )
 
-        self.detection_confidence = Summary(
-            'detection_confidence',
-            'Confidence scores of detections',
-            ['camera_id', 'class_name', 'model_type']
+        # aus den Sketches (services/sketches.py), beim Persistieren aktualisiert
+        self.detection_confidence_quantile = Gauge(
+            'detection_confidence_quantile',
+            'Confidence quantile of detections per camera and model (DDSketch)',
+            ['camera_id', 'model_type', 'quantile']
+        )
+
+        self.zone_events = Counter(
+            'zone_events_total',
+            'Zone and line events (enter, exit, dwell, cross)',
+            ['event']
+        )
+
+        self.detection_unique_tracks = Gauge(
+            'detection_unique_tracks',
+            'Estimated number of distinct tracks per camera and model (HyperLogLog)',
+            ['camera_id', 'model_type']
+        )
+
+        # Live WebSocket Metrics
+        self.live_ws_clients = Gauge(
+            'live_ws_clients',
+            'Number of connected live WebSocket clients'
+        )
+
+        self.live_ws_messages_dropped = Counter(
+            'live_ws_messages_dropped_total',
+            'Live messages dropped because a client send queue was full'
+        )
+
+        self.live_ws_send_lag = Histogram(
+            'live_ws_send_lag_seconds',
+            'Time a live message waited in a client send queue',
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+        )
+
+        # Event Writer Metrics
+        self.event_writer_queue_depth = Gauge(
+            'event_writer_queue_depth',
+            'Detection events waiting to be written to the database'
+        )
+
+        self.event_writer_flush_latency = Histogram(
+            'event_writer_flush_seconds',
+            'Time to write one batch of detection events',
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+
+        self.event_writer_written = Counter(
+            'event_writer_events_written_total',
+            'Detection events written to the database'
+        )
+
+        self.event_writer_dropped = Counter(
+            'event_writer_events_dropped_total',
+            'Detection events dropped by the event writer',
+            ['reason']
+        )
+
+        # Pose-Frame Sink Metrics
+        self.pose_rows_written = Counter(
+            'pose_rows_written_total',
+            'Pose rows written to pose_frames',
+            ['method']
+        )
+
+        self.pose_rows_dropped = Counter(
+            'pose_rows_dropped_total',
+            'Pose rows dropped because the writer fell behind or the database failed',
+            ['reason']
+        )
+
+        self.pose_flush_latency = Histogram(
+            'pose_flush_seconds',
+            'Time to write one batch of pose rows',
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+
+        # Spill-Log Metrics
+        self.spill_bytes = Gauge(
+            'spill_log_bytes',
+            'Bytes currently held in the on-disk spill log'
+        )
+
+        self.spill_segments = Gauge(
+            'spill_log_segments',
+            'Segment files currently in the spill log'
+        )
+
+        self.spill_replay_lag = Gauge(
+            'spill_log_replay_lag_seconds',
+            'Age of the oldest spilled batch not yet replayed to the database'
+        )
+
+        self.spill_rows_written = Counter(
+            'spill_log_rows_written_total',
+            'Rows spilled to disk because the database was unavailable',
+            ['stream']
+        )
+
+        self.spill_rows_replayed = Counter(
+            'spill_log_rows_replayed_total',
+            'Spilled rows written back to the database',
+            ['stream']
+        )
+
+        self.spill_rows_dropped = Counter(
+            'spill_log_rows_dropped_total',
+            'Rows lost by the spill log (full, corrupt, no handler, quarantined)',
+            ['stream', 'reason']
+        )
+
+        # Response-Cache Metrics
+        self.response_cache_requests = Counter(
+            'response_cache_requests_total',
+            'Cached endpoint lookups by outcome (hit, miss, coalesced)',
+            ['namespace', 'result']
+        )
+
+        # Dashboard Push Metrics
+        self.dashboard_subscribers = Gauge(
+            'dashboard_stream_subscribers',
+            'Dashboards currently subscribed to the statistics stream'
+        )
+
+        self.dashboard_view_compute_seconds = Histogram(
+            'dashboard_view_compute_seconds',
+            'Time to compute one dashboard view for all subscribers',
+            ['view'],
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+        )
+
+        # DB Pool Metrics
+        self.db_pool_checked_out = Gauge(
+            'db_pool_connections_checked_out',
+            'Database connections currently checked out of the pool',
+            ['pool']
+        )
+
+        self.db_pool_size = Gauge(
+            'db_pool_connections_size',
+            'Configured base size of the database connection pool',
+            ['pool']
+        )
+
+        self.db_pool_overflow = Gauge(
+            'db_pool_connections_overflow',
+            'Connections opened beyond the base pool size',
+            ['pool']
+        )
+
+        self.db_pool_checkout_latency = Histogram(
+            'db_pool_checkout_seconds',
+            'Time to acquire a pooled connection for an async session',
+            ['pool'],
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
         )
 
         # Error Metrics
@@ -76,19 +234,13 @@ class MetricsManager:
 
     def record_detection(self, camera_id: str, class_name: str, 
                         model_type: str, confidence: float):
-        """Record a detection with its confidence"""
+        """Record a detection (Konfidenz-Quantile: services/sketches.py)"""
         self.detections_total.labels(
             camera_id=camera_id,
             class_name=class_name,
             model_type=model_type
         ).inc()
 
-        self.detection_confidence.labels(
-            camera_id=camera_id,
-            class_name=class_name,
-            model_type=model_type
-        ).observe(confidence)
-
     def record_error(self, camera_id: str, error_type: str, component: str):
         """Record an error event"""
         self.errors_total.labels(
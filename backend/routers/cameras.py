@@ -8,32 +8,29 @@ from sqlalchemy.orm import Session
 
 from backend.db_settings import SessionLocal
 from backend.models import Camera
+from backend.services.camera_cache import camera_cache
 
 router = APIRouter()
 
 @router.get("/cameras")
 def get_cameras():
-    db: Session = SessionLocal()
     try:
-        cameras: List[Camera] = db.query(Camera).all()
-        camera_list = []
-        for camera in cameras:
-            camera_list.append({
+        return [
+            {
                 "id": camera.id,
                 "source_name": camera.source_name,
                 "stream_type": camera.stream_type,
                 "stream": camera.stream,
                 "location": camera.location,
                 "created_at": camera.created_at.strftime("%Y-%m-%d %H:%M:%S") if camera.created_at else None
-            })
-        return camera_list
+            }
+            for camera in camera_cache.all()
+        ]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching cameras: {str(e)}"
         )
-    finally:
-        db.close()
 
 
 @router.post("/cameras")
@@ -72,6 +69,7 @@ async def create_camera(
         db.add(db_camera)
         db.commit()
         db.refresh(db_camera)
+        camera_cache.upsert(db_camera)
 
         return {
             "source_name": db_camera.source_name,
@@ -100,6 +98,7 @@ async def delete_camera(camera_id: int):
 
         db.delete(camera)
         db.commit()
+        camera_cache.remove(camera_id)
         return {"message": f"Camera {camera_id} deleted successfully"}
     except Exception as e:
         db.rollback()
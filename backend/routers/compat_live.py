@@ -4,6 +4,7 @@ from fastapi.responses import Response
 from sqlalchemy.orm import Session as OrmSession
 from backend.db_settings import SessionLocal
 from backend.models import Camera
+from backend.services.camera_cache import camera_cache
 from backend.workers.session_worker import start_session_worker, terminate_session_worker, get_latest_frame
 import cv2
 
@@ -12,22 +13,17 @@ router = APIRouter(tags=["compat-live"])
 @router.get("/api/cameras")
 def api_cameras():
     """Alias für Frontend: liefert Kamera-Liste mit stream_type/live-Flag."""
-    db: OrmSession = SessionLocal()
-    try:
-        cams = db.query(Camera).all()
-        # Output so formen, wie dein Frontend es erwartet
-        out = []
-        for c in cams:
-            out.append({
-                "id": c.id,
-                "source_name": c.source_name,
-                "stream_type": c.stream_type or "live",  # default "live"
-                "stream": c.stream,
-                "location": c.location,
-            })
-        return out
-    finally:
-        db.close()
+    # Output so formen, wie dein Frontend es erwartet
+    return [
+        {
+            "id": c.id,
+            "source_name": c.source_name,
+            "stream_type": c.stream_type or "live",  # default "live"
+            "stream": c.stream,
+            "location": c.location,
+        }
+        for c in camera_cache.all()
+    ]
 
 
 @router.post("/start_camera_stream/{camera_id}")
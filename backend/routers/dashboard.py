@@ -0,0 +1,88 @@
+# backend/routers/dashboard.py
+"""
+Aggregiertes Dashboard: ein Payload statt acht Einzelaufrufen, plus SSE-Stream
+(/dashboard/stream), der nur geänderte Views pusht (services/dashboard_hub.py).
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from backend.core.settings import settings
+from backend.db_async import AsyncSessionLocal
+from backend.routers import stats
+from backend.schemas import ModelFilter
+from backend.services.dashboard_hub import DashboardHub
+
+router = APIRouter()
+
+dashboard_hub = DashboardHub(tick_s=settings.DASHBOARD_TICK_S, keepalive_s=settings.DASHBOARD_KEEPALIVE_S)
+
+# app.camera_threads_info – die Views laufen im Hub-Loop ohne Request, daher beim Abonnieren merken
+_threads_info: Dict[int, Any] = {}
+
+
+def _remember_threads(request: Request) -> None:
+    global _threads_info
+    _threads_info = getattr(request.app, 'camera_threads_info', _threads_info)
+
+
+async def _summary(model: str) -> Any:
+    return await stats.get_detection_stats_summary()
+
+async def _real_time(model: str) -> Any:
+    return stats.real_time_view(_threads_info)
+
+async def _camera_performance(model: str) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await stats.camera_performance_view(db, _threads_info)
+
+async def _daily(model: str) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await stats.get_daily_detection_stats(model=model, class_name='all', db=db)
+
+async def _weekly(model: str) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await stats.get_weekly_detection_stats(model=model, class_name='all', db=db)
+
+async def _top_classes(model: str) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await stats.get_top_classes(limit=10, days=7, db=db)
+
+async def _hourly_pattern(model: str) -> Any:
+    async with AsyncSessionLocal() as db:
+        return await stats.get_hourly_pattern(days=30, db=db)
+
+async def _classes(model: str) -> Any:
+    return await stats.get_detection_classes(model)
+
+# Name (= Schlüssel im Payload), Funktion, Periode in s, modellabhängig
+for _name, _fn, _period, _per_model in (
+    ("realTime", _real_time, settings.DASHBOARD_TICK_S, False),
+    ("summary", _summary, 5.0, False),
+    ("cameraPerformance", _camera_performance, 5.0, False),
+    ("daily", _daily, 15.0, True),
+    ("weekly", _weekly, 60.0, True),
+    ("topClasses", _top_classes, 30.0, False),
+    ("hourlyPattern", _hourly_pattern, 300.0, False),
+    ("classes", _classes, 60.0, True),
+):
+    dashboard_hub.register(_name, _fn, _period, per_model=_per_model)
+
+
+@router.get("/dashboard")
+async def get_dashboard(request: Request, model: ModelFilter = 'all'):
+    """Alle Dashboard-Views in einem Aufruf"""
+    _remember_threads(request)
+    return await dashboard_hub.snapshot(model)
+
+
+@router.get("/dashboard/stream")
+async def stream_dashboard(request: Request, model: ModelFilter = 'all'):
+    """Server-Sent Events: 'snapshot' beim Verbinden, danach 'update' mit geänderten Views"""
+    _remember_threads(request)
+    return StreamingResponse(
+        dashboard_hub.stream(model),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
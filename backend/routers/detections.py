@@ -1,23 +1,30 @@
-from typing import List, Optional
-from datetime import timezone
+import json
+import time
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import asc, desc, func, select, tuple_
 
-from backend.db_settings import SessionLocal
-from backend.models import DetectionEvent, Camera
+from backend.core.settings import settings
+from backend.db_async import get_async_db
+from backend.models import DetectionEvent
+from backend.services.camera_cache import camera_cache
+from backend.services.event_writer import events_written
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 router = APIRouter()
 
-# DB-Session Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Nur was DetectionOut braucht (keine bbox/clip_path aus der DB holen)
+_FEED_COLUMNS = (DetectionEvent.id, DetectionEvent.timestamp, DetectionEvent.class_name,
+                 DetectionEvent.model_type, DetectionEvent.camera_id)
 
 
 class DetectionOut(BaseModel):
@@ -54,32 +61,137 @@ class DetectionOut(BaseModel):
         )
 
 
+def _utc(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+def format_ts(ts: datetime) -> str:
+    """Volle Mikrosekunden, UTC mit 'Z'."""
+    return _utc(ts).astimezone(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+def parse_ts(value: str) -> datetime:
+    # '+' kommt unkodiert in der URL als Leerzeichen an
+    return _utc(datetime.fromisoformat(value.strip().replace(" ", "+").replace("Z", "+00:00")))
+
+def encode_cursor(row: DetectionEvent) -> str:
+    """Cursor '<ts>,<id>' der letzten Zeile."""
+    return f"{format_ts(row.timestamp)},{row.id}"
+
+def parse_cursor(value: str) -> Tuple[datetime, int]:
+    try:
+        ts_raw, id_raw = value.rsplit(",", 1)
+        return parse_ts(ts_raw), int(id_raw)
+    except ValueError:
+        raise HTTPException(400, "before must look like '<iso-timestamp>,<id>'")
+
+
+def _dumps(data: Any) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def columnar(rows: Sequence[Any], cams: Dict[int, Optional[str]]) -> Dict[str, Any]:
+    """Parallele Arrays statt Objekten; timestamp als Epoch-Millisekunden."""
+    return {
+        "id": [r.id for r in rows],
+        "timestamp": [int(_utc(r.timestamp).timestamp() * 1000) for r in rows],
+        "class_name": [r.class_name for r in rows],
+        "model_type": [r.model_type for r in rows],
+        "camera_id": [r.camera_id for r in rows],
+        "camera_name": [cams[r.camera_id] for r in rows],
+    }
+
+
 @router.get("/detection", response_model=List[DetectionOut])
 async def list_detections(
+    response: Response,
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    before: Optional[str] = Query(None, description="Keyset-Cursor '<ts>,<id>' (aus X-Next-Cursor), ersetzt offset"),
+    since_id: Optional[int] = Query(None, ge=0, description="nur Detections mit größerer id (aus X-Since-Id)"),
+    since_ts: Optional[str] = Query(None, description="nur neuere Detections nach Zeitstempel (X-Since-Ts); mit since_id ignoriert"),
+    wait: float = Query(0, ge=0, description="since-Modus: bis zu so viele Sekunden auf neue Detections warten"),
+    format: Literal["rows", "columns"] = Query("rows", description="columns: parallele Arrays statt Objekten"),
     model: Optional[str] = Query(None, description="z.B. objectDetection | segmentation | pose | all"),
     camera_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    q = db.query(DetectionEvent)
+    """
+    Neueste Detections zuerst. Für tiefe Seiten `before` statt `offset` verwenden:
+    die Antwort trägt X-Next-Cursor, der als `before` die nächste Seite liefert
+    (Index-Range-Scan auf (timestamp, id), unabhängig von der Seitentiefe).
+
+    Aktualisieren: X-Since-Id der letzten Antwort (kommt immer, bei leerer
+    Antwort die aktuell höchste id) als since_id mitgeben → nur Zeilen mit
+    größerer id, auch nachträglich geschriebene; since_ts allein filtert nach
+    Zeitstempel. Älteste zuerst, höchstens `limit`; ist die
+    Seite voll, steht X-More-Pending: 1 und die nächste Anfrage holt den Rest.
+    Mit wait > 0 hält der Server die Anfrage bis zum nächsten geschriebenen
+    Batch offen (Long-Poll, höchstens DETECTION_LONG_POLL_MAX_S).
+    """
+    incremental = since_id is not None or since_ts is not None
+    if before is not None and offset:
+        raise HTTPException(400, "Use either offset or before, not both")
+    if incremental and (before is not None or offset):
+        raise HTTPException(400, "since_id/since_ts cannot be combined with offset or before")
+    if wait and not incremental:
+        raise HTTPException(400, "wait needs since_id or since_ts")
+    since = None
+    if since_ts is not None:
+        try:
+            since = parse_ts(since_ts)
+        except ValueError:
+            raise HTTPException(400, "since_ts must be an ISO timestamp")
+
+    q = select(*_FEED_COLUMNS)
     if model and model != "all":
-        q = q.filter(DetectionEvent.model_type == model)
+        q = q.where(DetectionEvent.model_type == model)
     if camera_id is not None:
-        q = q.filter(DetectionEvent.camera_id == camera_id)
-
-    rows = (
-        q.order_by(desc(DetectionEvent.timestamp))
-         .offset(offset)
-         .limit(limit)
-         .all()
-    )
-
-    # Kameranamen bulk-laden
-    cam_ids = {r.camera_id for r in rows}
-    cam_map = {}
-    if cam_ids:
-        cams = db.query(Camera).filter(Camera.id.in_(cam_ids)).all()
-        cam_map = {c.id: getattr(c, "source_name", None) for c in cams}
-
-    return [DetectionOut.from_row(r, cam_map.get(r.camera_id)) for r in rows]
+        q = q.where(DetectionEvent.camera_id == camera_id)
+    if before is not None:
+        ts, last_id = parse_cursor(before)
+        q = q.where(tuple_(DetectionEvent.timestamp, DetectionEvent.id) < tuple_(ts, last_id))
+    if since_id is not None:
+        # nur die id: spät geschriebene Zeilen (Spill-Replay, Writer-Rückstau) haben alte
+        # Zeitstempel, aber neue ids – eine Zeitgrenze würde sie überspringen
+        q = q.where(DetectionEvent.id > since_id).order_by(asc(DetectionEvent.id))
+    elif since is not None:
+        q = q.where(DetectionEvent.timestamp > since).order_by(asc(DetectionEvent.timestamp), asc(DetectionEvent.id))
+    else:
+        q = q.order_by(desc(DetectionEvent.timestamp), desc(DetectionEvent.id)).offset(offset)
+    q = q.limit(limit)
+
+    generation = events_written.generation
+    rows = (await db.execute(q)).all()
+    if not rows and wait:
+        deadline = time.monotonic() + min(wait, settings.DETECTION_LONG_POLL_MAX_S)
+        while not rows:
+            await db.rollback()  # Verbindung während des Wartens an den Pool zurückgeben
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await events_written.wait(generation, remaining):
+                break
+            generation = events_written.generation
+            rows = (await db.execute(q)).all()
+
+    headers = {}
+    if rows:
+        headers["X-Since-Id"] = str(max(r.id for r in rows))
+        headers["X-Since-Ts"] = format_ts(max(r.timestamp for r in rows))
+    else:
+        if since_id is None:
+            # leerer Feed: ab der aktuell höchsten id weiter, damit der Client live gehen kann
+            since_id = (await db.execute(select(func.max(DetectionEvent.id)))).scalar() or 0
+        headers["X-Since-Id"] = str(since_id)
+        if since is not None:
+            headers["X-Since-Ts"] = format_ts(since)
+    if len(rows) == limit:
+        if incremental:
+            headers["X-More-Pending"] = "1"
+        else:
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+
+    cams = {cid: camera_cache.get(cid) for cid in {r.camera_id for r in rows}}
+    names = {cid: cam.source_name if cam else None for cid, cam in cams.items()}
+    if format == "columns":
+        return Response(_dumps(columnar(rows, names)), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return [DetectionOut.from_row(r, names[r.camera_id]) for r in rows]
@@ -0,0 +1,46 @@
+# backend/routers/export.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.services.export import (
+    DEFAULT_CHUNK_SIZE, FORMATS, HAS_ARROW, ExportFilter, QUERIES, stream_export,
+)
+
+router = APIRouter()
+
+_EXTENSIONS = {"ndjson": "ndjson", "parquet": "parquet", "arrow": "arrows"}
+
+
+@router.get("/export/{kind}")
+def export(
+    kind: str,
+    format: str = Query("ndjson", description="ndjson | parquet | arrow"),
+    since: Optional[datetime] = Query(None, description="ab (inkl.), ISO-8601"),
+    until: Optional[datetime] = Query(None, description="bis (exkl.), ISO-8601"),
+    camera_id: Optional[int] = Query(None),
+    model: Optional[str] = Query(None),
+    class_name: Optional[str] = Query(None),
+    session_id: Optional[int] = Query(None, description="nur pose"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=100_000),
+):
+    """
+    Streamt detections bzw. pose als Datei (serverseitiger Cursor, konstanter Speicher).
+    Sync-Generator → läuft im Threadpool und blockiert den Event-Loop nicht.
+    """
+    if kind not in QUERIES:
+        raise HTTPException(404, f"Unknown export '{kind}', expected one of {sorted(QUERIES)}")
+    if format not in FORMATS:
+        raise HTTPException(400, f"format must be one of {sorted(FORMATS)}")
+    if format != "ndjson" and not HAS_ARROW:
+        raise HTTPException(501, "parquet/arrow export needs pyarrow on the server")
+
+    f = ExportFilter(since, until, camera_id, model, class_name, session_id)
+    filename = f"{kind}-{datetime.utcnow():%Y%m%dT%H%M%S}.{_EXTENSIONS[format]}"
+    return StreamingResponse(
+        stream_export(kind, format, f, chunk_size),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
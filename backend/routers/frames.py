@@ -1,11 +1,66 @@
-from fastapi import APIRouter, HTTPException, Response
-from backend.services.camera_manager import get_latest
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Response, Query
+from backend.services.camera_manager import get_latest, get_latest_many, get_thumbnail
 
 router = APIRouter()
 
+MAX_BATCH_CAMERAS = 64
+
 @router.get("/process_frame/{camera_id}")
 def process_frame_endpoint(camera_id: int):
     data = get_latest(camera_id)
     if data is None:
         raise HTTPException(404, "No frame available")
     return Response(content=data, media_type="image/jpeg")
+
+@router.get("/process_frames")
+def process_frames_batch(
+    camera_ids: str = Query(..., description="Kommaliste, z.B. 1,2,3"),
+    thumb: Optional[int] = Query(None, ge=32, le=1920, description="Breite der Vorschau in px (optional)"),
+):
+    """
+    Letzte Frames mehrerer Kameras in EINER Antwort (multipart/mixed), z.B. für das Grid.
+    Jeder Teil trägt X-Camera-Id, X-Frame-Seq und X-Frame-Ts; Kameras ohne Frame
+    stehen im Header X-Missing-Cameras.
+    """
+    try:
+        ids = list(dict.fromkeys(int(x) for x in camera_ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(400, "camera_ids must be a comma-separated list of integers")
+    if not ids:
+        raise HTTPException(400, "camera_ids is empty")
+    if len(ids) > MAX_BATCH_CAMERAS:
+        raise HTTPException(400, f"At most {MAX_BATCH_CAMERAS} cameras per request")
+
+    # Erst alle Referenzen einsammeln (konsistenter Schnappschuss), dann erst verpacken
+    snapshot = get_latest_many(ids)
+
+    boundary = uuid.uuid4().hex
+    parts = []
+    for camera_id in ids:
+        entry = snapshot.get(camera_id)
+        if entry is None:
+            continue
+        data, seq, ts = entry
+        if thumb:
+            data = get_thumbnail(camera_id, data, seq, thumb)
+        parts.append(
+            (f"--{boundary}\r\n"
+             f"Content-Type: image/jpeg\r\n"
+             f"Content-Length: {len(data)}\r\n"
+             f"X-Camera-Id: {camera_id}\r\n"
+             f"X-Frame-Seq: {seq}\r\n"
+             f"X-Frame-Ts: {ts:.3f}\r\n\r\n").encode("ascii")
+        )
+        parts.append(data)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("ascii"))
+
+    missing = [str(c) for c in ids if c not in snapshot]
+    return Response(
+        content=b"".join(parts),
+        media_type=f"multipart/mixed; boundary={boundary}",
+        headers={"X-Missing-Cameras": ",".join(missing), "Cache-Control": "no-store"},
+    )
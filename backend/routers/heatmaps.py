@@ -0,0 +1,49 @@
+# backend/routers/heatmaps.py
+from typing import Literal, Optional
+
+import cv2
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from backend.services.camera_manager import get_latest
+from backend.services.heatmaps import heatmap_json, heatmaps, render_png
+
+router = APIRouter()
+
+
+@router.get("/heatmaps")
+def list_heatmaps():
+    """Kameras, für die eine Heatmap vorliegt"""
+    return heatmaps.cameras()
+
+
+@router.get("/heatmaps/{camera_id}")
+def get_heatmap(
+    camera_id: int,
+    format: Literal["json", "png"] = "json",
+    width: int = Query(640, ge=32, le=1920, description="PNG-Breite in px (ohne overlay)"),
+    overlay: bool = Query(False, description="PNG über das letzte Kamerabild legen"),
+):
+    """Belegungs-Heatmap (Sekunden Aufenthalt pro Zelle, abgeklungen) als Raster oder PNG"""
+    heatmap = heatmaps.get(camera_id)
+    if heatmap is None:
+        raise HTTPException(404, "No heatmap for this camera")
+    if format == "json":
+        return heatmap_json(camera_id, heatmap)
+
+    background: Optional[np.ndarray] = None
+    if overlay:
+        jpeg = get_latest(camera_id)
+        if jpeg is None:
+            raise HTTPException(404, "No frame available for overlay")
+        background = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return Response(content=render_png(heatmap.snapshot(), width, background),
+                    media_type="image/png", headers={"Cache-Control": "no-store"})
+
+
+@router.delete("/heatmaps/{camera_id}")
+def reset_heatmap(camera_id: int):
+    """Heatmap einer Kamera zurücksetzen (z.B. vor einem neuen Spiel)"""
+    if not heatmaps.reset(camera_id):
+        raise HTTPException(404, "No heatmap for this camera")
+    return {"cameraId": camera_id, "reset": True}
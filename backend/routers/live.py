@@ -1,15 +1,74 @@
 # backend/routers/live.py
+import asyncio
+from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from backend.services.live_ws import hub
+from backend.services.fmp4_live import fmp4_hub
 
 router = APIRouter()
 
 @router.websocket("/ws/live")
-async def ws_live(ws: WebSocket, session_id: int = Query(...)):
-    await hub.connect(ws)
+async def ws_live(
+    ws: WebSocket,
+    session_id: Optional[int] = Query(None),
+    camera_id: Optional[int] = Query(None),
+    format: str = Query("json", description="json | binary (VSL1, siehe services/live_codec.py)"),
+):
+    # Ohne Filter bekommt der Client alles, sonst nur seine Session/Kamera
+    await hub.connect(ws, session_id=session_id, camera_id=camera_id, binary=(format == "binary"))
     try:
         while True:
             # Optional: Pong/Ping lesen, falls das Frontend was sendet
             await ws.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         await hub.disconnect(ws)
+
+@router.get("/api/live/clients")
+def live_clients():
+    """Pro Client: Queue-Tiefe, Lag und verworfene Nachrichten."""
+    clients = hub.stats()
+    return {"count": len(clients), "clients": clients}
+
+@router.websocket("/ws/fmp4/{camera_id}")
+async def ws_fmp4(ws: WebSocket, camera_id: int):
+    """
+    H.264/fMP4 für MSE: zuerst {"mime": ...} als Text, dann Init-Segment,
+    danach Media-Segmente als Binärnachrichten. Encoder läuft nur mit Viewern.
+    """
+    await ws.accept()
+    if not fmp4_hub.available():
+        await ws.close(code=1011, reason="fMP4 output not available (ffmpeg missing or disabled)")
+        return
+
+    viewer = fmp4_hub.subscribe(camera_id)
+    pump = None
+    try:
+        init = await fmp4_hub.wait_init(camera_id)
+        if init is None:
+            await ws.close(code=1011, reason="No frames from camera")
+            return
+        mime, init_segment = init
+        await ws.send_json({"mime": mime})
+        await ws.send_bytes(init_segment)
+
+        async def _pump():
+            while True:
+                await ws.send_bytes(await viewer.next_segment())
+
+        pump = asyncio.create_task(_pump())
+        while True:
+            # Nur um den Disconnect mitzubekommen
+            await ws.receive_text()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        if pump is not None:
+            pump.cancel()
+        fmp4_hub.unsubscribe(camera_id, viewer)
+
+@router.get("/api/live/fmp4")
+def fmp4_status():
+    """Aktive fMP4-Encoder und Viewer pro Kamera."""
+    return {"available": fmp4_hub.available(), "cameras": fmp4_hub.stats()}
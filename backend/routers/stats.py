@@ -1,247 +1,289 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from collections import Counter
+from typing import List, Literal, Optional, Dict, Any, Tuple
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.settings import settings
+from backend.db_async import AsyncSessionLocal, get_async_db
+from backend.models import ZONE_MODEL_TYPE, DetectionEvent, DetectionPatternHour, DetectionRollupHour
+from backend.schemas import ModelFilter
+from backend.services.camera_cache import camera_cache
+from backend.services.camera_manager import camera_running, worker_stats
+from backend.services.live_stats import MINUTE_SLOTS, SECOND_SLOTS, live_stats
+from backend.services.patterns import local_tz
+from backend.services.response_cache import response_cache
+from backend.services.sketches import detection_sketches
 
-from fastapi import APIRouter, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+router = APIRouter()
 
-from backend.db_settings import SessionLocal
-from backend.models import DetectionEvent, Camera
 
-router = APIRouter()
+def _filter_rollup(query, rollup, model: str, class_name: str):
+    # 'all' = alle Detektionsmodelle; Zonen-Ereignisse nur bei expliziter Auswahl
+    if model != 'all':
+        query = query.where(rollup.model_type == model)
+    else:
+        query = query.where(rollup.model_type != ZONE_MODEL_TYPE)
+    if class_name != 'all':
+        query = query.where(rollup.class_name == class_name)
+    return query
+
+def _count_model(model: str):
+    return func.count().filter(DetectionEvent.model_type == model)
+
+async def _compute_summary() -> Dict[str, int]:
+    # ein Scan statt vier COUNT(*)-Abfragen
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(select(
+            # Zonen-Ereignisse sind keine Detektionen
+            func.count().filter(DetectionEvent.model_type.is_distinct_from(ZONE_MODEL_TYPE)).label("total"),
+            _count_model("objectDetection").label("objects"),
+            _count_model("segmentation").label("segmentations"),
+            _count_model("pose").label("poses"),
+        ).select_from(DetectionEvent))).one()
+    return {
+        "totalDetections": row.total,
+        "objectDetections": row.objects,
+        "segmentations": row.segmentations,
+        "poseEstimations": row.poses,
+    }
 
 @router.get("")
 async def get_detection_stats_summary():
-    db: Session = SessionLocal()
-    try:
-        stats = {
-            "totalDetections": db.query(func.count(DetectionEvent.id)).scalar(),
-            "objectDetections": db.query(func.count(DetectionEvent.id))
-                                  .filter(DetectionEvent.model_type == "objectDetection").scalar(),
-            "segmentations": db.query(func.count(DetectionEvent.id))
-                                  .filter(DetectionEvent.model_type == "segmentation").scalar(),
-            "poseEstimations": db.query(func.count(DetectionEvent.id))
-                                  .filter(DetectionEvent.model_type == "pose").scalar(),
-        }
-        return stats
-    finally:
-        db.close()
+    # Session nur bei Cache-Miss (kein Pool-Checkout pro Dashboard-Aufruf)
+    return await response_cache.get_or_compute("stats", "summary", settings.STATS_SUMMARY_CACHE_TTL_S,
+                                               _compute_summary)
 
 
 @router.get("/classes")
-async def get_detection_classes(model: str):
-    db: Session = SessionLocal()
-    try:
-        query = db.query(DetectionEvent.class_name.distinct())
+async def get_detection_classes(model: ModelFilter):
+    async def compute() -> List[str]:
+        query = select(DetectionEvent.class_name.distinct())
         if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        classes = query.all()
-        return [c[0] for c in classes if c[0]]
-    finally:
-        db.close()
+            query = query.where(DetectionEvent.model_type == model)
+        else:
+            query = query.where(DetectionEvent.model_type.is_distinct_from(ZONE_MODEL_TYPE))
+        async with AsyncSessionLocal() as db:
+            classes = (await db.execute(query)).scalars().all()
+        return [c for c in classes if c]
+    return await response_cache.get_or_compute("stats", ("classes", model), settings.STATS_CLASSES_CACHE_TTL_S,
+                                               compute)
 
 
 @router.get("/daily")
-async def get_daily_detection_stats(model: str = 'all', class_name: str = 'all'):
-    db: Session = SessionLocal()
-    try:
-        today = datetime.utcnow().date()
-        tomorrow = today + timedelta(days=1)
-
-        query = db.query(
-            func.date_trunc('hour', DetectionEvent.timestamp).label('hour'),
-            func.count(DetectionEvent.id).label('count')
-        )
-        if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        if class_name != 'all':
-            query = query.filter(DetectionEvent.class_name == class_name)
+async def get_daily_detection_stats(model: str = 'all', class_name: str = 'all',
+                                    db: AsyncSession = Depends(get_async_db)):
+    # asyncpg will für timestamptz echte (tz-bewusste) datetimes, kein date
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
 
-        hourly_stats = (query
-            .filter(DetectionEvent.timestamp >= today)
-            .filter(DetectionEvent.timestamp < tomorrow)
-            .group_by(func.date_trunc('hour', DetectionEvent.timestamp))
-            .order_by(func.date_trunc('hour', DetectionEvent.timestamp))
-            .all()
-        )
+    R = DetectionRollupHour
+    query = select(R.bucket.label('hour'), func.sum(R.count).label('count'))
+    query = _filter_rollup(query, R, model, class_name)
 
-        return [{"timestamp": stat.hour.isoformat(), "count": stat.count} for stat in hourly_stats]
-    finally:
-        db.close()
+    hourly_stats = (await db.execute(query
+        .where(R.bucket >= today)
+        .where(R.bucket < tomorrow)
+        .group_by(R.bucket)
+        .order_by(R.bucket)
+    )).all()
+
+    return [{"timestamp": stat.hour.isoformat(), "count": int(stat.count)} for stat in hourly_stats]
 
 
 @router.get("/weekly")
-async def get_weekly_detection_stats(model: str = 'all', class_name: str = 'all'):
-    db: Session = SessionLocal()
-    try:
-        week_ago = datetime.utcnow().date() - timedelta(days=7)
-
-        query = db.query(
-            func.date_trunc('day', DetectionEvent.timestamp).label('date'),
-            func.count(DetectionEvent.id).label('count')
-        )
-        if model != 'all':
-            query = query.filter(DetectionEvent.model_type == model)
-        if class_name != 'all':
-            query = query.filter(DetectionEvent.class_name == class_name)
+async def get_weekly_detection_stats(model: str = 'all', class_name: str = 'all',
+                                     db: AsyncSession = Depends(get_async_db)):
+    week_ago = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=7)
 
-        daily_stats = (query
-            .filter(DetectionEvent.timestamp >= week_ago)
-            .group_by(func.date_trunc('day', DetectionEvent.timestamp))
-            .order_by(func.date_trunc('day', DetectionEvent.timestamp))
-            .all()
-        )
+    R = DetectionRollupHour
+    day = func.date_trunc('day', R.bucket)
+    query = select(day.label('date'), func.sum(R.count).label('count'))
+    query = _filter_rollup(query, R, model, class_name)
 
-        return [{"date": stat.date.isoformat(), "count": stat.count} for stat in daily_stats]
-    finally:
-        db.close()
+    daily_stats = (await db.execute(query
+        .where(R.bucket >= week_ago)
+        .group_by(day)
+        .order_by(day)
+    )).all()
 
+    return [{"date": stat.date.isoformat(), "count": int(stat.count)} for stat in daily_stats]
+
+
+def real_time_view(threads_info: Dict[int, Any]) -> Dict[str, Any]:
+    # Aktive Kameras: eigene Worker + App-Context (wie im Original)
+    active_cameras = len(set(threads_info) | {cid for cid, running in camera_running.items() if running})
+    return {
+        "detectionRate": live_stats.detection_rate(),
+        "activeCameras": active_cameras,
+        "latestDetections": live_stats.latest(10),
+    }
 
 @router.get("/real-time")
 async def get_real_time_stats(request: Request):
-    """Get real-time detection statistics for the last hour"""
-    db: Session = SessionLocal()
-    try:
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-
-        minute_stats = db.query(
-            func.date_trunc('minute', DetectionEvent.timestamp).label('minute'),
-            func.count(DetectionEvent.id).label('count')
-        ).filter(
-            DetectionEvent.timestamp >= one_hour_ago
-        ).group_by(
-            func.date_trunc('minute', DetectionEvent.timestamp)
-        ).order_by(
-            func.date_trunc('minute', DetectionEvent.timestamp).desc()
-        ).limit(60).all()
-
-        # Aktive Kameras aus App-Context (wie im Original)
-        active_threads = getattr(request.app, 'camera_threads_info', {})
-        active_cameras = len(active_threads)
-
-        latest_detections = db.query(DetectionEvent).order_by(
-            DetectionEvent.timestamp.desc()
-        ).limit(10).all()
-
-        return {
-            "detectionRate": [{"time": stat.minute.isoformat(), "count": stat.count} for stat in minute_stats],
-            "activeCameras": active_cameras,
-            "latestDetections": [{
-                "id": d.id,
-                "model_type": d.model_type,
-                "class_name": d.class_name,
-                "camera_name": d.camera_name,
-                "timestamp": d.timestamp.isoformat()
-            } for d in latest_detections]
-        }
-    finally:
-        db.close()
+    """Get real-time detection statistics for the last hour (aus dem Speicher, ohne DB)"""
+    return real_time_view(getattr(request.app, 'camera_threads_info', {}))
+
+
+@router.get("/real-time/seconds")
+async def get_real_time_seconds(seconds: int = Query(60, ge=1, le=SECOND_SLOTS)):
+    """Detections pro Sekunde (lückenlos, älteste zuerst)"""
+    return live_stats.per_second(seconds)
+
+
+@router.get("/real-time/breakdown")
+async def get_real_time_breakdown(by: Literal["camera", "model", "class"] = "class",
+                                  window_s: int = Query(60, ge=1, le=MINUTE_SLOTS * 60)):
+    """Detections je Kamera/Modell/Klasse im gleitenden Fenster"""
+    counts = live_stats.breakdown(by, window_s)
+    return [{"key": k, "count": n} for k, n in sorted(counts.items(), key=lambda kv: -kv[1])]
+
+
+_SKETCH_GROUPS = {"camera": "camera_id", "model": "model_type", "class": "class_name"}
+
+@router.get("/confidence")
+async def get_confidence_stats(by: List[Literal["camera", "model", "class"]] = Query(["camera", "model", "class"]),
+                               camera_id: Optional[int] = None, model: str = 'all', class_name: str = 'all'):
+    """Konfidenz-Quantile (p50/p95/p99) und geschätzte Zahl eindeutiger Tracks, gruppiert nach by (Sketches)"""
+    return detection_sketches.summarize(tuple(_SKETCH_GROUPS[b] for b in dict.fromkeys(by)),
+                                        camera_id=camera_id, model=model, class_name=class_name)
 
 
 @router.get("/top-classes")
-async def get_top_classes(limit: int = 10, days: int = 7):
+async def get_top_classes(limit: int = 10, days: int = 7, db: AsyncSession = Depends(get_async_db)):
     """Get top detected classes over a specified period"""
-    db: Session = SessionLocal()
-    try:
-        since_date = datetime.utcnow() - timedelta(days=days)
-
-        top_classes = db.query(
-            DetectionEvent.class_name,
-            func.count(DetectionEvent.id).label('count')
-        ).filter(
-            DetectionEvent.timestamp >= since_date,
-            DetectionEvent.class_name.isnot(None)
-        ).group_by(
-            DetectionEvent.class_name
-        ).order_by(
-            func.count(DetectionEvent.id).desc()
-        ).limit(limit).all()
-
-        return [{
-            "class_name": class_name,
-            "count": count,
-            "percentage": 0  # Frontend berechnet Prozent
-        } for class_name, count in top_classes]
-    finally:
-        db.close()
-
+    since_date = datetime.now(timezone.utc) - timedelta(days=days)
+
+    # Stunden-Buckets: Zeitraum beginnt an der vollen Stunde von since_date
+    R = DetectionRollupHour
+    total = func.sum(R.count)
+    query = _filter_rollup(select(R.class_name, total.label('count')), R, 'all', 'all')
+    top_classes = (await db.execute(query.where(
+        R.bucket >= since_date.replace(minute=0, second=0, microsecond=0),
+        R.class_name != ''
+    ).group_by(
+        R.class_name
+    ).order_by(
+        total.desc()
+    ).limit(limit))).all()
+
+    return [{
+        "class_name": class_name,
+        "count": int(count),
+        "percentage": 0  # Frontend berechnet Prozent
+    } for class_name, count in top_classes]
+
+
+def _format_uptime(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+async def camera_performance_view(db: AsyncSession, threads_info: Dict[int, Any]) -> List[Dict[str, Any]]:
+    # Eine Abfrage für alle Kameras: Zählung aus den Stunden-Rollups, letzte Detection
+    # exakt per Index (camera_id, timestamp) – nur ab der letzten Rollup-Stunde, damit
+    # Postgres alle älteren Partitionen wegprunen kann.
+    R = DetectionRollupHour
+    per_camera = _filter_rollup(select(
+        R.camera_id,
+        func.sum(R.count).label('total'),
+        func.max(R.bucket).label('last_bucket'),
+    ), R, 'all', 'all').group_by(R.camera_id).subquery()
+    last_exact = select(func.max(DetectionEvent.timestamp)).where(
+        DetectionEvent.camera_id == per_camera.c.camera_id,
+        DetectionEvent.timestamp >= per_camera.c.last_bucket,
+        DetectionEvent.model_type.is_distinct_from(ZONE_MODEL_TYPE),
+    ).scalar_subquery()
+    rows = (await db.execute(select(
+        per_camera.c.camera_id,
+        per_camera.c.total,
+        func.coalesce(last_exact, per_camera.c.last_bucket).label('last_detection'),
+    ))).all()
+    by_camera = {r.camera_id: r for r in rows}
+
+    camera_stats = []
+    for camera in camera_cache.all():
+        row = by_camera.get(camera.id)
+        running = worker_stats(camera.id)
+        camera_stats.append({
+            "id": camera.id,
+            "name": camera.source_name,
+            "location": camera.location,
+            "detectionCount": int(row.total) if row else 0,
+            "lastDetection": row.last_detection.isoformat() if row and row.last_detection else None,
+            "isActive": running is not None or camera.id in threads_info,
+            "uptime": _format_uptime(running[0]) if running else "N/A",
+            "uptimeSeconds": round(running[0], 1) if running else None,
+            "fps": round(running[1], 1) if running else None,
+        })
+
+    return camera_stats
 
 @router.get("/camera-performance")
-async def get_camera_performance(request: Request):
+async def get_camera_performance(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get detection statistics per camera"""
-    db: Session = SessionLocal()
-    try:
-        cameras = db.query(Camera).all()
-        threads_info = getattr(request.app, 'camera_threads_info', {})
-
-        camera_stats = []
-        for camera in cameras:
-            detection_count = db.query(func.count(DetectionEvent.id)).filter(
-                DetectionEvent.camera_id == camera.id
-            ).scalar()
-
-            last_detection = db.query(DetectionEvent.timestamp).filter(
-                DetectionEvent.camera_id == camera.id
-            ).order_by(DetectionEvent.timestamp.desc()).first()
-
-            is_active = camera.id in threads_info
-
-            camera_stats.append({
-                "id": camera.id,
-                "name": camera.source_name,
-                "location": camera.location,
-                "detectionCount": detection_count,
-                "lastDetection": last_detection[0].isoformat() if last_detection else None,
-                "isActive": is_active,
-                "uptime": "N/A"
-            })
-
-        return camera_stats
-    finally:
-        db.close()
+    return await camera_performance_view(db, getattr(request.app, 'camera_threads_info', {}))
+
+
+def _filter_pattern(query, model: str, class_name: str, camera_id: Optional[int]):
+    query = _filter_rollup(query, DetectionPatternHour, model, class_name)
+    if camera_id is not None:
+        query = query.where(DetectionPatternHour.camera_id == camera_id)
+    return query
+
+async def _pattern_days(db: AsyncSession, days: int) -> Tuple[List[date], datetime]:
+    """Lokale Tage im Fenster, die tatsächlich erfasst sind (ab dem ersten Tag mit Daten), und jetzt in Ortszeit."""
+    now_local = datetime.now(local_tz())
+    today = now_local.date()
+    first_day = (await db.execute(select(func.min(DetectionPatternHour.day)))).scalar()
+    if first_day is None:
+        return [], now_local
+    start = max(today - timedelta(days=max(days, 1) - 1), first_day)
+    return [start + timedelta(days=i) for i in range((today - start).days + 1)], now_local
 
+def _average(total: int, occurrences: int) -> float:
+    return round(total / occurrences, 2) if occurrences else 0.0
 
 @router.get("/hourly-pattern")
-async def get_hourly_pattern(days: int = 30):
-    """Get average detection patterns by hour of day"""
-    db: Session = SessionLocal()
-    try:
-        since_date = datetime.utcnow() - timedelta(days=days)
-
-        hourly_avg = db.query(
-            func.extract('hour', DetectionEvent.timestamp).label('hour'),
-            func.count(DetectionEvent.id).label('total_count')
-        ).filter(
-            DetectionEvent.timestamp >= since_date
-        ).group_by(
-            func.extract('hour', DetectionEvent.timestamp)
-        ).order_by(
-            func.extract('hour', DetectionEvent.timestamp)
-        ).all()
-
-        hourly_pattern = []
-        for hour, total_count in hourly_avg:
-            avg_count = total_count / days
-            hourly_pattern.append({"hour": int(hour), "avgCount": round(avg_count, 2)})
-
-        return hourly_pattern
-    finally:
-        db.close()
+async def get_hourly_pattern(days: int = 30, model: str = 'all', class_name: str = 'all',
+                             camera_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """Durchschnittliche Detections je Stunde (Ortszeit PATTERN_TIMEZONE), geteilt durch die erfassten Tage"""
+    covered, now_local = await _pattern_days(db, days)
+    if not covered:
+        return []
+
+    P = DetectionPatternHour
+    query = select(P.hour, func.sum(P.count)).where(P.day >= covered[0]).group_by(P.hour)
+    totals = dict((await db.execute(_filter_pattern(query, model, class_name, camera_id))).all())
+
+    # heutige Stunden, die noch kommen, zählen nicht als erfasst
+    return [{"hour": hour, "avgCount": _average(int(totals.get(hour, 0)), len(covered) - (hour > now_local.hour))}
+            for hour in range(24)]
+
+@router.get("/weekday-pattern")
+async def get_weekday_pattern(days: int = 28, model: str = 'all', class_name: str = 'all',
+                              camera_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """Durchschnitt je Wochentag (0 = Montag) und Stunde in Ortszeit, 7 × 24 Werte"""
+    covered, now_local = await _pattern_days(db, days)
+    if not covered:
+        return []
+
+    P = DetectionPatternHour
+    weekday = func.extract('isodow', P.day)
+    query = select(weekday, P.hour, func.sum(P.count)).where(P.day >= covered[0]).group_by(weekday, P.hour)
+    totals = {(int(dow) - 1, hour): int(n)
+              for dow, hour, n in (await db.execute(_filter_pattern(query, model, class_name, camera_id))).all()}
+
+    occurrences: Counter = Counter()
+    for day in covered:
+        last_hour = now_local.hour if day == now_local.date() else 23
+        occurrences.update((day.weekday(), hour) for hour in range(last_hour + 1))
+    return [{"weekday": wd, "hour": hour, "avgCount": _average(totals.get((wd, hour), 0), occurrences[(wd, hour)])}
+            for wd in range(7) for hour in range(24)]
 
 @router.get("/summary")
 async def stats_summary():
-    """Aggregierte Kennzahlen für das Dashboard (Alias für 'summary')."""
-    db = SessionLocal()
-    try:
-        total = db.query(func.count(DetectionEvent.id)).scalar() or 0
-        obj   = db.query(func.count(DetectionEvent.id)).filter(DetectionEvent.model_type == "objectDetection").scalar() or 0
-        seg   = db.query(func.count(DetectionEvent.id)).filter(DetectionEvent.model_type == "segmentation").scalar() or 0
-        pose  = db.query(func.count(DetectionEvent.id)).filter(DetectionEvent.model_type == "pose").scalar() or 0
-        return {
-            "totalDetections":     total,
-            "objectDetections":    obj,
-            "segmentations":       seg,
-            "poseEstimations":     pose,
-        }
-    finally:
-        db.close()
+    """Aggregierte Kennzahlen für das Dashboard (Alias für 'summary', gleicher Cache-Eintrag)."""
+    return await get_detection_stats_summary()
@@ -82,17 +82,15 @@ def stop_camera_stream(camera_id: int):
     if t:
         t.join(timeout=2.0)
 
-    cleanup(camera_id)
+    cleanup(camera_id, dec_metric=False)
     # Hinweis: metrics.active_cameras.dec() macht der Worker im finally.
     return {"message": f"Camera {camera_id} stopped"}
 
 @router.post("/start_webcam_stream")
 def start_all_live_cameras(req: ModelRequest):
     """Startet alle Kameras mit stream_type == 'live' (Registry → YOLO-Fallback)."""
-    # Adapter laden
     try:
         key = resolve_key_from_legacy(req.model_type)
-        adapter, resolved_key = load_adapter_by_key_safe(key, req.model_type)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Model loading failed: {e}")
 
@@ -103,9 +101,15 @@ def start_all_live_cameras(req: ModelRequest):
         db.close()
 
     started = []
+    resolved_key = key
     for cam in live_cams:
         if camera_running.get(cam.id):
             continue
+        # Adapter pro Kamera: der Tracker hält Zustand im Modell
+        try:
+            adapter, resolved_key = load_adapter_by_key_safe(key, req.model_type)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Model loading failed: {e}")
         frame_locks[cam.id] = threading.Lock()
         camera_running[cam.id] = True
         metrics.active_cameras.inc()
@@ -132,6 +136,6 @@ def stop_all_streams():
         t = camera_threads.get(cam_id)
         if t:
             t.join(timeout=2.0)
-        cleanup(cam_id)
+        cleanup(cam_id, dec_metric=False)
     # dec() pro Kamera macht der Worker im finally.
     return {"message": "All camera streams stopped"}
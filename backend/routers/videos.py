@@ -1,7 +1,8 @@
 import os, uuid, shutil, threading
 from typing import Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException, Response, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Response, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.services.video_manager import (
     uploads_dir, video_threads, video_running, video_locks,
@@ -9,7 +10,7 @@ from backend.services.video_manager import (
 )
 from backend.services.model_hub import resolve_key_from_legacy, load_adapter_by_key_safe
 from backend.workers.video_worker import run_video_job
-from backend.db_settings import SessionLocal
+from backend.db_async import get_async_db
 from backend.models import Camera
 from backend.monitoring.metrics import metrics
 
@@ -40,7 +41,7 @@ async def upload_video(file: UploadFile = File(...)):
     return {"job_id": job_id, "file_path": dest_path}
 
 @router.post("/videos/analyze", status_code=status.HTTP_202_ACCEPTED)
-async def analyze_video(req: AnalyzeRequest):
+async def analyze_video(req: AnalyzeRequest, db: AsyncSession = Depends(get_async_db)):
     """Startet die Analyse des hochgeladenen Videos. Nutzt Registry → YOLO-Fallback bei Bedarf."""
     # Datei finden
     candidates = [os.path.join(uploads_dir, f) for f in os.listdir(uploads_dir) if f.startswith(f"{req.job_id}_")]
@@ -51,14 +52,10 @@ async def analyze_video(req: AnalyzeRequest):
     # Kamera-Kontext prüfen (optional)
     cam_id: int | None = None
     if req.camera_id is not None:
-        db = SessionLocal()
-        try:
-            cam = db.query(Camera).filter(Camera.id == req.camera_id).first()
-            if not cam:
-                raise HTTPException(404, "Camera not found")
-            cam_id = cam.id
-        finally:
-            db.close()
+        cam = await db.get(Camera, req.camera_id)
+        if not cam:
+            raise HTTPException(404, "Camera not found")
+        cam_id = cam.id
 
     # Adapter über Registry laden — mit automatischem YOLO-Fallback
     try:
@@ -0,0 +1,74 @@
+# backend/routers/zones.py
+from fastapi import APIRouter, HTTPException
+
+from backend.db_settings import SessionLocal
+from backend.models import CameraZone
+from backend.schemas import ZoneCreate
+from backend.services.camera_cache import camera_cache
+from backend.services.zones import ZoneInfo, zone_engine
+
+router = APIRouter()
+
+MAX_POLYGON_POINTS = 64
+
+
+def _reload(db, camera_id: int) -> None:
+    rows = db.query(CameraZone).filter(CameraZone.camera_id == camera_id).order_by(CameraZone.id).all()
+    zone_engine.set_zones(camera_id, [ZoneInfo.from_model(z) for z in rows])
+
+
+@router.get("/cameras/{camera_id}/zones")
+def list_zones(camera_id: int):
+    return [z.to_dict() for z in zone_engine.zones(camera_id)]
+
+
+@router.post("/cameras/{camera_id}/zones", status_code=201)
+def create_zone(camera_id: int, zone: ZoneCreate):
+    """Zone (Polygon, ≥ 3 Punkte) oder Zähllinie (2 Punkte) anlegen; Koordinaten normiert 0..1"""
+    if camera_cache.get(camera_id) is None:
+        raise HTTPException(404, "Camera not found")
+    if any(len(p) != 2 or not (0 <= p[0] <= 1 and 0 <= p[1] <= 1) for p in zone.points):
+        raise HTTPException(400, "points must be [x, y] pairs normalized to 0..1")
+    if zone.kind == "line" and len(zone.points) != 2:
+        raise HTTPException(400, "A line needs exactly 2 points")
+    if zone.kind == "zone" and not 3 <= len(zone.points) <= MAX_POLYGON_POINTS:
+        raise HTTPException(400, f"A zone needs 3 to {MAX_POLYGON_POINTS} points")
+
+    db = SessionLocal()
+    try:
+        row = CameraZone(
+            camera_id=camera_id,
+            name=zone.name,
+            kind=zone.kind,
+            points=zone.points,
+            classes=",".join(zone.classes) if zone.classes else None,
+            dwell_alert_s=zone.dwell_alert_s if zone.kind == "zone" else None,
+        )
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        _reload(db, camera_id)
+        return ZoneInfo.from_model(row).to_dict()
+    finally:
+        db.close()
+
+
+@router.delete("/cameras/{camera_id}/zones/{zone_id}")
+def delete_zone(camera_id: int, zone_id: int):
+    db = SessionLocal()
+    try:
+        row = db.query(CameraZone).filter(CameraZone.id == zone_id, CameraZone.camera_id == camera_id).first()
+        if row is None:
+            raise HTTPException(404, "Zone not found")
+        db.delete(row)
+        db.commit()
+        _reload(db, camera_id)
+        return {"id": zone_id, "deleted": True}
+    finally:
+        db.close()
+
+
+@router.get("/cameras/{camera_id}/zones/counts")
+def zone_counts(camera_id: int):
+    """Zähler seit Prozessstart (enter/exit/dwell bzw. in/out) und aktuelle Belegung"""
+    return zone_engine.counts(camera_id)
@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
+
+# Modellfilter gecachter Statistik-Endpoints: feste Werte, damit Cache-Schlüssel begrenzt bleiben
+ModelFilter = Literal["all", "objectDetection", "segmentation", "pose"]
 
 class CameraCreate(BaseModel):
     source_name: str
@@ -8,4 +11,11 @@ class CameraCreate(BaseModel):
     location: Optional[str] = None
 
     class Config:
-        from_attributes = True  # For SQLAlchemy compatibility 
\ No newline at end of file
+        from_attributes = True  # For SQLAlchemy compatibility 
+
+class ZoneCreate(BaseModel):
+    name: str = Field(..., min_length=1)
+    kind: Literal["zone", "line"] = "zone"
+    points: List[List[float]] = Field(..., description="[[x, y], ...] normiert 0..1; Linie: genau 2 Punkte")
+    classes: Optional[List[str]] = None  # None = alle Klassen
+    dwell_alert_s: Optional[float] = Field(None, gt=0)
@@ -0,0 +1,105 @@
+# backend/services/camera_cache.py
+"""
+Prozessweiter Cache der Kamera-Stammdaten (id → Name, Stream, Ort, ...).
+
+- beim Start einmal komplett geladen (load())
+- Write-Through aus create_camera/delete_camera (upsert()/remove())
+- Versionszähler, damit abgeleitete Caches erkennen, ob sich etwas geändert hat
+- kurzer TTL als Sicherheitsnetz bei mehreren Prozessen (Änderungen aus einem
+  anderen Worker-Prozess sind spätestens nach CAMERA_CACHE_TTL_S sichtbar)
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.core.settings import settings
+from backend.db_settings import SessionLocal
+from backend.models import Camera
+
+log = logging.getLogger("app")
+
+
+@dataclass(frozen=True)
+class CameraInfo:
+    id: int
+    source_name: str
+    stream_type: Optional[str]
+    stream: Optional[str]
+    location: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, cam: Camera) -> "CameraInfo":
+        return cls(cam.id, cam.source_name, cam.stream_type, cam.stream, cam.location, cam.created_at)
+
+
+class CameraCache:
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CameraInfo] = {}
+        self._loaded_at: Optional[float] = None
+        self.version = 0
+
+    def load(self) -> None:
+        """Komplette Tabelle neu einlesen (Start, TTL abgelaufen)."""
+        db = SessionLocal()
+        try:
+            cams = {c.id: CameraInfo.from_model(c) for c in db.query(Camera).all()}
+        finally:
+            db.close()
+        with self._lock:
+            if cams != self._by_id:
+                self.version += 1
+            self._by_id = cams
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl_s:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            # DB kurz weg → mit dem alten Stand weiterarbeiten
+            log.warning("Camera cache refresh failed: %s", e)
+            if loaded_at is not None:
+                self._loaded_at = time.monotonic()
+
+    # ----------------------- Lesen -----------------------
+
+    def get(self, camera_id: int) -> Optional[CameraInfo]:
+        self._ensure_fresh()
+        return self._by_id.get(camera_id)
+
+    def name(self, camera_id: int) -> str:
+        cam = self.get(camera_id)
+        return cam.source_name if cam else f"Camera {camera_id}"
+
+    def all(self) -> List[CameraInfo]:
+        self._ensure_fresh()
+        return sorted(self._by_id.values(), key=lambda c: c.id)
+
+    # ----------------------- Write-Through -----------------------
+
+    def upsert(self, cam: Camera) -> None:
+        info = CameraInfo.from_model(cam)
+        with self._lock:
+            self._by_id = {**self._by_id, info.id: info}
+            self.version += 1
+
+    def remove(self, camera_id: int) -> None:
+        with self._lock:
+            if camera_id in self._by_id:
+                self._by_id = {k: v for k, v in self._by_id.items() if k != camera_id}
+                self.version += 1
+
+    def invalidate(self) -> None:
+        """Beim nächsten Zugriff neu laden (z.B. nach /init-db)."""
+        self._loaded_at = None
+
+
+camera_cache = CameraCache(ttl_s=settings.CAMERA_CACHE_TTL_S)
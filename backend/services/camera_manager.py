@@ -1,7 +1,8 @@
 import cv2
 import threading
+import time
 from threading import Lock
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 import numpy as np  # optional für Platzhalter-Frame
 from backend.monitoring.metrics import metrics
 
@@ -20,12 +21,21 @@ def set_placeholder_frame(camera_id: int, text: str = "Starting...", w: int = 32
 video_captures: Dict[int, cv2.VideoCapture] = {}
 # Letztes JPEG pro Kamera
 latest_frames: Dict[int, bytes] = {}
+# (Sequenznummer, Zeitstempel) zum letzten JPEG pro Kamera
+frame_meta: Dict[int, Tuple[int, float]] = {}
+# Verkleinerte Vorschau pro Kamera: (seq, width, jpeg) – wird lazy beim Abruf gebaut
+thumbnails: Dict[int, Tuple[int, int, bytes]] = {}
 # Locks pro Kamera für Frames/State
 frame_locks: Dict[int, Lock] = {}
 # Worker-Threads
 camera_threads: Dict[int, threading.Thread] = {}
 # Laufstatus pro Kamera
 camera_running: Dict[int, bool] = {}
+# Worker-Startzeit (monotonic) und gleitende FPS (fps, letzter Frame) pro Kamera – für Statistiken
+worker_started: Dict[int, float] = {}
+worker_fps: Dict[int, Tuple[float, float]] = {}
+FPS_SMOOTHING = 0.1
+FPS_STALE_S = 5.0  # so lange kein Frame → FPS 0
 
 # ----------------------- Helper / API für andere Module -----------------------
 
@@ -50,6 +60,34 @@ def ensure_lock(camera_id: int) -> Lock:
         lock = frame_locks[camera_id]
     return lock
 
+# ----------------------- Worker-Kennzahlen -----------------------
+
+def mark_started(camera_id: int) -> None:
+    """Vom Worker aufgerufen, sobald die Quelle offen ist."""
+    worker_started[camera_id] = time.monotonic()
+    worker_fps.pop(camera_id, None)
+
+def record_frame(camera_id: int) -> None:
+    """Pro gelesenem Frame: FPS als exponentiell geglätteter Kehrwert des Frame-Abstands."""
+    now = time.monotonic()
+    prev = worker_fps.get(camera_id)
+    if prev is None:
+        worker_fps[camera_id] = (0.0, now)
+        return
+    dt = now - prev[1]
+    inst = 1.0 / dt if dt > 0 else prev[0]
+    fps = inst if prev[0] == 0.0 else prev[0] + FPS_SMOOTHING * (inst - prev[0])
+    worker_fps[camera_id] = (fps, now)
+
+def worker_stats(camera_id: int) -> Optional[Tuple[float, float]]:
+    """(Uptime in s, aktuelle FPS) eines laufenden Workers, sonst None."""
+    started = worker_started.get(camera_id)
+    if started is None or not is_running(camera_id):
+        return None
+    now = time.monotonic()
+    fps, last = worker_fps.get(camera_id, (0.0, now))
+    return now - started, (fps if now - last <= FPS_STALE_S else 0.0)
+
 # ----------------------- Frame Zugriff -----------------------
 
 def set_latest(camera_id: int, jpeg_bytes: bytes) -> None:
@@ -60,6 +98,8 @@ def set_latest(camera_id: int, jpeg_bytes: bytes) -> None:
     lock = ensure_lock(camera_id)
     with lock:
         latest_frames[camera_id] = jpeg_bytes
+        seq = frame_meta.get(camera_id, (0, 0.0))[0] + 1
+        frame_meta[camera_id] = (seq, time.time())
 
 def get_latest(camera_id: int) -> Optional[bytes]:
     """
@@ -72,6 +112,39 @@ def get_latest(camera_id: int) -> Optional[bytes]:
     with lock:
         return latest_frames.get(camera_id)
 
+def get_latest_many(camera_ids: Iterable[int]) -> Dict[int, Tuple[bytes, int, float]]:
+    """
+    Schnappschuss mehrerer Kameras in einem Durchlauf: {camera_id: (jpeg, seq, ts)}.
+    Pro Kamera nur ein kurzer Lock; JPEG-Bytes sind unveränderlich, es wird nichts kopiert.
+    """
+    snapshot: Dict[int, Tuple[bytes, int, float]] = {}
+    for camera_id in camera_ids:
+        lock = frame_locks.get(camera_id)
+        if not lock:
+            continue
+        with lock:
+            data = latest_frames.get(camera_id)
+            meta = frame_meta.get(camera_id)
+        if data is not None and meta is not None:
+            snapshot[camera_id] = (data, meta[0], meta[1])
+    return snapshot
+
+def get_thumbnail(camera_id: int, jpeg_bytes: bytes, seq: int, width: int) -> bytes:
+    """Verkleinertes JPEG zu (camera_id, seq); pro Frame höchstens einmal berechnet."""
+    cached = thumbnails.get(camera_id)
+    if cached is not None and cached[0] == seq and cached[1] == width:
+        return cached[2]
+    img = cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return jpeg_bytes
+    h, w = img.shape[:2]
+    if w > width:
+        img = cv2.resize(img, (width, max(1, h * width // w)), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 75])
+    thumb = buf.tobytes() if ok else jpeg_bytes
+    thumbnails[camera_id] = (seq, width, thumb)
+    return thumb
+
 # ----------------------- Optional: Warm-up Platzhalter -----------------------
 
 def set_placeholder_frame(camera_id: int, width: int = 320, height: int = 240, text: str = "Starting...") -> None:
@@ -109,7 +182,11 @@ def cleanup(camera_id: int, dec_metric: bool = True) -> None:
     thread = camera_threads.pop(camera_id, None)
     frame_locks.pop(camera_id, None)
     latest_frames.pop(camera_id, None)
+    frame_meta.pop(camera_id, None)
+    thumbnails.pop(camera_id, None)
     camera_running.pop(camera_id, None)
+    worker_started.pop(camera_id, None)
+    worker_fps.pop(camera_id, None)
 
     # Metriken
     metrics.camera_status.labels(camera_id=str(camera_id), camera_name="").set(0)
@@ -0,0 +1,216 @@
+# backend/services/clip_recorder.py
+"""
+Pre-/Post-Event-Clips aus einem Ringpuffer bereits encodierter JPEG-Frames.
+
+Der Kamera-Worker legt jedes annotierte JPEG (das er ohnehin für /process_frame
+erzeugt) per push() ab. trigger() reserviert beim Event einen Clip-Pfad und plant
+einen Schreibjob, der nach CLIP_POST_SECONDS die Frames [t - pre, t + post] als
+MJPEG-AVI auf die Platte schreibt – ohne Decode/Re-Encode.
+"""
+import heapq
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from backend.core.settings import settings
+
+log = logging.getLogger("app")
+
+
+class EncodedRingBuffer:
+    """Letzte Frames (ts, jpeg) einer Kamera, begrenzt über Zeitfenster UND Bytes."""
+    def __init__(self, max_seconds: float, max_bytes: int):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self._frames: Deque[Tuple[float, bytes]] = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def append(self, ts: float, data: bytes) -> None:
+        with self._lock:
+            self._frames.append((ts, data))
+            self._bytes += len(data)
+            horizon = ts - self.max_seconds
+            while self._frames and (self._frames[0][0] < horizon or self._bytes > self.max_bytes):
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+
+    def window(self, start_ts: float, end_ts: float) -> List[Tuple[float, bytes]]:
+        with self._lock:
+            return [(ts, data) for ts, data in self._frames if start_ts <= ts <= end_ts]
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+@dataclass(order=True)
+class _ClipJob:
+    due: float
+    camera_id: int = field(compare=False)
+    start_ts: float = field(compare=False)
+    end_ts: float = field(compare=False)
+    path: str = field(compare=False)
+    buffer: EncodedRingBuffer = field(compare=False)   # hält den Puffer, bis der Clip geschrieben ist
+
+
+class ClipRecorder:
+    def __init__(self, clips_dir: str, pre_s: float, post_s: float, max_bytes_per_camera: int):
+        self.clips_dir = clips_dir
+        self.pre_s = pre_s
+        self.post_s = post_s
+        self.max_bytes = max_bytes_per_camera
+        self._buffers: Dict[int, EncodedRingBuffer] = {}
+        self._pending: List[_ClipJob] = []           # Heap nach Fälligkeit
+        self._open_job: Dict[int, _ClipJob] = {}     # letzter noch offener Job pro Kamera
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----------------------- Worker-Seite -----------------------
+
+    def push(self, camera_id: int, jpeg_bytes: bytes, ts: Optional[float] = None) -> None:
+        buf = self._buffers.get(camera_id)
+        if buf is None:
+            # Puffer muss bei Fälligkeit (t + post) noch bis t - pre zurückreichen
+            buf = self._buffers.setdefault(
+                camera_id, EncodedRingBuffer(self.pre_s + self.post_s + 1.0, self.max_bytes)
+            )
+        buf.append(time.time() if ts is None else ts, jpeg_bytes)
+
+    def trigger(self, camera_id: int, label: str, ts: Optional[float] = None) -> Optional[str]:
+        """Plant einen Clip um ts und gibt dessen (künftigen) Pfad zurück.
+        Events, die in ein noch offenes Clip-Fenster fallen, teilen sich den Clip."""
+        buf = self._buffers.get(camera_id)
+        if buf is None:
+            return None
+        ts = time.time() if ts is None else ts
+        with self._cv:
+            job = self._open_job.get(camera_id)
+            if job is not None and job.start_ts <= ts <= job.end_ts:
+                return job.path
+
+            stamp = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%dT%H%M%S")
+            safe_label = "".join(ch if ch.isalnum() else "-" for ch in label)[:32]
+            path = os.path.join(
+                self.clips_dir, f"camera_{camera_id}",
+                f"{stamp}_{safe_label}_{uuid.uuid4().hex[:8]}.avi",
+            )
+            job = _ClipJob(ts + self.post_s, camera_id, ts - self.pre_s, ts + self.post_s, path, buf)
+            heapq.heappush(self._pending, job)
+            self._open_job[camera_id] = job
+            self._ensure_thread()
+            self._cv.notify()
+        return path
+
+    def drop(self, camera_id: int) -> None:
+        """Puffer freigeben (Kamera gestoppt/neu gestartet). Bereits geplante Clips werden noch
+        aus ihrem Puffer geschrieben, der danach wegfällt; ein Neustart beginnt mit leerem Puffer."""
+        with self._cv:
+            self._buffers.pop(camera_id, None)
+            self._open_job.pop(camera_id, None)
+
+    # ----------------------- Hintergrund-Job -----------------------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="clip-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not self._pending or self._pending[0].due > time.time():
+                    timeout = None if not self._pending else self._pending[0].due - time.time()
+                    self._cv.wait(timeout)
+                job = heapq.heappop(self._pending)
+                if self._open_job.get(job.camera_id) is job:
+                    self._open_job.pop(job.camera_id, None)
+            try:
+                frames = job.buffer.window(job.start_ts, job.end_ts)
+                if frames:
+                    write_mjpeg_avi(job.path, frames)
+                else:
+                    log.warning("Clip %s: no frames buffered", job.path)
+            except Exception as e:
+                log.error("Clip %s could not be written: %s", job.path, e)
+            job = frames = None   # beim Warten keine Referenz auf Puffer/Frames einer gestoppten Kamera halten
+
+
+# ----------------------- MJPEG-AVI (RIFF) ohne Re-Encode -----------------------
+
+def _jpeg_size(data: bytes) -> Tuple[int, int]:
+    """(width, height) aus dem SOF-Marker eines JPEG lesen."""
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return 0, 0
+
+def _chunk(fourcc: bytes, payload: bytes) -> bytes:
+    pad = b"\0" if len(payload) % 2 else b""
+    return fourcc + struct.pack("<I", len(payload)) + payload + pad
+
+def _list(kind: bytes, payload: bytes) -> bytes:
+    return _chunk(b"LIST", kind + payload)
+
+def write_mjpeg_avi(path: str, frames: List[Tuple[float, bytes]]) -> None:
+    """Schreibt (ts, jpeg)-Frames 1:1 als Motion-JPEG in einen AVI-Container."""
+    n = len(frames)
+    width, height = _jpeg_size(frames[0][1])
+    span = frames[-1][0] - frames[0][0]
+    fps = (n - 1) / span if n > 1 and span > 0 else 25.0
+    usec_per_frame = int(1_000_000 / fps)
+    max_frame = max(len(f) for _, f in frames)
+
+    avih = struct.pack(
+        "<14I", usec_per_frame, int(max_frame * fps), 0, 0x10, n, 0, 1,
+        max_frame, width, height, 0, 0, 0, 0,
+    )
+    strh = struct.pack(
+        "<4s4sIHHIIIIIIII4h", b"vids", b"MJPG", 0, 0, 0, 0,
+        1000, int(fps * 1000), 0, n, max_frame, 0xFFFFFFFF, 0, 0, 0, width, height,
+    )
+    strf = struct.pack("<IiiHH4sIiiII", 40, width, height, 1, 24, b"MJPG", width * height * 3, 0, 0, 0, 0)
+    hdrl = _list(b"hdrl", _chunk(b"avih", avih) + _list(b"strl", _chunk(b"strh", strh) + _chunk(b"strf", strf)))
+
+    movi_parts: List[bytes] = []
+    index: List[bytes] = []
+    offset = 4  # relativ zum 'movi'-FourCC
+    for _, data in frames:
+        chunk = _chunk(b"00dc", data)
+        index.append(struct.pack("<4sIII", b"00dc", 0x10, offset, len(data)))
+        movi_parts.append(chunk)
+        offset += len(chunk)
+    movi = _list(b"movi", b"".join(movi_parts))
+    idx1 = _chunk(b"idx1", b"".join(index))
+
+    body = b"AVI " + hdrl + movi + idx1
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.part"
+    with open(tmp, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+    os.replace(tmp, path)
+
+
+clip_recorder = ClipRecorder(
+    clips_dir=settings.CLIPS_DIR,
+    pre_s=settings.CLIP_PRE_SECONDS,
+    post_s=settings.CLIP_POST_SECONDS,
+    max_bytes_per_camera=settings.CLIP_BUFFER_MAX_MB * 1024 * 1024,
+)
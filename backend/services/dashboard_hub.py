@@ -0,0 +1,139 @@
+# backend/services/dashboard_hub.py
+"""
+Push-Kanal für Dashboard-Statistiken (SSE).
+
+Views (summary, realTime, daily, ...) werden mit eigener Aktualisierungsperiode
+registriert. Ein einziger Loop – läuft nur, solange jemand abonniert hat –
+berechnet jede fällige View EINMAL pro Tick (modellabhängige Views einmal pro
+abonniertem Modell) und schickt nur geänderte Views an alle Abonnenten.
+
+Pro Abonnent gibt es genau ein "pending"-Dict: neue Deltas werden hineingemischt,
+ein langsamer Client bekommt also beim nächsten Senden den jüngsten Stand und
+verliert nichts.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.monitoring.metrics import metrics
+
+log = logging.getLogger("app")
+
+ViewFn = Callable[[str], Awaitable[Any]]   # fn(model) → JSON-fähige Daten
+
+
+@dataclass
+class _View:
+    fn: ViewFn
+    period_s: float
+    per_model: bool
+
+
+@dataclass
+class _Subscriber:
+    id: int
+    model: str
+    pending: Dict[str, Any] = field(default_factory=dict)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def offer(self, delta: Dict[str, Any]) -> None:
+        self.pending.update(delta)
+        self.wakeup.set()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+class DashboardHub:
+    def __init__(self, tick_s: float, keepalive_s: float):
+        self.tick_s = tick_s
+        self.keepalive_s = keepalive_s
+        self._views: Dict[str, _View] = {}
+        # (view, model | None) → (berechnet um, JSON, Daten)
+        self._values: Dict[Tuple[str, Optional[str]], Tuple[float, str, Any]] = {}
+        self._subscribers: Dict[int, _Subscriber] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self._compute_lock = asyncio.Lock()
+
+    def register(self, name: str, fn: ViewFn, period_s: float, per_model: bool = False) -> None:
+        self._views[name] = _View(fn, period_s, per_model)
+
+    # ----------------------- Berechnung -----------------------
+
+    async def _refresh(self, models) -> None:
+        """Fällige Views neu berechnen und geänderte an alle passenden Abonnenten verteilen."""
+        changed: Dict[Optional[str], Dict[str, Any]] = {}   # Modell (None = modellunabhängig) → Views
+        async with self._compute_lock:
+            now = time.monotonic()
+            for name, view in self._views.items():
+                for model in (models if view.per_model else (None,)):
+                    key = (name, model)
+                    current = self._values.get(key)
+                    if current is not None and now - current[0] < view.period_s:
+                        continue
+                    t0 = time.perf_counter()
+                    try:
+                        data = await view.fn(model or "all")
+                    except Exception as e:
+                        log.error("Dashboard view %s failed: %s", name, e)
+                        continue
+                    metrics.dashboard_view_compute_seconds.labels(view=name).observe(time.perf_counter() - t0)
+                    encoded = json.dumps(data, separators=(",", ":"), default=str)
+                    if current is None or current[1] != encoded:
+                        changed.setdefault(model, {})[name] = data
+                    self._values[key] = (time.monotonic(), encoded, data)
+        if not changed:
+            return
+        shared = changed.get(None, {})
+        for sub in list(self._subscribers.values()):
+            delta = {**shared, **changed.get(sub.model, {})}
+            if delta:
+                sub.offer(delta)
+
+    async def snapshot(self, model: str = "all") -> Dict[str, Any]:
+        """Alle Views für ein Modell (fällige werden vorher aktualisiert)."""
+        await self._refresh({model})
+        out: Dict[str, Any] = {}
+        for name, view in self._views.items():
+            value = self._values.get((name, model if view.per_model else None))
+            if value is not None:
+                out[name] = value[2]
+        return out
+
+    # ----------------------- Abonnenten -----------------------
+
+    async def stream(self, model: str = "all") -> AsyncIterator[str]:
+        """SSE-Generator: erst vollständiger Snapshot, danach nur geänderte Views."""
+        first = await self.snapshot(model)
+        # erst nach dem Snapshot eintragen (kein await dazwischen → keine Lücke, kein Doppel)
+        sub = _Subscriber(next(self._ids), model)
+        self._subscribers[sub.id] = sub
+        metrics.dashboard_subscribers.set(len(self._subscribers))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            yield f"retry: 5000\n{_sse('snapshot', first)}"
+            while True:
+                try:
+                    await asyncio.wait_for(sub.wakeup.wait(), timeout=self.keepalive_s)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                sub.wakeup.clear()
+                delta, sub.pending = sub.pending, {}
+                if delta:
+                    yield _sse("update", delta)
+        finally:
+            self._subscribers.pop(sub.id, None)
+            metrics.dashboard_subscribers.set(len(self._subscribers))
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.tick_s)
+            await self._refresh({s.model for s in self._subscribers.values()})
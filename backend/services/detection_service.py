@@ -1,15 +1,10 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
-from backend.models import DetectionEvent, Camera
+from typing import Optional, Sequence
 
-def save_event(db: Session, class_name: str, model_type: str, camera_id: int):
-    cam = db.query(Camera).filter(Camera.id==camera_id).first()
-    ev = DetectionEvent(
-        class_name=class_name,
-        model_type=model_type,
-        camera_id=camera_id,
-        camera_name=cam.source_name if cam else f"Camera {camera_id}",
-        timestamp=datetime.utcnow()
-    )
-    db.add(ev)
-    db.commit()
+from backend.services.event_writer import event_writer
+
+def save_event(class_name: str, model_type: str, camera_id: int, clip_path: str | None = None,
+               bbox: Optional[Sequence[float]] = None, score: Optional[float] = None,
+               track_id: Optional[int] = None) -> bool:
+    """Event an den Hintergrund-Writer übergeben (blockiert nie auf die DB)."""
+    return event_writer.submit(class_name, model_type, camera_id, clip_path=clip_path,
+                               bbox=bbox, score=score, track_id=track_id)
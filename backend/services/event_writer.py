@@ -0,0 +1,214 @@
+# backend/services/event_writer.py
+"""
+Hintergrund-Writer für DetectionEvents.
+
+Inferenz-Threads rufen nur submit() auf (nicht-blockierend, begrenzte Queue).
+Ein eigener Thread sammelt Events und schreibt sie nach Größe ODER Zeit als
+Bulk-Insert (SQLAlchemy executemany → bei psycopg2 mehrzeilige INSERT ... VALUES)
+und schreibt im selben Zug die Minuten-/Stunden-Rollups fort (services/rollups.py).
+Ist die DB nicht erreichbar, landen Batches im Spill-Log (services/spill_log.py)
+und werden später nachgeschrieben; danach wird die DB für SPILL_DB_BACKOFF_S
+gar nicht erst gefragt, damit die Queue nicht vollläuft. Lehnt die DB einen
+Batch selbst ab (Datenfehler), geht er in die Quarantäne des Spill-Logs.
+
+Nach jedem geschriebenen Batch weckt events_written wartende Long-Polls
+(routers/detections.py, since-Modus).
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.models import DetectionEvent
+from backend.monitoring.metrics import metrics
+from backend.services.camera_cache import camera_cache
+from backend.services.keypoint_codec import encode_bbox_batch
+from backend.services.live_stats import live_stats
+from backend.services.response_cache import response_cache
+from backend.services.rollups import apply_batch as apply_rollups
+from backend.services.spill_log import is_connection_error, spill_log
+
+log = logging.getLogger("app")
+
+_STOP = object()
+
+
+class WriteNotifier:
+    """Zähler geschriebener Batches; Coroutinen warten auf den nächsten (Aufruf aus dem Writer-Thread)."""
+    def __init__(self):
+        self.generation = 0
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._lock = threading.Lock()
+
+    def notify(self) -> None:
+        with self._lock:
+            self.generation += 1
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, generation: int, timeout: float) -> bool:
+        """True, sobald nach `generation` geschrieben wurde; False nach timeout."""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            if self.generation != generation:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+events_written = WriteNotifier()
+
+
+def _write_events(rows: List[Dict[str, Any]]) -> List[int]:
+    """Events + Rollups in einer Transaktion; liefert die ids in Reihenfolge der rows."""
+    T = DetectionEvent.__table__
+    with engine.begin() as conn:
+        ids = conn.execute(insert(T).returning(T.c.id, sort_by_parameter_order=True), rows).scalars().all()
+        apply_rollups(conn, rows)  # gleiche Transaktion → Rollups nie hinter den Rohdaten
+    if settings.STATS_CACHE_INVALIDATE_ON_WRITE:
+        response_cache.invalidate("stats")
+    events_written.notify()
+    return ids
+
+def _replay_events(payloads: List[List[Dict[str, Any]]]) -> None:
+    _write_events([r for rows in payloads for r in rows])
+
+spill_log.register("events", _replay_events)
+
+
+class EventWriter:
+    def __init__(self, max_queue: int, batch_size: int, flush_interval_s: float, db_backoff_s: float = 5.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.db_backoff_s = db_backoff_s
+        self._db_down_until = 0.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # ----------------------- Produzenten-Seite -----------------------
+
+    def submit(self, class_name: str, model_type: str, camera_id: int,
+               clip_path: Optional[str] = None, timestamp: Optional[datetime] = None,
+               bbox: Optional[Sequence[float]] = None, score: Optional[float] = None,
+               track_id: Optional[int] = None) -> bool:
+        """Reiht ein Event ein. False, wenn die Queue voll war (Event verworfen)."""
+        self._ensure_started()
+        row = {
+            "class_name": class_name,
+            "model_type": model_type,
+            "camera_id": camera_id,
+            "clip_path": clip_path,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+            "bbox": bbox,  # wird erst im Writer-Thread kodiert (keypoint_codec)
+            "score": score,
+            "track_id": track_id,
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            metrics.event_writer_dropped.labels(reason="queue_full").inc()
+            return False
+        live_stats.record(camera_id, model_type, class_name, row["timestamp"])
+        metrics.event_writer_queue_depth.set(self._queue.qsize())
+        return True
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    # ----------------------- Writer-Thread -----------------------
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval_s
+        stopping = False
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval_s
+            metrics.event_writer_queue_depth.set(self._queue.qsize())
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        t0 = time.perf_counter()
+        for r, bbox in zip(batch, encode_bbox_batch([r["bbox"] for r in batch])):
+            r["camera_name"] = camera_cache.name(r["camera_id"])
+            r["bbox"] = bbox
+        if time.monotonic() < self._db_down_until:
+            self._spill(batch)
+            return
+        try:
+            ids = _write_events(batch)
+        except Exception as e:
+            if not is_connection_error(e):
+                spill_log.quarantine("events", [batch], len(batch), e)
+                metrics.event_writer_dropped.labels(reason="rejected").inc(len(batch))
+                return
+            log.error("Event writer: flush of %d events failed, spilling to disk: %s", len(batch), e)
+            self._db_down_until = time.monotonic() + self.db_backoff_s
+            self._spill(batch)
+            return
+        live_stats.written(batch, ids)
+        metrics.event_writer_flush_latency.observe(time.perf_counter() - t0)
+        metrics.event_writer_written.inc(len(batch))
+
+    def _spill(self, batch: List[Dict[str, Any]]) -> None:
+        if not spill_log.append("events", batch, len(batch)):
+            metrics.event_writer_dropped.labels(reason="db_error").inc(len(batch))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Restliche Events schreiben und Thread beenden (App-Shutdown)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            log.warning("Event writer: queue full on shutdown, %d events lost", self._queue.qsize())
+            return
+        self._thread.join(timeout=timeout)
+
+
+event_writer = EventWriter(
+    max_queue=settings.EVENT_WRITER_QUEUE_SIZE,
+    batch_size=settings.EVENT_WRITER_BATCH_SIZE,
+    flush_interval_s=settings.EVENT_WRITER_FLUSH_INTERVAL_S,
+    db_backoff_s=settings.SPILL_DB_BACKOFF_S,
+)
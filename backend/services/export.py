@@ -0,0 +1,227 @@
+# backend/services/export.py
+"""
+Streaming-Export von detection_events / pose_frames als NDJSON, Parquet oder Arrow-IPC.
+
+Die Abfrage läuft über einen serverseitigen Cursor (stream_results) und wird
+in Blöcken à chunk_size gelesen und sofort serialisiert – der Speicherbedarf
+hängt nur von chunk_size ab, nicht von der Ergebnisgröße.
+
+Parquet/Arrow brauchen pyarrow (in requirements.txt; ohne pyarrow nur NDJSON). CLI:
+    python -m backend.services.export detections --format parquet --since 2026-10-01 -o out.parquet
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from backend.db_settings import engine
+from backend.models import DetectionEvent, PoseFrame
+from backend.services.keypoint_codec import decode_bbox, keypoints_to_dict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class ExportFilter:
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    camera_id: Optional[int] = None
+    model: Optional[str] = None
+    class_name: Optional[str] = None
+    session_id: Optional[int] = None   # nur pose
+
+
+def _detections_query(f: ExportFilter):
+    t = DetectionEvent
+    q = select(t.id, t.timestamp, t.camera_id, t.camera_name, t.model_type, t.class_name, t.clip_path,
+               t.bbox, t.score, t.track_id)
+    if f.since is not None:
+        q = q.where(t.timestamp >= f.since)
+    if f.until is not None:
+        q = q.where(t.timestamp < f.until)
+    if f.camera_id is not None:
+        q = q.where(t.camera_id == f.camera_id)
+    if f.model and f.model != "all":
+        q = q.where(t.model_type == f.model)
+    if f.class_name and f.class_name != "all":
+        q = q.where(t.class_name == f.class_name)
+    return q.order_by(t.timestamp, t.id)
+
+def _pose_query(f: ExportFilter):
+    t = PoseFrame
+    q = select(t.id, t.session_id, t.ts_ms, t.track_id, t.label, t.score, t.x, t.y, t.w, t.h, t.keypoints)
+    # pose_frames kennt nur ts_ms (Epoch-Millisekunden)
+    if f.since is not None:
+        q = q.where(t.ts_ms >= int(f.since.timestamp() * 1000))
+    if f.until is not None:
+        q = q.where(t.ts_ms < int(f.until.timestamp() * 1000))
+    if f.session_id is not None:
+        q = q.where(t.session_id == f.session_id)
+    if f.class_name and f.class_name != "all":
+        q = q.where(t.label == f.class_name)
+    return q.order_by(t.session_id, t.ts_ms, t.id)
+
+QUERIES = {"detections": _detections_query, "pose": _pose_query}
+
+
+# Binärspalten (keypoint_codec) → im Export wieder lesbar
+_DECODERS = {"bbox": decode_bbox, "keypoints": keypoints_to_dict}
+
+def _decode_rows(columns: List[str], rows) -> list:
+    decode = [(i, _DECODERS[name]) for i, name in enumerate(columns) if name in _DECODERS]
+    if not decode:
+        return rows
+    out = []
+    for row in rows:
+        row = list(row)
+        for i, fn in decode:
+            row[i] = fn(row[i])
+        out.append(row)
+    return out
+
+def iter_chunks(kind: str, f: ExportFilter, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """(Spaltennamen, Zeilen) blockweise aus einem serverseitigen Cursor."""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(QUERIES[kind](f))
+        columns = list(result.keys())
+        for rows in result.partitions(chunk_size):
+            yield columns, _decode_rows(columns, rows)
+
+
+# ----------------------- Serialisierung -----------------------
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+def iter_ndjson(chunks: Iterator[tuple]) -> Iterator[bytes]:
+    for columns, rows in chunks:
+        lines = [json.dumps(dict(zip(columns, row)), default=_json_default, separators=(",", ":")) for row in rows]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink:
+    """Datei-Ersatz für pyarrow: sammelt Writes, der Generator leert nach jedem Block."""
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+def _arrow_types() -> dict:
+    """Feste Spaltentypen, damit alle Blöcke (auch komplett leere Spalten) dasselbe Schema haben."""
+    i32, i64, f64, txt = pa.int32(), pa.int64(), pa.float64(), pa.string()
+    return {
+        "detections": {"id": i64, "timestamp": pa.timestamp("us", tz="UTC"), "camera_id": i32,
+                       "camera_name": txt, "model_type": txt, "class_name": txt, "clip_path": txt,
+                       "bbox": pa.list_(pa.float32(), 4), "score": pa.float32(), "track_id": i32},
+        "pose": {"id": i64, "session_id": i32, "ts_ms": i64, "track_id": i32, "label": txt, "score": f64,
+                 "x": f64, "y": f64, "w": f64, "h": f64, "keypoints": txt},
+    }
+
+def _to_arrow(types: dict, columns: Sequence[str], rows) -> "pa.Table":
+    cols = list(zip(*rows)) if rows else [() for _ in columns]
+    arrays = []
+    for name, values in zip(columns, cols):
+        if name == "keypoints":
+            # verschachtelte Dicts als JSON-Text
+            values = [None if v is None else json.dumps(v, separators=(",", ":")) for v in values]
+        arrays.append(pa.array(values, type=types.get(name)))
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+def iter_arrow(kind: str, chunks: Iterator[tuple], fmt: str) -> Iterator[bytes]:
+    if not HAS_ARROW:
+        raise RuntimeError("pyarrow is not installed")
+    types = _arrow_types()[kind]
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for columns, rows in chunks:
+            table = _to_arrow(types, columns, rows)
+            if writer is None:
+                out = pa.PythonFile(sink, mode="w")
+                writer = pq.ParquetWriter(out, table.schema) if fmt == "parquet" else pa.ipc.new_stream(out, table.schema)
+            writer.write_table(table)  # Parquet: eine Row-Group pro Block
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        if writer is not None:
+            writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def stream_export(kind: str, fmt: str, f: ExportFilter, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    chunks = iter_chunks(kind, f, chunk_size)
+    if fmt == "ndjson":
+        return iter_ndjson(chunks)
+    return iter_arrow(kind, chunks, fmt)
+
+
+# ----------------------- CLI -----------------------
+
+def _parse_dt(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Export detections / pose frames")
+    p.add_argument("kind", choices=sorted(QUERIES))
+    p.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    p.add_argument("--since", type=_parse_dt)
+    p.add_argument("--until", type=_parse_dt)
+    p.add_argument("--camera-id", type=int)
+    p.add_argument("--model")
+    p.add_argument("--class-name")
+    p.add_argument("--session-id", type=int)
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    p.add_argument("-o", "--output", help="Zieldatei (Standard: stdout)")
+    args = p.parse_args(argv)
+
+    if args.format != "ndjson" and not HAS_ARROW:
+        p.error("parquet/arrow export needs pyarrow (pip install pyarrow)")
+
+    f = ExportFilter(args.since, args.until, args.camera_id, args.model, args.class_name, args.session_id)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for data in stream_export(args.kind, args.format, f, args.chunk_size):
+            out.write(data)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
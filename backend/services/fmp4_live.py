@@ -0,0 +1,266 @@
+# backend/services/fmp4_live.py
+"""
+Optionaler Live-Ausgang pro Kamera: annotierte Frames → H.264 (libx264, CPU) als
+fragmentiertes MP4 für Media Source Extensions im Browser.
+
+- Der Encoder (ffmpeg-Subprozess + Feeder-/Reader-Thread) läuft nur, solange
+  mindestens ein Viewer die Kamera abonniert hat.
+- offer() ist für den Kamera-Worker ein O(1)-No-Op, wenn niemand zuschaut.
+- Init-Segment (ftyp+moov) wird gecacht, damit spätere Viewer sofort einsteigen
+  können; jedes Media-Segment (moof+mdat) beginnt mit einem Keyframe, daher
+  dürfen langsame Viewer ganze Segmente verlieren (drop-oldest).
+- Zeitstempel = Ankunftszeit der Frames (variable Bildrate), Keyframes alle
+  FMP4_GOP_SECONDS; ungerade Auflösungen werden auf gerade abgerundet.
+"""
+import asyncio
+import logging
+import shutil
+import struct
+import subprocess
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.core.settings import settings
+
+log = logging.getLogger("app")
+
+
+def _read_exact(stream, n: int) -> Optional[bytes]:
+    buf = b""
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+def _codec_string(init_segment: bytes) -> str:
+    """RFC-6381-Codec aus der avcC-Box, z.B. 'avc1.64001F'."""
+    i = init_segment.find(b"avcC")
+    if i < 0 or i + 8 > len(init_segment):
+        return "avc1.42E01E"
+    profile, compat, level = init_segment[i + 5], init_segment[i + 6], init_segment[i + 7]
+    return f"avc1.{profile:02X}{compat:02X}{level:02X}"
+
+
+class Fmp4Viewer:
+    """Ein MSE-Client; Segmente landen in einer kleinen drop-oldest-Queue."""
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_segments: int = 8):
+        self.loop = loop
+        self.segments: Deque[bytes] = deque(maxlen=max_segments)
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+
+    def _put(self, segment: bytes) -> None:
+        if len(self.segments) == self.segments.maxlen:
+            self.dropped += 1
+        self.segments.append(segment)
+        self.wakeup.set()
+
+    def deliver(self, segment: bytes) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, segment)
+        except RuntimeError:
+            pass  # Loop bereits beendet
+
+    async def next_segment(self) -> bytes:
+        while not self.segments:
+            self.wakeup.clear()
+            await self.wakeup.wait()
+        return self.segments.popleft()
+
+
+class Fmp4Encoder:
+    """Ein ffmpeg-Prozess pro Kamera; Frames (BGR) rein, fMP4-Segmente raus."""
+    def __init__(self, camera_id: int, width: int, height: int, on_init, on_segment):
+        self.camera_id = camera_id
+        self.size = (width, height)
+        self._on_init = on_init
+        self._on_segment = on_segment
+        self._frames: Deque[np.ndarray] = deque(maxlen=2)  # Encoder hinkt hinterher → alte Frames weg
+        self._has_frame = threading.Event()
+        self._stop = False
+        cmd = [
+            settings.FFMPEG_BIN, "-loglevel", "error",
+            # Frames kommen in der echten Kamerarate (minus verworfene) → Zeitstempel = Ankunftszeit
+            "-use_wallclock_as_timestamps", "1",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-i", "-",
+            # yuv420p braucht gerade Breite/Höhe
+            "-an", "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", "-vsync", "vfr",
+            "-c:v", "libx264", "-preset", settings.FMP4_PRESET, "-tune", "zerolatency",
+            "-crf", str(settings.FMP4_CRF), "-pix_fmt", "yuv420p",
+            # Keyframes nach Zeit statt Frame-Zahl (variable Bildrate)
+            "-force_key_frames", f"expr:gte(t,n_forced*{settings.FMP4_GOP_SECONDS})", "-sc_threshold", "0",
+            "-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof", "-",
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._feeder = threading.Thread(target=self._feed, name=f"fmp4-feed-{camera_id}", daemon=True)
+        self._reader = threading.Thread(target=self._read, name=f"fmp4-read-{camera_id}", daemon=True)
+        self._feeder.start()
+        self._reader.start()
+
+    def offer(self, frame: np.ndarray) -> None:
+        self._frames.append(frame)
+        self._has_frame.set()
+
+    def _feed(self) -> None:
+        try:
+            while not self._stop:
+                if not self._has_frame.wait(timeout=0.5):
+                    continue
+                self._has_frame.clear()
+                while self._frames:
+                    self._proc.stdin.write(self._frames.popleft().tobytes())
+                self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError, OSError):
+            pass
+
+    def _read(self) -> None:
+        """Zerlegt den MP4-Bytestrom in Top-Level-Boxen: ftyp+moov = Init, moof+mdat = Segment."""
+        out = self._proc.stdout
+        init = b""
+        pending = b""
+        while True:
+            header = _read_exact(out, 8)
+            if header is None:
+                break
+            size, kind = struct.unpack(">I4s", header)
+            if size == 1:
+                ext = _read_exact(out, 8)
+                if ext is None:
+                    break
+                size = struct.unpack(">Q", ext)[0]
+                header += ext
+            body = _read_exact(out, size - len(header))
+            if body is None:
+                break
+            box = header + body
+            if kind in (b"ftyp", b"moov"):
+                init += box
+                if kind == b"moov":
+                    self._on_init(init)
+            elif kind == b"moof":
+                pending = box
+            elif kind == b"mdat":
+                self._on_segment(pending + box)
+                pending = b""
+
+    def close(self) -> None:
+        self._stop = True
+        self._has_frame.set()
+        try:
+            self._proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self._proc.wait(timeout=2.0)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+
+class Fmp4LiveHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._viewers: Dict[int, Set[Fmp4Viewer]] = {}
+        self._encoders: Dict[int, Fmp4Encoder] = {}
+        self._init_segments: Dict[int, bytes] = {}
+        self._init_ready: Dict[int, threading.Event] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return settings.FMP4_ENABLED and shutil.which(settings.FFMPEG_BIN) is not None
+
+    # ----------------------- Worker-Seite -----------------------
+
+    def offer(self, camera_id: int, frame: np.ndarray) -> None:
+        """Vom Kamera-Worker pro annotiertem Frame; ohne Viewer sofort zurück."""
+        if camera_id not in self._viewers:
+            return
+        h, w = frame.shape[:2]
+        enc = self._encoders.get(camera_id)
+        if enc is None or enc.size != (w, h):
+            enc = self._start_encoder(camera_id, w, h)
+            if enc is None:
+                return
+        enc.offer(frame)
+
+    def _start_encoder(self, camera_id: int, w: int, h: int) -> Optional[Fmp4Encoder]:
+        with self._lock:
+            if camera_id not in self._viewers:
+                return None
+            old = self._encoders.pop(camera_id, None)
+            if old is not None:
+                old.close()
+            self._init_segments.pop(camera_id, None)
+            self._init_ready.setdefault(camera_id, threading.Event()).clear()
+            try:
+                enc = Fmp4Encoder(
+                    camera_id, w, h,
+                    on_init=lambda data: self._set_init(camera_id, data),
+                    on_segment=lambda data: self._publish(camera_id, data),
+                )
+            except OSError as e:
+                log.error("fMP4 encoder for camera %s failed to start: %s", camera_id, e)
+                return None
+            self._encoders[camera_id] = enc
+            log.info("fMP4 encoder started for camera %s (%dx%d)", camera_id, w, h)
+            return enc
+
+    def _set_init(self, camera_id: int, data: bytes) -> None:
+        self._init_segments[camera_id] = data
+        self._init_ready.setdefault(camera_id, threading.Event()).set()
+
+    def _publish(self, camera_id: int, segment: bytes) -> None:
+        with self._lock:
+            viewers = list(self._viewers.get(camera_id, ()))
+        for viewer in viewers:
+            viewer.deliver(segment)
+
+    # ----------------------- Viewer-Seite -----------------------
+
+    def subscribe(self, camera_id: int) -> Fmp4Viewer:
+        viewer = Fmp4Viewer(asyncio.get_running_loop())
+        with self._lock:
+            self._viewers.setdefault(camera_id, set()).add(viewer)
+            self._init_ready.setdefault(camera_id, threading.Event())
+        return viewer
+
+    def unsubscribe(self, camera_id: int, viewer: Fmp4Viewer) -> None:
+        with self._lock:
+            viewers = self._viewers.get(camera_id)
+            if viewers is not None:
+                viewers.discard(viewer)
+                if viewers:
+                    return
+                self._viewers.pop(camera_id, None)
+            # letzter Viewer weg → Encoder stoppen
+            enc = self._encoders.pop(camera_id, None)
+            self._init_segments.pop(camera_id, None)
+            self._init_ready.pop(camera_id, None)
+        if enc is not None:
+            enc.close()
+            log.info("fMP4 encoder stopped for camera %s (no viewers)", camera_id)
+
+    async def wait_init(self, camera_id: int, timeout: float = 10.0) -> Optional[Tuple[str, bytes]]:
+        """(mime, init_segment) sobald der Encoder das erste moov geliefert hat."""
+        ready = self._init_ready.get(camera_id)
+        if ready is None:
+            return None
+        ok = await asyncio.get_running_loop().run_in_executor(None, ready.wait, timeout)
+        init = self._init_segments.get(camera_id)
+        if not ok or init is None:
+            return None
+        return f'video/mp4; codecs="{_codec_string(init)}"', init
+
+    def stats(self) -> Dict[int, Dict[str, int]]:
+        return {
+            cid: {"viewers": len(v), "encoding": int(cid in self._encoders),
+                  "dropped_segments": sum(x.dropped for x in v)}
+            for cid, v in list(self._viewers.items())
+        }
+
+
+fmp4_hub = Fmp4LiveHub()
@@ -1,7 +1,11 @@
-import cv2, numpy as np
+import cv2, numpy as np, time
 from datetime import datetime, timedelta
 from collections import defaultdict
 from backend.monitoring.metrics import metrics
+from backend.services.camera_manager import worker_started
+from backend.services.sketches import detection_sketches
+from backend.services.heatmaps import heatmaps
+from backend.services.zones import zone_engine
 
 DETECTION_COLORS = {"person": (0,0,255), "bottle": (0,255,0), "potted plant": (255,0,0)}
 KEYPOINT_COLOR = (0,255,0); SKELETON_COLOR = (0,255,255)
@@ -9,7 +13,14 @@ KEYPOINT_COLOR = (0,255,0); SKELETON_COLOR = (0,255,255)
 # pro Kamera: letzter Zeitpunkt je Klasse (10s Cooldown)
 detection_times = defaultdict(lambda: defaultdict(lambda: datetime.min))
 
+# Track-IDs beginnen je Prozess/Worker-Start neu → Salt für die eindeutigen Tracks
+_PROCESS_SALT = int(time.time())
+
+def _track_salt(camera_id: int) -> int:
+    return _PROCESS_SALT ^ int(worker_started.get(camera_id, 0.0) * 1000)
+
 def process_frame(frame, result, camera_id: int, model_task: str):
+    sketch_model = "objectDetection" if model_task == "detect" else model_task  # wie die Events
     with metrics.measure_latency(str(camera_id), model_task):
         annotated = frame.copy()
 
@@ -43,6 +54,16 @@ def process_frame(frame, result, camera_id: int, model_task: str):
 
         # Detection + Metriken + Cooldown
         if getattr(result, "boxes", None) is not None:
+            if camera_id >= 0:  # Heatmap/Zonen: alle Boxen des Frames auf einmal (Videojobs ohne Kamera: -1)
+                fh, fw = frame.shape[:2]
+                xyxy = result.boxes.xyxy.cpu().numpy() / np.array([fw, fh, fw, fh], dtype=np.float32)
+                cls_ids = result.boxes.cls.cpu().numpy().astype(int)
+                heatmaps.add(camera_id, xyxy, cls_ids, result.names)
+                if zone_engine.has_zones(camera_id):
+                    # jeden Frame, auch ohne Track-IDs (leere Szene: id=None) → Tracks laufen aus, exit-Events
+                    ids = getattr(result.boxes, "id", None)
+                    ids = ids.cpu().numpy().astype(int) if ids is not None else np.full(len(cls_ids), -1)
+                    zone_engine.update(camera_id, xyxy, ids, [result.names[c] for c in cls_ids])
             for box in result.boxes:
                 x1,y1,x2,y2 = box.xyxy[0].cpu().numpy()
                 cls_id = int(box.cls[0]); conf = float(box.conf[0])
@@ -56,13 +77,23 @@ def process_frame(frame, result, camera_id: int, model_task: str):
 
                 # 🔧 Debug: alles zulassen (später wieder einschränken)
                 metrics.record_detection(str(camera_id), class_name, model_task, conf)
+                track_id = getattr(box, "id", None)
+                track_id = int(track_id[0]) if track_id is not None else None
+                detection_sketches.observe(camera_id, sketch_model, class_name, conf,
+                                           track_id=track_id, salt=_track_salt(camera_id))
 
                 now = datetime.now()
                 last = detection_times[camera_id][class_name]
 
                 # 🔧 erstes Event sofort, danach alle 2s (Throttle)
                 if last == datetime.min or (now - last) >= timedelta(seconds=2):
-                    yield {"class_name": class_name}
+                    fh, fw = frame.shape[:2]
+                    yield {
+                        "class_name": class_name,
+                        "bbox": [x1 / fw, y1 / fh, (x2 - x1) / fw, (y2 - y1) / fh],  # normiert x,y,w,h
+                        "score": conf,
+                        "track_id": track_id,
+                    }
                     detection_times[camera_id][class_name] = now
 
         cv2.putText(annotated, f"{frame.shape[1]}x{frame.shape[0]}", (10,30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
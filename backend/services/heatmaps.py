@@ -0,0 +1,238 @@
+# backend/services/heatmaps.py
+"""
+Belegungs-Heatmaps pro Kamera (wo halten sich Personen/Spieler auf?).
+
+process_frame übergibt pro Frame alle Boxen auf einmal (normiert, xyxy). Pro
+Box wird ein Punkt – Boxmitte oder Fußpunkt (Mitte der Unterkante) – in ein
+HEATMAP_GRID_W × HEATMAP_GRID_H-Raster addiert, gewichtet mit der Frame-Dauer:
+eine Zelle zählt also Sekunden Aufenthalt.
+
+Exponentieller Zerfall (Halbwertszeit HEATMAP_HALF_LIFE_S, 0 = kumulativ) ohne
+Arbeit pro Frame am ganzen Raster: neue Beiträge werden mit exp(+Δt/τ)
+hochskaliert, erst beim Lesen (oder wenn der Faktor zu groß wird) wird einmal
+mit exp(-Δt/τ) heruntergerechnet. Kosten pro Frame also O(Boxen).
+
+heatmap_snapshotter legt den Stand periodisch als <camera_id>.npz in
+HEATMAP_DIR ab, load() übernimmt ihn beim Start (samt Zerfall seitdem).
+"""
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.core.settings import settings
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+_MAX_FRAME_GAP_S = 1.0   # längere Pausen (Stream hing) zählen höchstens so viel
+_RESCALE_BELOW = 1e-6   # Zerfallsfaktor darunter → Raster einmal zurückrechnen
+
+
+class Heatmap:
+    def __init__(self, width: int, height: int, half_life_s: float, point: str):
+        self.width = width
+        self.height = height
+        self.half_life_s = half_life_s
+        self.point = point
+        self._tau = half_life_s / math.log(2) if half_life_s > 0 else 0.0
+        self._bounds = np.array([width - 1, height - 1])
+        self._size = np.array([width, height], dtype=np.float32)
+        self._grid = np.zeros(width * height, dtype=np.float64)
+        self._t_ref = time.time()      # Bezugszeit der gespeicherten Werte
+        self._last_frame: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _decay(self, now: float) -> float:
+        """Faktor, um den die gespeicherten Werte bis now abgeklungen sind."""
+        return math.exp(-(now - self._t_ref) / self._tau) if self._tau else 1.0
+
+    def add_boxes(self, boxes: np.ndarray, now: Optional[float] = None) -> None:
+        """boxes: (N, 4) normiert x1, y1, x2, y2."""
+        now = time.time() if now is None else now
+        with self._lock:
+            dt = 0.0 if self._last_frame is None else min(now - self._last_frame, _MAX_FRAME_GAP_S)
+            self._last_frame = now
+            if not len(boxes) or dt <= 0:
+                return
+            points = np.empty((len(boxes), 2), dtype=np.float32)
+            points[:, 0] = boxes[:, 0] + boxes[:, 2]
+            points[:, 0] *= 0.5
+            if self.point == "foot":
+                points[:, 1] = boxes[:, 3]
+            else:
+                points[:, 1] = boxes[:, 1] + boxes[:, 3]
+                points[:, 1] *= 0.5
+            cells = np.clip((points * self._size).astype(np.intp), 0, self._bounds)
+            decay = self._decay(now)
+            if decay < _RESCALE_BELOW:
+                self._grid *= decay
+                self._t_ref, decay = now, 1.0
+            np.add.at(self._grid, cells[:, 1] * self.width + cells[:, 0], dt / decay)
+
+    def snapshot(self, now: Optional[float] = None) -> np.ndarray:
+        """Raster (H, W) auf den Zeitpunkt now abgeklungen, in Sekunden Aufenthalt."""
+        now = time.time() if now is None else now
+        with self._lock:
+            grid = self._grid * self._decay(now)
+        return grid.reshape(self.height, self.width)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._grid[:] = 0
+            self._t_ref = time.time()
+
+    def load(self, grid: np.ndarray, ts: float) -> None:
+        with self._lock:
+            self._grid = grid.astype(np.float64).ravel()
+            self._t_ref = ts
+
+
+class HeatmapStore:
+    def __init__(self, directory: str, width: int, height: int, half_life_s: float,
+                 point: str, classes: str):
+        self.dir = Path(directory)
+        self.width = width
+        self.height = height
+        self.half_life_s = half_life_s
+        self.point = point
+        self.classes = {c.strip() for c in classes.split(",") if c.strip()}   # leer = alle Klassen
+        self._maps: Dict[int, Heatmap] = {}
+        self._lock = threading.Lock()
+        # Klassenfilter als LUT class_id → bool: pro Kamera (names-Dict ihres Modells, LUT),
+        # die LUTs selbst geteilt für Modelle mit gleichen Klassen
+        self._camera_luts: Dict[int, Tuple[Mapping[int, str], np.ndarray]] = {}
+        self._luts: Dict[frozenset, np.ndarray] = {}
+
+    def _get(self, camera_id: int, create: bool = True) -> Optional[Heatmap]:
+        heatmap = self._maps.get(camera_id)
+        if heatmap is None and create:
+            with self._lock:
+                heatmap = self._maps.setdefault(
+                    camera_id, Heatmap(self.width, self.height, self.half_life_s, self.point))
+        return heatmap
+
+    def add(self, camera_id: int, boxes: np.ndarray, class_ids: np.ndarray, names: Mapping[int, str]) -> None:
+        """Alle Boxen eines Frames (normiert xyxy) eintragen; nach HEATMAP_CLASSES gefiltert."""
+        if self.classes:
+            boxes = boxes[self._lut(camera_id, names)[class_ids]]
+        self._get(camera_id).add_boxes(boxes)
+
+    def _lut(self, camera_id: int, names: Mapping[int, str]) -> np.ndarray:
+        cached = self._camera_luts.get(camera_id)
+        if cached is not None and cached[0] is names:
+            return cached[1]
+        key = frozenset(names.items())
+        lut = self._luts.get(key)
+        if lut is None:
+            lut = np.zeros(max(names, default=-1) + 1, dtype=bool)
+            lut[[i for i, n in names.items() if n in self.classes]] = True
+            lut = self._luts.setdefault(key, lut)
+        self._camera_luts[camera_id] = (names, lut)
+        return lut
+
+    def get(self, camera_id: int) -> Optional[Heatmap]:
+        return self._get(camera_id, create=False)
+
+    def cameras(self):
+        return sorted(self._maps)
+
+    # ----------------------- Persistenz -----------------------
+
+    def _path(self, camera_id: int) -> Path:
+        return self.dir / f"{camera_id}.npz"
+
+    def load(self) -> None:
+        if not self.dir.exists():
+            return
+        for path in self.dir.glob("*.npz"):
+            try:
+                camera_id = int(path.stem)
+                with np.load(path) as data:
+                    grid, ts = data["grid"], float(data["ts"])
+            except Exception as e:
+                log.warning("Heatmap %s: could not load: %s", path.name, e)
+                continue
+            if grid.shape != (self.height, self.width):
+                log.warning("Heatmap %s: grid %s differs from settings, ignored", path.name, grid.shape)
+                continue
+            self._get(camera_id).load(grid, ts)
+
+    def save(self) -> int:
+        """Alle Raster (auf jetzt abgeklungen) atomar nach HEATMAP_DIR schreiben."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        for camera_id, heatmap in list(self._maps.items()):
+            tmp = self.dir / f"{camera_id}.npz.tmp"
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, grid=heatmap.snapshot(now).astype(np.float32), ts=now)
+            os.replace(tmp, self._path(camera_id))
+        return len(self._maps)
+
+    def reset(self, camera_id: int) -> bool:
+        heatmap = self.get(camera_id)
+        if heatmap is None:
+            return False
+        heatmap.reset()
+        self._path(camera_id).unlink(missing_ok=True)
+        return True
+
+    def close(self) -> None:
+        try:
+            self.save()
+        except Exception as e:
+            log.warning("Final heatmap snapshot failed: %s", e)
+
+
+def render_png(grid: np.ndarray, width: int, background: Optional[np.ndarray] = None) -> bytes:
+    """Raster als eingefärbtes PNG (JET, auf das 99. Perzentil normiert); optional über ein Kamerabild gelegt."""
+    nonzero = grid[grid > 0]
+    top = float(np.percentile(nonzero, 99)) if nonzero.size else 1.0
+    norm = np.clip(grid / top, 0, 1)
+    if background is not None:
+        height, width = background.shape[:2]
+    else:
+        height = max(1, round(width * grid.shape[0] / grid.shape[1]))
+    norm = cv2.resize(norm.astype(np.float32), (width, height), interpolation=cv2.INTER_LINEAR)
+    colored = cv2.applyColorMap((norm * 255).astype(np.uint8), cv2.COLORMAP_JET)
+    if background is not None:
+        alpha = (np.sqrt(norm) * 0.6)[..., None]   # leere Bereiche bleiben sichtbar
+        colored = (background * (1 - alpha) + colored * alpha).astype(np.uint8)
+    ok, buf = cv2.imencode(".png", colored)
+    if not ok:
+        raise RuntimeError("PNG encoding failed")
+    return buf.tobytes()
+
+
+def heatmap_json(camera_id: int, heatmap: Heatmap) -> Dict[str, Any]:
+    grid = heatmap.snapshot()
+    return {
+        "cameraId": camera_id,
+        "width": heatmap.width,
+        "height": heatmap.height,
+        "point": heatmap.point,
+        "halfLifeS": heatmap.half_life_s,
+        "unit": "seconds",
+        "max": float(grid.max()),
+        "total": float(grid.sum()),
+        "grid": np.round(grid, 3).tolist(),
+    }
+
+
+heatmaps = HeatmapStore(
+    directory=settings.HEATMAP_DIR,
+    width=settings.HEATMAP_GRID_W,
+    height=settings.HEATMAP_GRID_H,
+    half_life_s=settings.HEATMAP_HALF_LIFE_S,
+    point=settings.HEATMAP_POINT,
+    classes=settings.HEATMAP_CLASSES,
+)
+
+heatmap_snapshotter = PeriodicTask("heatmap-snapshot", heatmaps.save,
+                                   interval_s=settings.HEATMAP_SNAPSHOT_INTERVAL_S)
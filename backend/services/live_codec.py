@@ -0,0 +1,132 @@
+# backend/services/live_codec.py
+"""
+Binäres Live-Format für /ws/live?format=binary (Gegenstück: frontend/src/services/liveCodec.js).
+
+Layout (alles little-endian, Arrays 4-Byte-aligned):
+
+  Header (32 Byte, HEADER_STRUCT)
+    magic      4s   b"VSL1"
+    version    u8   1
+    flags      u8   FLAG_*
+    n_tracks   u16
+    n_kp       u16  Keypoints pro Track (0 = keine)
+    schema_len u16  Länge des Schema-JSON in Byte
+    session_id i32
+    camera_id  i32  (-1 = keine)
+    ts_ms      f64
+    frame_len  u32  Länge des angehängten JPEG (0 = keins)
+  Schema-JSON (utf-8, auf 4 Byte gepaddet): {"labels": [...], "kp_names": [...]}
+  boxes      f32[n_tracks*4]      x, y, w, h
+  scores     f32[n_tracks]
+  track_ids  i32[n_tracks]        -1 = ohne ID
+  labels     u16[n_tracks]        Index in schema.labels (auf 4 Byte gepaddet)
+  keypoints  f32[n_tracks*n_kp*3] x, y, conf (nur wenn FLAG_KEYPOINTS)
+  frame      u8[frame_len]        JPEG (nur wenn FLAG_FRAME)
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b"VSL1"
+VERSION = 1
+HEADER_STRUCT = struct.Struct("<4sBBHHHiidI")
+
+FLAG_KEYPOINTS = 0x01
+FLAG_FRAME = 0x02
+
+_NO_BOX = (0.0, 0.0, 0.0, 0.0)
+_NO_KP = (0.0, 0.0, 0.0)
+
+def _pad4(n: int) -> int:
+    return (4 - n % 4) % 4
+
+def encode_live_message(session_id: int, payload: Dict[str, Any]) -> bytes:
+    """Packt tracks (+ optional payload['frame_jpeg']) in ein Binär-Frame."""
+    tracks: List[Dict[str, Any]] = payload.get("tracks") or []
+    n = len(tracks)
+
+    label_index: Dict[str, int] = {}
+    for t in tracks:
+        label_index.setdefault(t.get("label") or "", len(label_index))
+    labels: List[str] = list(label_index)
+    label_ids = np.fromiter((label_index[t.get("label") or ""] for t in tracks), dtype="<u2", count=n)
+
+    # Spaltenweise in einem Rutsch nach NumPy (statt Element für Element)
+    boxes = np.asarray([(t.get("bbox") or _NO_BOX)[:4] for t in tracks], dtype="<f4").reshape(n, 4)
+    scores = np.fromiter((t.get("score") or 0.0 for t in tracks), dtype="<f4", count=n)
+    track_ids = np.fromiter(
+        (-1 if t.get("track_id") is None else t["track_id"] for t in tracks), dtype="<i4", count=n
+    )
+
+    kp_names: List[str] = next((list(t["keypoints"]) for t in tracks if t.get("keypoints")), [])
+    n_kp = len(kp_names)
+    if n_kp:
+        keypoints = np.asarray(
+            [[(t.get("keypoints") or {}).get(name, _NO_KP) for name in kp_names] for t in tracks],
+            dtype="<f4",
+        )
+
+    ts_ms = payload.get("ts_ms")
+    if ts_ms is None and tracks:
+        ts_ms = tracks[0].get("ts_ms")
+
+    frame: Optional[bytes] = payload.get("frame_jpeg")
+    flags = (FLAG_KEYPOINTS if n_kp else 0) | (FLAG_FRAME if frame else 0)
+    schema = json.dumps({"labels": labels, "kp_names": kp_names}, separators=(",", ":")).encode("utf-8")
+    camera_id = payload.get("camera_id")
+
+    header = HEADER_STRUCT.pack(
+        MAGIC, VERSION, flags, n, n_kp, len(schema),
+        int(session_id or 0), -1 if camera_id is None else int(camera_id),
+        float(ts_ms or 0), len(frame) if frame else 0,
+    )
+    parts = [
+        header,
+        schema, b"\0" * _pad4(len(schema)),
+        boxes.tobytes(), scores.tobytes(), track_ids.tobytes(),
+        label_ids.tobytes(), b"\0" * _pad4(label_ids.nbytes),
+    ]
+    if n_kp:
+        parts.append(keypoints.tobytes())
+    if frame:
+        parts.append(frame)
+    return b"".join(parts)
+
+def decode_live_message(data: bytes) -> Dict[str, Any]:
+    """Referenz-Decoder (Tests/Tools); liefert dieselbe Struktur wie der JS-Decoder."""
+    (magic, version, flags, n, n_kp, schema_len,
+     session_id, camera_id, ts_ms, frame_len) = HEADER_STRUCT.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a VSL1 live message")
+    off = HEADER_STRUCT.size
+    schema = json.loads(data[off:off + schema_len].decode("utf-8"))
+    off += schema_len + _pad4(schema_len)
+
+    def take(dtype: str, count: int) -> np.ndarray:
+        nonlocal off
+        arr = np.frombuffer(data, dtype=dtype, count=count, offset=off)
+        off += arr.nbytes
+        return arr
+
+    boxes = take("<f4", n * 4).reshape(n, 4)
+    scores = take("<f4", n)
+    track_ids = take("<i4", n)
+    label_ids = take("<u2", n)
+    off += _pad4(label_ids.nbytes)
+    keypoints = take("<f4", n * n_kp * 3).reshape(n, n_kp, 3) if flags & FLAG_KEYPOINTS else None
+    frame = bytes(data[off:off + frame_len]) if flags & FLAG_FRAME else None
+
+    return {
+        "session_id": session_id,
+        "camera_id": None if camera_id < 0 else camera_id,
+        "ts_ms": ts_ms,
+        "labels": [schema["labels"][i] for i in label_ids],
+        "kp_names": schema["kp_names"],
+        "boxes": boxes,
+        "scores": scores,
+        "track_ids": track_ids,
+        "keypoints": keypoints,
+        "frame_jpeg": frame,
+    }
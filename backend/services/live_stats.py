@@ -0,0 +1,177 @@
+# backend/services/live_stats.py
+"""
+Live-Zähler im Speicher für die Echtzeit-Statistiken (kein DB-Zugriff pro Request).
+
+Zähler gefüttert aus EventWriter.submit (jedes Event, das in die Schreib-Queue
+geht, außer Zonen-Ereignissen); die letzten Events erst nach dem Insert
+(written(), mit echter detection_events.id, also bis zu einem Flush später).
+Pro Schlüssel (camera_id, model_type, class_name) und zusätzlich gesamt:
+
+- Sekunden-Ring (SECOND_SLOTS) und Minuten-Ring (MINUTE_SLOTS); jeder Slot trägt
+  seinen Zeitstempel, veraltete Slots zählen als 0 und werden beim Schreiben
+  überschrieben – kein Aufräum-Thread nötig.
+- begrenzte Deque der letzten Events.
+
+record() hält den Lock nur für ein paar Listenzugriffe. Zählt nur Events
+dieses Prozesses; warm_start() füllt nach einem Neustart die letzte Stunde
+aus detection_rollup_minute nach.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from backend.core.settings import settings
+from backend.db_settings import SessionLocal
+from backend.models import ZONE_MODEL_TYPE, DetectionEvent, DetectionRollupMinute
+from backend.services.camera_cache import camera_cache
+
+log = logging.getLogger("app")
+
+SECOND_SLOTS = 120
+MINUTE_SLOTS = 60
+
+Key = Tuple[Optional[int], Optional[str], Optional[str]]   # (camera_id, model_type, class_name)
+_ALL: Key = (None, None, None)
+_DIMENSIONS = {"camera": 0, "model": 1, "class": 2}
+
+
+class _Ring:
+    __slots__ = ("counts", "stamps")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.stamps = [-1] * size
+
+    def add(self, t: int, n: int = 1) -> None:
+        i = t % len(self.counts)
+        if self.stamps[i] != t:
+            self.stamps[i] = t
+            self.counts[i] = 0
+        self.counts[i] += n
+
+    def get(self, t: int) -> int:
+        i = t % len(self.counts)
+        return self.counts[i] if self.stamps[i] == t else 0
+
+    def total(self, start: int, end: int) -> int:
+        """Summe über [start, end] (Slot-Einheiten, höchstens Ringlänge)."""
+        return sum(self.get(t) for t in range(max(start, end - len(self.counts) + 1), end + 1))
+
+
+def _utc(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class LiveStats:
+    def __init__(self, recent_size: int):
+        self._lock = threading.Lock()
+        self._seconds: Dict[Key, _Ring] = {_ALL: _Ring(SECOND_SLOTS)}
+        self._minutes: Dict[Key, _Ring] = {_ALL: _Ring(MINUTE_SLOTS)}
+        self._recent: "deque[Dict[str, Any]]" = deque(maxlen=recent_size)
+
+    # ----------------------- Schreiben (Detection-Pfad) -----------------------
+
+    def record(self, camera_id: Optional[int], model_type: Optional[str], class_name: Optional[str],
+               timestamp: datetime) -> None:
+        if model_type == ZONE_MODEL_TYPE:   # Zonen-Ereignisse sind keine Detektionen
+            return
+        key = (camera_id, model_type, class_name)
+        sec = int(timestamp.timestamp())
+        with self._lock:
+            seconds = self._seconds.get(key)
+            if seconds is None:
+                seconds = self._seconds[key] = _Ring(SECOND_SLOTS)
+                self._minutes[key] = _Ring(MINUTE_SLOTS)
+            seconds.add(sec)
+            self._minutes[key].add(sec // 60)
+            self._seconds[_ALL].add(sec)
+            self._minutes[_ALL].add(sec // 60)
+
+    def written(self, rows: Sequence[Dict[str, Any]], ids: Sequence[int]) -> None:
+        """Geschriebene Events mit ihrer DB-id in die Liste der letzten Events (aus dem Writer-Thread)."""
+        events = [{"id": i, "camera_id": r["camera_id"], "model_type": r["model_type"],
+                   "class_name": r["class_name"], "timestamp": r["timestamp"]}
+                  for r, i in zip(rows, ids) if r["model_type"] != ZONE_MODEL_TYPE]
+        with self._lock:
+            self._recent.extend(events)
+
+    def warm_start(self) -> None:
+        """Minuten-Ringe (letzte Stunde) und letzte Events aus der DB vorbelegen."""
+        R = DetectionRollupMinute
+        since = datetime.now(timezone.utc) - timedelta(minutes=MINUTE_SLOTS)
+        try:
+            with SessionLocal() as db:
+                buckets = db.execute(select(R.bucket, R.camera_id, R.model_type, R.class_name, R.count)
+                                     .where(R.bucket >= since, R.model_type != ZONE_MODEL_TYPE)).all()
+                latest = db.execute(select(DetectionEvent.id, DetectionEvent.camera_id, DetectionEvent.model_type,
+                                           DetectionEvent.class_name, DetectionEvent.timestamp)
+                                    .where(DetectionEvent.model_type.is_distinct_from(ZONE_MODEL_TYPE))
+                                    .order_by(DetectionEvent.timestamp.desc())
+                                    .limit(self._recent.maxlen)).all()
+        except Exception as e:
+            log.warning("Live stats warm start failed: %s", e)
+            return
+        with self._lock:
+            for bucket, camera_id, model_type, class_name, count in buckets:
+                key = (None if camera_id == -1 else camera_id, model_type or None, class_name or None)
+                minute = int(bucket.timestamp()) // 60
+                self._minutes.setdefault(key, _Ring(MINUTE_SLOTS)).add(minute, count)
+                self._seconds.setdefault(key, _Ring(SECOND_SLOTS))
+                self._minutes[_ALL].add(minute, count)
+            for event_id, camera_id, model_type, class_name, ts in reversed(latest):
+                self._recent.append({"id": event_id, "camera_id": camera_id, "model_type": model_type,
+                                     "class_name": class_name, "timestamp": ts})
+
+    # ----------------------- Lesen (Endpoints) -----------------------
+
+    def detection_rate(self, minutes: int = MINUTE_SLOTS) -> List[Dict[str, Any]]:
+        """Minuten mit Detections, neueste zuerst (wie die frühere Rollup-Abfrage)."""
+        now = int(datetime.now(timezone.utc).timestamp()) // 60
+        ring = self._minutes[_ALL]
+        out = []
+        for m in range(now, now - min(minutes, MINUTE_SLOTS), -1):
+            n = ring.get(m)
+            if n:
+                out.append({"time": _utc(m * 60).isoformat(), "count": n})
+        return out
+
+    def per_second(self, seconds: int = 60) -> List[Dict[str, Any]]:
+        """Lückenlose Sekundenreihe (älteste zuerst)."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        ring = self._seconds[_ALL]
+        start = now - min(seconds, SECOND_SLOTS) + 1
+        return [{"time": _utc(s).isoformat(), "count": ring.get(s)} for s in range(start, now + 1)]
+
+    def breakdown(self, by: str, window_s: int) -> Dict[Any, int]:
+        """Summe je Kamera/Modell/Klasse über die letzten window_s Sekunden (> SECOND_SLOTS → Minuten)."""
+        dim = _DIMENSIONS[by]
+        now = int(datetime.now(timezone.utc).timestamp())
+        if window_s <= SECOND_SLOTS:
+            rings, start, end = self._seconds, now - window_s + 1, now
+        else:
+            rings, start, end = self._minutes, (now - window_s) // 60 + 1, now // 60
+        out: Dict[Any, int] = {}
+        for key, ring in list(rings.items()):
+            if key == _ALL:
+                continue
+            n = ring.total(start, end)
+            if n:
+                out[key[dim]] = out.get(key[dim], 0) + n
+        return out
+
+    def latest(self, n: int = 10) -> List[Dict[str, Any]]:
+        events = list(self._recent)[-n:]
+        return [{
+            "id": e["id"],
+            "model_type": e["model_type"],
+            "class_name": e["class_name"],
+            "camera_name": camera_cache.name(e["camera_id"]) if e["camera_id"] is not None else None,
+            "timestamp": e["timestamp"].isoformat(),
+        } for e in reversed(events)]
+
+
+live_stats = LiveStats(recent_size=settings.LIVE_STATS_RECENT_EVENTS)
@@ -1,52 +1,201 @@
 # backend/services/live_ws.py
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set, Union
+from collections import deque
 from starlette.websockets import WebSocket
 import asyncio
+import itertools
+import time
+
+from backend.core.settings import settings
+from backend.monitoring.metrics import metrics
+from backend.services.live_codec import encode_live_message
+
+
+class LiveClient:
+    """Ein verbundener Viewer mit eigener, begrenzter Sendequeue (drop-oldest)."""
+    def __init__(self, ws: WebSocket, client_id: int, session_id: Optional[int],
+                 camera_id: Optional[int], max_queue: int, binary: bool = False):
+        self.ws = ws
+        self.id = client_id
+        self.session_id = session_id
+        self.camera_id = camera_id
+        self.binary = binary  # True = VSL1-Binärframes (live_codec), sonst JSON
+        self.queue: deque = deque(maxlen=max(1, max_queue))
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.last_lag_s = 0.0
+
+    def matches(self, message: Dict[str, Any]) -> bool:
+        if self.session_id is not None and message.get("session_id") != self.session_id:
+            return False
+        if self.camera_id is not None and message.get("camera_id") != self.camera_id:
+            return False
+        return True
+
+    def offer(self, message: Union[Dict[str, Any], bytes], now: float) -> None:
+        """Nicht-blockierend einreihen; bei voller Queue fliegt die älteste Nachricht raus."""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            metrics.live_ws_messages_dropped.inc()
+        self.queue.append((now, message))
+        self.wakeup.set()
+
+    def info(self) -> Dict[str, Any]:
+        oldest = self.queue[0][0] if self.queue else None
+        return {
+            "client_id": self.id,
+            "session_id": self.session_id,
+            "camera_id": self.camera_id,
+            "format": "binary" if self.binary else "json",
+            "connected_at": self.connected_at,
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag_s": round(time.monotonic() - oldest, 4) if oldest is not None else 0.0,
+            "last_send_lag_s": round(self.last_lag_s, 4),
+        }
+
 
 class WebSocketHub:
-    def __init__(self):
-        self._clients: set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+    """
+    Fan-out für /ws/live.
+    Produzenten reihen nur ein (publish/broadcast), jeder Client hat einen eigenen
+    Sender-Task – ein langsamer Browser bremst weder andere Clients noch die Pipeline.
+    """
+    def __init__(self, max_queue: Optional[int] = None):
+        self.max_queue = max_queue or settings.LIVE_WS_QUEUE_SIZE
+        self._clients: Dict[WebSocket, LiveClient] = {}
+        # Abo-Index: None = alle Nachrichten, sonst nach session_id bzw. camera_id
+        self._all: Set[LiveClient] = set()
+        self._by_session: Dict[int, Set[LiveClient]] = {}
+        self._by_camera: Dict[int, Set[LiveClient]] = {}
+        self._ids = itertools.count(1)
+        self._binary_clients = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
-    async def connect(self, ws: WebSocket):
+    async def connect(self, ws: WebSocket, session_id: Optional[int] = None,
+                      camera_id: Optional[int] = None, binary: bool = False) -> LiveClient:
         await ws.accept()
-        async with self._lock:
-            self._clients.add(ws)
+        self._loop = asyncio.get_running_loop()
+        client = LiveClient(ws, next(self._ids), session_id, camera_id, self.max_queue, binary)
+        self._clients[ws] = client
+        self._binary_clients += int(binary)
+        self._index(client).add(client)
+        client.task = asyncio.create_task(self._sender(client))
+        metrics.live_ws_clients.set(len(self._clients))
+        return client
 
     async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._clients.discard(ws)
+        client = self._remove(ws)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def _index(self, client: LiveClient) -> Set[LiveClient]:
+        if client.session_id is not None:
+            return self._by_session.setdefault(client.session_id, set())
+        if client.camera_id is not None:
+            return self._by_camera.setdefault(client.camera_id, set())
+        return self._all
+
+    def _remove(self, ws: WebSocket) -> Optional[LiveClient]:
+        client = self._clients.pop(ws, None)
+        if client is None:
+            return None
+        self._binary_clients -= int(client.binary)
+        self._index(client).discard(client)
+        if client.session_id is not None and not self._by_session.get(client.session_id):
+            self._by_session.pop(client.session_id, None)
+        elif client.camera_id is not None and not self._by_camera.get(client.camera_id):
+            self._by_camera.pop(client.camera_id, None)
+        metrics.live_ws_clients.set(len(self._clients))
+        return client
+
+    async def _sender(self, client: LiveClient):
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+                while client.queue:
+                    queued_at, message = client.queue.popleft()
+                    if client.binary:
+                        await client.ws.send_bytes(message)
+                    else:
+                        await client.ws.send_json(message)
+                    client.sent += 1
+                    client.last_lag_s = time.monotonic() - queued_at
+                    metrics.live_ws_send_lag.observe(client.last_lag_s)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Verbindung tot → Client austragen, Rest läuft weiter
+            self._remove(client.ws)
+
+    def _fanout(self, message: Dict[str, Any], packed: Optional[bytes] = None) -> None:
+        """Läuft im Event-Loop; hängt die Nachricht nur an passende Queues an (kein await)."""
+        json_msg = message
+        if "frame_jpeg" in message:
+            # Rohes JPEG geht nur über das Binärformat
+            json_msg = {k: v for k, v in message.items() if k != "frame_jpeg"}
+        now = time.monotonic()
+        targets: List[Set[LiveClient]] = [self._all]
+        sid = message.get("session_id")
+        if sid in self._by_session:
+            targets.append(self._by_session[sid])
+        cid = message.get("camera_id")
+        if cid in self._by_camera:
+            targets.append(self._by_camera[cid])
+        for bucket in targets:
+            for client in bucket:
+                if not client.matches(message):
+                    continue
+                if client.binary:
+                    if "type" in message:
+                        continue  # typisierte Nachrichten (z.B. zone_events) gibt es nur als JSON
+                    if packed is None:
+                        packed = encode_live_message(message.get("session_id"), message)
+                    client.offer(packed, now)
+                else:
+                    client.offer(json_msg, now)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Thread-sicher und O(1) für den Aufrufer (z.B. Pipeline-Thread)."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._clients:
+            return  # niemand verbunden
+        # Binärframe einmal im Produzenten-Thread packen statt im Event-Loop
+        packed = (encode_live_message(message.get("session_id"), message)
+                  if self._binary_clients and "type" not in message else None)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(message, packed)
+        else:
+            loop.call_soon_threadsafe(self._fanout, message, packed)
 
     async def broadcast(self, message: Dict[str, Any]):
-        dead = []
-        async with self._lock:
-            for ws in list(self._clients):
-                try:
-                    await ws.send_json(message)
-                except Exception:
-                    dead.append(ws)
-            for ws in dead:
-                self._clients.discard(ws)
+        """Kompatibel zur alten API – blockiert nicht mehr auf langsamen Clients."""
+        self._fanout(message)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [c.info() for c in self._clients.values()]
 
 hub = WebSocketHub()
 
 class WebSocketSink:
-    """Sink API-kompatibel; nutzt hub.broadcast via Thread→asyncio bridge."""
-    def __init__(self):
-        import asyncio
-        try:
-            self.loop = asyncio.get_running_loop()
-        except RuntimeError:
-            self.loop = None
+    """Sink API-kompatibel; reicht Payloads nicht-blockierend an hub.publish weiter."""
+    def __init__(self, camera_id: Optional[int] = None):
+        self.camera_id = camera_id
 
     def write(self, session_id: int, payload: Dict[str, Any]) -> None:
         msg = {"session_id": session_id, **payload}
-        coro = hub.broadcast(msg)
-        if self.loop and self.loop.is_running():
-            asyncio.run_coroutine_threadsafe(coro, self.loop)
-        else:
-            # Not ideal, aber reicht im MVP
-            asyncio.get_event_loop().run_until_complete(coro)
+        if self.camera_id is not None:
+            msg.setdefault("camera_id", self.camera_id)
+        hub.publish(msg)
 
     def flush(self) -> None:
         pass
@@ -0,0 +1,36 @@
+# backend/services/maintenance.py
+"""Periodische Hintergrundjobs (Partitionspflege, Rollup-Kompaktierung, ...)."""
+import logging
+import threading
+from typing import Callable, Optional
+
+log = logging.getLogger("app")
+
+
+class PeriodicTask:
+    """Führt fn beim Start und danach alle interval_s Sekunden in einem Daemon-Thread aus."""
+    def __init__(self, name: str, fn: Callable[[], None], interval_s: float):
+        self.name = name
+        self.fn = fn
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.fn()
+            except Exception as e:
+                log.error("%s failed: %s", self.name, e)
+            if self._stop.wait(self.interval_s):
+                return
+
+    def stop(self) -> None:
+        self._stop.set()
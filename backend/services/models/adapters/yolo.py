@@ -1,8 +1,12 @@
 from __future__ import annotations
 from ultralytics import YOLO
 from typing import Any
+from backend.core.settings import settings
 from backend.services.models.interfaces import ModelAdapter, ModelTask, InferenceResult
 
+# Tasks, für die Ultralytics Boxen liefert und tracken kann
+_TRACKABLE = (ModelTask.detect, ModelTask.segment, ModelTask.pose)
+
 
 class YoloAdapter(ModelAdapter):
     def __init__(self, weights_path: str, task: ModelTask, version: str):
@@ -21,5 +25,17 @@ class YoloAdapter(ModelAdapter):
         names = getattr(r0, "names", {})
         return InferenceResult(raw=r0, names=names)
 
+    def track(self, frame: Any) -> InferenceResult:
+        """
+        predict + Tracker (boxes.id). Der Tracker-Zustand hängt am Modell,
+        daher braucht jeder Kamera-Worker einen eigenen Adapter.
+        """
+        if self.task not in _TRACKABLE or not settings.CAMERA_TRACKER:
+            return self.predict(frame)
+        results = self._model.track(frame, persist=True, tracker=settings.CAMERA_TRACKER, verbose=False)
+        r0 = results[0]
+        names = getattr(r0, "names", {})
+        return InferenceResult(raw=r0, names=names)
+
     def close(self) -> None:
         pass
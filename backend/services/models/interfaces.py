@@ -29,5 +29,6 @@ class ModelAdapter(Protocol):
     provider: str                     # z. B. "yolo", "onnx", "openvino"
 
     def predict(self, frame: Any) -> InferenceResult: ...
+    def track(self, frame: Any) -> InferenceResult: ...   # wie predict, mit Track-IDs über Frames hinweg
     def warmup(self) -> None: ...
     def close(self) -> None: ...
@@ -0,0 +1,177 @@
+# backend/services/partitions.py
+"""
+Partitionspflege für detection_events (Postgres RANGE-Partitionierung auf "timestamp").
+
+- ensure_partitions(): legt die nächsten DETECTION_PARTITIONS_AHEAD Partitionen an
+  (ensure_range(): beliebiger Zeitraum, z.B. für importierte/synthetische Altdaten)
+- expire_partitions(): Partitionen älter als DETECTION_RETENTION_DAYS droppen
+  oder (RETENTION_MODE=detach) abhängen und als eigene Tabelle behalten
+- partition_maintainer: läuft beim Start und danach periodisch im Hintergrund
+
+Auf SQLite oder einer (noch) nicht partitionierten Tabelle ist alles ein No-Op.
+"""
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+PARENT = "detection_events"
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def period_start(day: date, interval: str) -> date:
+    """Beginn der Partition, in die `day` fällt (Woche = ab Montag)."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+def period_end(start: date, interval: str) -> date:
+    return start + timedelta(days=7 if interval == "week" else 1)
+
+def partition_name(start: date) -> str:
+    return f"{PARENT}_p{start:%Y%m%d}"
+
+def create_partition_sql(start: date, end: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def _parse_bound(value: str) -> datetime:
+    # pg liefert z.B. "2026-10-19 00:00:00+00" (Offset ohne Minuten, je nach Session-TZ)
+    if re.search(r"[+-]\d\d$", value):
+        value += ":00"
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name AND c.relnamespace = 'public'::regnamespace"
+    ), {"name": PARENT}).first() is not None
+
+def list_partitions(conn: Connection) -> List[Tuple[str, datetime, datetime]]:
+    """(Name, von, bis) aller Range-Partitionen (ohne DEFAULT)."""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": PARENT}).all()
+    out = []
+    for name, bound in rows:
+        m = _BOUND_RE.search(bound or "")
+        if m:
+            out.append((name, _parse_bound(m.group(1)), _parse_bound(m.group(2))))
+    return sorted(out, key=lambda p: p[1])
+
+
+def ensure_partitions(conn: Connection, today: Optional[date] = None) -> List[str]:
+    """Aktuelle + kommende Partitionen anlegen; gibt die neu angelegten Namen zurück."""
+    interval = settings.DETECTION_PARTITION_INTERVAL
+    today = today or datetime.now(timezone.utc).date()
+    last = period_start(today, interval)
+    for _ in range(settings.DETECTION_PARTITIONS_AHEAD):
+        last = period_end(last, interval)
+    return ensure_range(conn, today, last)
+
+def default_partition(conn: Connection) -> Optional[str]:
+    return conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+    ), {"name": PARENT}).scalar()
+
+def _create_partition(conn: Connection, start: date, end: date, default: Optional[str]) -> int:
+    """
+    Partition anlegen. Liegen im Bereich schon Zeilen in der DEFAULT-Partition
+    (Maintainer war aus, schiefe Zeitstempel), würde CREATE scheitern – die Zeilen
+    werden vorher herausgenommen und danach in die neue Partition eingefügt.
+    """
+    bounds = {"lo": f"{start.isoformat()} 00:00:00+00", "hi": f"{end.isoformat()} 00:00:00+00"}
+    in_range = "timestamp >= CAST(:lo AS timestamptz) AND timestamp < CAST(:hi AS timestamptz)"
+    moved = 0
+    if default is not None:
+        moved = conn.execute(text(f"SELECT count(*) FROM {default} WHERE {in_range}"), bounds).scalar()
+    if moved:
+        conn.execute(text(
+            f"CREATE TEMP TABLE _partition_move ON COMMIT DROP AS "
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) SELECT * FROM moved"
+        ), bounds)
+    conn.execute(text(create_partition_sql(start, end)))
+    if moved:
+        conn.execute(text(f"INSERT INTO {PARENT} SELECT * FROM _partition_move"))
+        conn.execute(text("DROP TABLE _partition_move"))
+        log.warning("Moved %d rows from %s into new partition %s", moved, default, partition_name(start))
+    return moved
+
+def ensure_range(conn: Connection, first: date, last: date) -> List[str]:
+    """Partitionen für alle Perioden von first bis einschließlich last anlegen (z.B. für Altdaten)."""
+    interval = settings.DETECTION_PARTITION_INTERVAL
+    existing = [(lo, hi) for _, lo, hi in list_partitions(conn)]
+    default = default_partition(conn)
+    created = []
+    start = period_start(first, interval)
+    while start <= last:
+        end = period_end(start, interval)
+        lo = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+        hi = datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+        # Bereich schon (auch teilweise, z.B. nach Wechsel day→week) abgedeckt → überspringen
+        if not any(a < hi and b > lo for a, b in existing):
+            try:
+                with conn.begin_nested():  # Savepoint: ein Fehlschlag blockiert die übrigen Perioden nicht
+                    _create_partition(conn, start, end, default)
+                created.append(partition_name(start))
+            except DBAPIError as e:
+                log.error("Could not create partition %s for [%s, %s): %s",
+                          partition_name(start), start, end, str(e).splitlines()[0])
+        start = end
+    return created
+
+def expire_partitions(conn: Connection, now: Optional[datetime] = None) -> List[str]:
+    """Partitionen, deren Obergrenze vor dem Retention-Stichtag liegt, droppen bzw. abhängen."""
+    if settings.DETECTION_RETENTION_DAYS <= 0:
+        return []
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.DETECTION_RETENTION_DAYS)
+    expired = []
+    for name, _, upper in list_partitions(conn):
+        if upper > cutoff:
+            break
+        if settings.DETECTION_RETENTION_MODE == "detach":
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        else:
+            conn.execute(text(f"DROP TABLE {name}"))
+        expired.append(name)
+    return expired
+
+
+def run_maintenance() -> None:
+    # getrennte Transaktionen: ein Problem beim Anlegen hält die Retention nicht auf
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return
+        created = ensure_partitions(conn)
+    with engine.begin() as conn:
+        expired = expire_partitions(conn)
+    if created:
+        log.info("Created detection_events partitions: %s", ", ".join(created))
+    if expired:
+        log.info("%s expired detection_events partitions: %s",
+                 "Detached" if settings.DETECTION_RETENTION_MODE == "detach" else "Dropped",
+                 ", ".join(expired))
+
+
+partition_maintainer = PeriodicTask("partition-maintenance", run_maintenance,
+                                    interval_s=settings.PARTITION_MAINTENANCE_INTERVAL_S)
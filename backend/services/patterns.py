@@ -0,0 +1,98 @@
+# backend/services/patterns.py
+"""
+Tag × Stunde-Matrix in Ortszeit (PATTERN_TIMEZONE) für Stunden- und Wochentagsmuster.
+
+detection_pattern_hour hält pro lokalem Datum, lokaler Stunde, Kamera, Modell
+und Klasse die Summe. Sie wird nur aus den Rollups abgeleitet, nie aus den
+Rohdaten:
+
+- rebuild(): beim Start komplett – ältere Tage aus den Stunden-Rollups (bei
+  Zeitzonen mit :30/:45-Versatz zählt eine Stunde zu ihrem lokalen Beginn),
+  die letzten PATTERN_REFRESH_DAYS Tage exakt aus den Minuten-Rollups
+- refresh(): danach periodisch nur die letzten PATTERN_REFRESH_DAYS Tage
+
+Musterabfragen summieren so höchstens Tage × 24 Zellen je Schlüssel, egal wie
+viele Events dahinterstehen; ein Wechsel der Zeitzone wirkt beim nächsten Start.
+Auf anderen Datenbanken als Postgres ein No-Op.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+TABLE = "detection_pattern_hour"
+
+_INSERT = (
+    f"INSERT INTO {TABLE} (day, hour, camera_id, model_type, class_name, count) "
+    "SELECT (bucket AT TIME ZONE :tz)::date, extract(hour FROM bucket AT TIME ZONE :tz)::smallint, "
+    "camera_id, model_type, class_name, sum(count) "
+    "FROM {source} WHERE bucket >= :since AND bucket < :until GROUP BY 1, 2, 3, 4, 5"
+)
+
+
+def local_tz() -> ZoneInfo:
+    return ZoneInfo(settings.PATTERN_TIMEZONE)
+
+def local_today(now: Optional[datetime] = None) -> date:
+    return (now or datetime.now(timezone.utc)).astimezone(local_tz()).date()
+
+def local_midnight(day: date) -> datetime:
+    """Beginn des lokalen Tages als UTC-Zeitpunkt."""
+    return datetime.combine(day, time(), tzinfo=local_tz()).astimezone(timezone.utc)
+
+def _refresh_window(now: Optional[datetime] = None) -> Tuple[date, datetime]:
+    # nicht weiter zurück, als es Minuten-Buckets gibt
+    days = max(1, min(settings.PATTERN_REFRESH_DAYS, settings.ROLLUP_MINUTE_RETENTION_DAYS - 1))
+    first = local_today(now) - timedelta(days=days - 1)
+    return first, local_midnight(first)
+
+def _fill(conn: Connection, source: str, since: datetime, until: datetime) -> None:
+    conn.execute(text(_INSERT.format(source=source)),
+                 {"tz": settings.PATTERN_TIMEZONE, "since": since, "until": until})
+
+
+def refresh(conn: Connection, now: Optional[datetime] = None) -> date:
+    """Letzte PATTERN_REFRESH_DAYS lokale Tage aus den Minuten-Rollups neu berechnen."""
+    first, since = _refresh_window(now)
+    conn.execute(text(f"DELETE FROM {TABLE} WHERE day >= :first"), {"first": first})
+    _fill(conn, "detection_rollup_minute", since, datetime.max.replace(tzinfo=timezone.utc))
+    return first
+
+def rebuild(conn: Connection, now: Optional[datetime] = None) -> None:
+    """Ganze Tabelle neu (Stunden-Rollups bis zum Refresh-Fenster, danach Minuten-Rollups)."""
+    _, since = _refresh_window(now)
+    hour_until = since.replace(minute=0)   # Zeitzonen mit :30/:45 – Rest der Stunde aus den Minuten
+    conn.execute(text(f"DELETE FROM {TABLE}"))
+    _fill(conn, "detection_rollup_hour", datetime.min.replace(tzinfo=timezone.utc), hour_until)
+    _fill(conn, "detection_rollup_minute", hour_until, since)
+    refresh(conn, now)
+
+
+class PatternMaintainer:
+    """Erster Lauf: rebuild(), danach refresh()."""
+    def __init__(self):
+        self._built = False
+
+    def run(self) -> None:
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.begin() as conn:
+            if self._built:
+                refresh(conn)
+                return
+            rebuild(conn)
+        self._built = True
+        log.info("Rebuilt %s for time zone %s", TABLE, settings.PATTERN_TIMEZONE)
+
+
+pattern_maintainer = PeriodicTask("pattern-maintenance", PatternMaintainer().run,
+                                  interval_s=settings.PATTERN_REFRESH_INTERVAL_S)
@@ -0,0 +1,67 @@
+# backend/services/response_cache.py
+"""
+TTL-Cache für teure, lesende Endpoints (Dashboard-Statistiken).
+
+- Pro Eintrag eigene TTL (Endpoint entscheidet).
+- Request-Coalescing: fragen mehrere Dashboards gleichzeitig nach demselben
+  Schlüssel, läuft die Berechnung nur einmal; alle warten auf denselben Task.
+  Bricht ein Client ab, läuft die Berechnung für die übrigen weiter.
+- invalidate(namespace) erhöht nur eine Generation (threadsicher, auch aus dem
+  Event-Writer-Thread); Einträge älterer Generationen gelten als abgelaufen.
+- Abgelaufene Einträge fallen beim nächsten Miss weg.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from backend.monitoring.metrics import metrics
+
+Key = Tuple[str, Hashable]
+
+
+class ResponseCache:
+    def __init__(self):
+        self._entries: Dict[Key, Tuple[float, int, Any]] = {}   # key → (läuft ab, Generation, Wert)
+        self._inflight: Dict[Key, "asyncio.Task"] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_compute(self, namespace: str, key: Hashable, ttl_s: float,
+                             compute: Callable[[], Awaitable[Any]]) -> Any:
+        k = (namespace, key)
+        generation = self._generations.get(namespace, 0)
+        entry = self._entries.get(k)
+        if entry is not None and entry[0] > time.monotonic() and entry[1] == generation:
+            metrics.response_cache_requests.labels(namespace=namespace, result="hit").inc()
+            return entry[2]
+
+        task = self._inflight.get(k)
+        if task is None:
+            metrics.response_cache_requests.labels(namespace=namespace, result="miss").inc()
+            task = asyncio.ensure_future(self._fill(k, generation, ttl_s, compute))
+            self._inflight[k] = task
+        else:
+            metrics.response_cache_requests.labels(namespace=namespace, result="coalesced").inc()
+        return await asyncio.shield(task)
+
+    async def _fill(self, k: Key, generation: int, ttl_s: float, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            now = time.monotonic()
+            self._evict(now)
+            self._entries[k] = (now + ttl_s, generation, value)
+            return value
+        finally:
+            self._inflight.pop(k, None)
+
+    def _evict(self, now: float) -> None:
+        """Abgelaufene Einträge entfernen (bei jedem Miss; der Cache hält nur wenige Schlüssel)."""
+        stale = [k for k, (expires, generation, _) in self._entries.items()
+                 if expires <= now or generation != self._generations.get(k[0], 0)]
+        for k in stale:
+            del self._entries[k]
+
+    def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+
+response_cache = ResponseCache()
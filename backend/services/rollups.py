@@ -0,0 +1,100 @@
+# backend/services/rollups.py
+"""
+Minuten-/Stunden-Rollups für die Statistik-Endpoints.
+
+Der Event-Writer schreibt pro Batch die Zählungen in DERSELBEN Transaktion wie
+die Rohdaten fort (apply_batch, Upsert count = count + excluded.count). Damit
+sind die Rollups genau so aktuell wie detection_events, und die Endpoints
+müssen keinen Roh-"Tail" mehr nachzählen.
+
+backfill_rollups() rechnet einen Zeitraum aus den Rohdaten neu (Migration,
+Reparatur), compact_rollups() löscht alte Minuten-Buckets.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.models import DetectionRollupHour, DetectionRollupMinute
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+ROLLUP_TABLES = {
+    "minute": DetectionRollupMinute.__table__,
+    "hour": DetectionRollupHour.__table__,
+}
+_KEY = ("bucket", "camera_id", "model_type", "class_name")
+
+
+def truncate(ts: datetime, unit: str) -> datetime:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    ts = ts.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    return ts.replace(minute=0) if unit == "hour" else ts
+
+
+def _upsert(conn: Connection, table, values: List[Dict[str, Any]]):
+    dialect_insert = sqlite.insert if conn.dialect.name == "sqlite" else postgresql.insert
+    stmt = dialect_insert(table).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[k] for k in _KEY],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+
+
+def apply_batch(conn: Connection, rows: Iterable[Dict[str, Any]]) -> None:
+    """Zählungen eines Writer-Batches in beide Rollup-Tabellen addieren."""
+    rows = list(rows)
+    for unit, table in ROLLUP_TABLES.items():
+        counts: Counter = Counter(
+            (truncate(r["timestamp"], unit), -1 if r["camera_id"] is None else r["camera_id"],
+             r["model_type"] or "", r["class_name"] or "")
+            for r in rows
+        )
+        if not counts:
+            continue
+        # sortiert → feste Lock-Reihenfolge, falls doch einmal zwei Writer laufen
+        values = [dict(zip(_KEY, key), count=n) for key, n in sorted(counts.items())]
+        conn.execute(_upsert(conn, table, values))
+
+
+def backfill_rollups(conn: Connection, since: datetime, until: datetime) -> Tuple[datetime, datetime]:
+    """
+    Rollups für [since, until) aus detection_events neu berechnen (auf volle Stunden
+    ausgerichtet). Nur Zeiträume nehmen, in die der Writer nicht mehr schreibt.
+    """
+    since, until = truncate(since, "hour"), truncate(until, "hour")
+    for unit, table in ROLLUP_TABLES.items():
+        conn.execute(text(f"DELETE FROM {table.name} WHERE bucket >= :since AND bucket < :until"),
+                     {"since": since, "until": until})
+        conn.execute(text(
+            f"INSERT INTO {table.name} (bucket, camera_id, model_type, class_name, count) "
+            f"SELECT date_trunc('{unit}', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', "
+            f"COALESCE(camera_id, -1), COALESCE(model_type, ''), COALESCE(class_name, ''), count(*) "
+            f"FROM detection_events WHERE timestamp >= :since AND timestamp < :until "
+            f"GROUP BY 1, 2, 3, 4"
+        ), {"since": since, "until": until})
+    return since, until
+
+
+def compact_rollups(now: datetime | None = None) -> int:
+    """Minuten-Buckets jenseits ROLLUP_MINUTE_RETENTION_DAYS löschen (Stunden bleiben)."""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.ROLLUP_MINUTE_RETENTION_DAYS)
+    with engine.begin() as conn:
+        deleted = conn.execute(
+            DetectionRollupMinute.__table__.delete().where(DetectionRollupMinute.bucket < cutoff)
+        ).rowcount
+    if deleted:
+        log.info("Compacted %d minute rollup rows older than %s", deleted, cutoff.isoformat())
+    return deleted
+
+
+rollup_compactor = PeriodicTask("rollup-compaction", compact_rollups,
+                                interval_s=settings.ROLLUP_COMPACTION_INTERVAL_S)
@@ -0,0 +1,314 @@
+# backend/services/sketches.py
+"""
+Streaming-Sketches pro (camera_id, model_type, class_name), konstanter Speicher:
+
+- DDSketch für Konfidenz-Quantile (p50/p95/p99) mit relativer Genauigkeit
+  SKETCH_RELATIVE_ACCURACY. Konfidenzen liegen in (0, 1], daher ein fester
+  Bin-Bereich [SKETCH_MIN_CONFIDENCE, 1] als int64-Array (~350 Bins bei 1 %).
+- HyperLogLog (2^SKETCH_HLL_PRECISION Register, Standardfehler ≈ 1.04/√m) für
+  die Zahl verschiedener Track-IDs. Track-IDs des Trackers beginnen je
+  Worker-Start neu; der Startzeitpunkt geht deshalb als Salt in den Hash ein.
+
+Beide Sketches sind mergebar (Bins addieren, Register-Maximum): Abfragen über
+mehrere Kameras/Klassen mergen die passenden Schlüssel. sketch_persister
+schreibt den Stand periodisch nach detection_sketches (ein Prozess ist
+Eigentümer), load() übernimmt ihn beim Start.
+"""
+import logging
+import math
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.models import DetectionSketch
+from backend.monitoring.metrics import metrics
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+Key = Tuple[int, str, str]   # (camera_id | -1, model_type, class_name) wie in den Rollups
+QUANTILES = (0.5, 0.95, 0.99)
+_MASK64 = (1 << 64) - 1
+
+
+class DDSketch:
+    """DDSketch auf festem Wertebereich [min_value, 1]; kleinere Werte landen im untersten Bin."""
+    __slots__ = ("gamma", "log_gamma", "offset", "bins", "count", "min", "max", "sum")
+
+    def __init__(self, relative_accuracy: float, min_value: float):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = -math.ceil(math.log(min_value) / self.log_gamma)   # Index von min_value → 0
+        self.bins = np.zeros(self.offset + 1, dtype=np.int64)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        i = math.ceil(math.log(value) / self.log_gamma) + self.offset if value > 0 else 0
+        self.bins[min(max(i, 0), len(self.bins) - 1)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "DDSketch") -> None:
+        self.bins += other.bins
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        if not self.count:
+            return [None for _ in qs]
+        cumulative = np.cumsum(self.bins)
+        out = []
+        for q in qs:
+            i = int(np.searchsorted(cumulative, q * (self.count - 1), side="right"))
+            value = 2 * self.gamma ** (i - self.offset) / (self.gamma + 1)
+            out.append(min(max(value, self.min), self.max))
+        return out
+
+    def to_bytes(self) -> bytes:
+        header = np.array([self.count, self.min, self.max, self.sum], dtype=np.float64).tobytes()
+        return zlib.compress(header + self.bins.tobytes())
+
+    def load_bytes(self, data: bytes) -> None:
+        raw = zlib.decompress(data)
+        count, lo, hi, total = np.frombuffer(raw[:32], dtype=np.float64)
+        bins = np.frombuffer(raw[32:], dtype=np.int64)
+        if len(bins) != len(self.bins):
+            raise ValueError("DDSketch parameters changed, persisted state ignored")
+        other = DDSketch.__new__(DDSketch)
+        other.bins, other.count, other.min, other.max, other.sum = bins, int(count), float(lo), float(hi), float(total)
+        self.merge(other)
+
+
+class HyperLogLog:
+    __slots__ = ("p", "registers")
+
+    def __init__(self, precision: int):
+        self.p = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @staticmethod
+    def _hash(value: int) -> int:
+        """splitmix64 – schnell und gut verteilt für ganzzahlige IDs."""
+        z = (value + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+
+    def add(self, value: int) -> None:
+        h = self._hash(value & _MASK64)
+        rest_bits = 64 - self.p
+        idx = h >> rest_bits
+        rho = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rho > self.registers[idx]:
+            self.registers[idx] = rho
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))   # Linear Counting für kleine Mengen
+        return round(raw)
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(self.registers.tobytes())
+
+    def load_bytes(self, data: bytes) -> None:
+        registers = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+        if len(registers) != len(self.registers):
+            raise ValueError("HyperLogLog precision changed, persisted state ignored")
+        np.maximum(self.registers, registers, out=self.registers)
+
+
+class _Entry:
+    __slots__ = ("confidence", "tracks", "dirty")
+
+    def __init__(self, confidence: DDSketch):
+        self.confidence = confidence
+        self.tracks: Optional[HyperLogLog] = None   # erst beim ersten Track angelegt
+        self.dirty = True
+
+
+class DetectionSketches:
+    def __init__(self, relative_accuracy: float, min_confidence: float, hll_precision: int):
+        self.relative_accuracy = relative_accuracy
+        self.min_confidence = min_confidence
+        self.hll_precision = hll_precision
+        self._entries: Dict[Key, _Entry] = {}
+        self._lock = threading.Lock()
+        self._loaded = False   # erst nach erfolgreichem load() persistieren (sonst Überschreiben des Stands)
+
+    def _new_ddsketch(self) -> DDSketch:
+        return DDSketch(self.relative_accuracy, self.min_confidence)
+
+    def _entry(self, key: Key) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(self._new_ddsketch())
+        return entry
+
+    # ----------------------- Schreiben (Detection-Pfad) -----------------------
+
+    def observe(self, camera_id: Optional[int], model_type: str, class_name: str, confidence: float,
+                track_id: Optional[int] = None, salt: int = 0) -> None:
+        key = (-1 if camera_id is None else camera_id, model_type or "", class_name or "")
+        with self._lock:
+            entry = self._entry(key)
+            entry.confidence.add(confidence)
+            if track_id is not None:
+                if entry.tracks is None:
+                    entry.tracks = HyperLogLog(self.hll_precision)
+                entry.tracks.add((salt << 32) ^ track_id)
+            entry.dirty = True
+
+    # ----------------------- Lesen -----------------------
+
+    def summarize(self, by: Tuple[str, ...] = ("camera_id", "model_type", "class_name"),
+                  camera_id: Optional[int] = None, model: str = 'all',
+                  class_name: str = 'all') -> List[Dict[str, Any]]:
+        """Passende Schlüssel filtern, nach by gruppieren und je Gruppe mergen."""
+        groups: Dict[Tuple, Tuple[DDSketch, HyperLogLog, bool]] = {}
+        with self._lock:
+            for (cid, mt, cn), entry in self._entries.items():
+                if ((camera_id is not None and cid != camera_id) or (model != 'all' and mt != model)
+                        or (class_name != 'all' and cn != class_name)):
+                    continue
+                fields = {"camera_id": cid, "model_type": mt, "class_name": cn}
+                group = tuple(fields[f] for f in by)
+                if group not in groups:
+                    groups[group] = (self._new_ddsketch(), HyperLogLog(self.hll_precision), False)
+                confidence, tracks, has_tracks = groups[group]
+                confidence.merge(entry.confidence)
+                if entry.tracks is not None:
+                    tracks.merge(entry.tracks)
+                    groups[group] = (confidence, tracks, True)
+
+        out = []
+        for group, (confidence, tracks, has_tracks) in sorted(groups.items()):
+            item: Dict[str, Any] = {f: (None if f == "camera_id" and v == -1 else v) for f, v in zip(by, group)}
+            p50, p95, p99 = confidence.quantiles(QUANTILES)
+            item.update({
+                "count": confidence.count,
+                "confidence": {
+                    "p50": p50, "p95": p95, "p99": p99,
+                    "min": confidence.min if confidence.count else None,
+                    "max": confidence.max if confidence.count else None,
+                    "mean": confidence.sum / confidence.count if confidence.count else None,
+                },
+                "uniqueTracks": tracks.estimate() if has_tracks else None,
+            })
+            out.append(item)
+        return out
+
+    # ----------------------- Persistenz -----------------------
+
+    def load(self) -> bool:
+        """Persistierten Stand in die Sketches mergen (Start; bei Fehler erneut aus persist())."""
+        T = DetectionSketch.__table__
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(select(T)).all()
+        except Exception as e:
+            log.warning("Sketch load failed: %s", e)
+            return False
+        with self._lock:
+            for r in rows:
+                key = (r.camera_id, r.model_type, r.class_name)
+                seen = key in self._entries   # schon Daten seit dem Start → gemergt wieder schreiben
+                entry = self._entry(key)
+                try:
+                    entry.confidence.load_bytes(r.confidence)
+                    if r.tracks is not None:
+                        if entry.tracks is None:
+                            entry.tracks = HyperLogLog(self.hll_precision)
+                        entry.tracks.load_bytes(r.tracks)
+                except ValueError as e:
+                    log.warning("Sketch %s/%s/%s: %s", r.camera_id, r.model_type, r.class_name, e)
+                entry.dirty = seen
+            self._loaded = True
+        return True
+
+    def persist(self) -> int:
+        """Geänderte Sketches upserten und die Prometheus-Gauges nachziehen."""
+        if not self._loaded and not self.load():
+            return 0   # Stand in der DB unbekannt – nicht mit Daten seit dem Start überschreiben
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            values = []
+            changed = set()
+            for (cid, mt, cn), entry in self._entries.items():
+                if not entry.dirty:
+                    continue
+                values.append({
+                    "camera_id": cid, "model_type": mt, "class_name": cn,
+                    "count": entry.confidence.count,
+                    "confidence": entry.confidence.to_bytes(),
+                    "tracks": entry.tracks.to_bytes() if entry.tracks is not None else None,
+                    "updated_at": now,
+                })
+                changed.add((cid, mt))
+                entry.dirty = False
+        if not values:
+            return 0
+        self._update_gauges(changed)
+        T = DetectionSketch.__table__
+        try:
+            with engine.begin() as conn:
+                dialect_insert = sqlite.insert if conn.dialect.name == "sqlite" else postgresql.insert
+                stmt = dialect_insert(T).values(values)
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[T.c.camera_id, T.c.model_type, T.c.class_name],
+                    set_={c: stmt.excluded[c] for c in ("count", "confidence", "tracks", "updated_at")},
+                ))
+        except Exception:
+            with self._lock:   # beim nächsten Lauf erneut versuchen
+                for v in values:
+                    self._entries[(v["camera_id"], v["model_type"], v["class_name"])].dirty = True
+            raise
+        return len(values)
+
+    def close(self) -> None:
+        try:
+            self.persist()
+        except Exception as e:
+            log.warning("Final sketch persist failed: %s", e)
+
+    def _update_gauges(self, keys: Iterable[Tuple[int, str]]) -> None:
+        """Gauges nur pro (Kamera, Modell) – Klassen einzeln gibt es über /detection-stats/confidence."""
+        for cid, mt in keys:
+            for item in self.summarize(by=("camera_id", "model_type"), camera_id=cid, model=mt):
+                labels = {"camera_id": str(cid), "model_type": mt}
+                for q in ("p50", "p95", "p99"):
+                    if item["confidence"][q] is not None:
+                        metrics.detection_confidence_quantile.labels(quantile=q, **labels).set(item["confidence"][q])
+                if item["uniqueTracks"] is not None:
+                    metrics.detection_unique_tracks.labels(**labels).set(item["uniqueTracks"])
+
+detection_sketches = DetectionSketches(
+    relative_accuracy=settings.SKETCH_RELATIVE_ACCURACY,
+    min_confidence=settings.SKETCH_MIN_CONFIDENCE,
+    hll_precision=settings.SKETCH_HLL_PRECISION,
+)
+
+sketch_persister = PeriodicTask("sketch-persist", detection_sketches.persist,
+                                interval_s=settings.SKETCH_PERSIST_INTERVAL_S)
@@ -0,0 +1,368 @@
+# backend/services/spill_log.py
+"""
+Spill-Log: puffert Writer-Batches (Detection-Events, Pose-Frames) auf Platte,
+solange die Datenbank nicht erreichbar ist.
+
+Aufbau: append-only Segmentdateien <seq>.seg in SPILL_DIR, neue Datei ab
+SPILL_SEGMENT_MAX_MB, insgesamt höchstens SPILL_MAX_TOTAL_MB (danach fallen
+die ältesten Segmente weg). Ein Record:
+
+  u32 len | u32 crc32(payload) | f64 spill_ts | u32 rows | payload (JSON)
+
+fsync gebündelt (höchstens alle SPILL_FSYNC_INTERVAL_S). Der Replayer
+(spill_replayer) arbeitet die Segmente ältestes zuerst ab und übergibt
+mehrere Records auf einmal an den Handler des Streams; der Fortschritt steht
+in <seq>.ack. Zustellung ist at-least-once (Absturz zwischen Commit und Ack).
+
+Gespillt wird nur bei Verbindungsfehlern (is_connection_error). Lehnt die DB
+die Daten selbst ab, landen sie in quarantine.bad (JSON-Zeilen) statt im
+Replay: der Replayer teilt eine abgelehnte Gruppe in Einzel-Records und stellt
+einen Record nach SPILL_REPLAY_MAX_ATTEMPTS Fehlversuchen dort ab, damit er
+spätere Segmente nicht blockiert.
+"""
+import base64
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from backend.core.settings import settings
+from backend.monitoring.metrics import metrics
+from backend.services.maintenance import PeriodicTask
+
+log = logging.getLogger("app")
+
+_RECORD = struct.Struct("<IIdI")
+
+Handler = Callable[[List[Any]], None]
+
+QUARANTINE_FILE = "quarantine.bad"
+
+
+def is_connection_error(e: BaseException) -> bool:
+    """DB nicht erreichbar (→ spillen) statt Daten abgelehnt (→ Quarantäne)."""
+    if isinstance(e, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(e, DBAPIError) and e.connection_invalidated
+
+
+def _default(value: Any):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$b": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, datetime):
+        return {"$t": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"not serializable: {type(value).__name__}")
+
+def _hook(obj: Dict[str, Any]):
+    if len(obj) == 1:
+        if "$b" in obj:
+            return base64.b64decode(obj["$b"])
+        if "$t" in obj:
+            return datetime.fromisoformat(obj["$t"])
+    return obj
+
+
+@dataclass
+class _Segment:
+    seq: int
+    size: int = 0
+    rows: int = 0
+    first_ts: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.seq:012d}"
+
+
+class SpillLog:
+    def __init__(self, directory: str, segment_max_bytes: int, max_total_bytes: int,
+                 fsync_interval_s: float, replay_batch_rows: int, replay_max_attempts: int):
+        self.dir = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.fsync_interval_s = fsync_interval_s
+        self.replay_batch_rows = max(1, replay_batch_rows)
+        self.replay_max_attempts = max(1, replay_max_attempts)
+        self._handlers: Dict[str, Handler] = {}
+        self._segments: Dict[int, _Segment] = {}   # nach seq aufsteigend eingefügt
+        self._active = None                         # offene Datei des jüngsten Segments
+        self._last_fsync = 0.0
+        self._loaded = False
+        self._replaying: Optional[int] = None      # seq des Segments, das gerade abgespielt wird
+        self._failures: Dict[Tuple[int, int], int] = {}   # (seq, offset) → abgelehnte Versuche
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+
+    def register(self, stream: str, handler: Handler) -> None:
+        """handler(payloads) schreibt mehrere gespillte Batches eines Streams; wirft bei DB-Fehler."""
+        self._handlers[stream] = handler
+
+    # ----------------------- Laden -----------------------
+
+    def _path(self, seg: _Segment, suffix: str = ".seg") -> Path:
+        return self.dir / (seg.name + suffix)
+
+    def _load(self) -> None:
+        """Vorhandene Segmente einlesen (nach Neustart); abgeschnittene Tail-Records kappen."""
+        if self._loaded:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.dir.glob("*.seg")):
+            seg = _Segment(int(path.stem))
+            offset = self._read_ack(seg)
+            with open(path, "r+b") as f:
+                pos = 0
+                while True:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    length, _, ts, rows = _RECORD.unpack(header)
+                    f.seek(length, os.SEEK_CUR)
+                    if f.tell() > os.fstat(f.fileno()).st_size:
+                        break
+                    if pos >= offset:
+                        seg.rows += rows
+                        seg.first_ts = ts if seg.first_ts is None else seg.first_ts
+                    pos = f.tell()
+                f.truncate(pos)
+            seg.size = pos
+            self._segments[seg.seq] = seg
+        for path in self.dir.glob("*.ack"):
+            if int(path.stem) not in self._segments:
+                path.unlink(missing_ok=True)   # Ack ohne Segment (verworfen)
+        self._loaded = True
+        self._update_gauges()
+
+    def _read_ack(self, seg: _Segment) -> int:
+        try:
+            return int(self._path(seg, ".ack").read_text() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_ack(self, seg: _Segment, offset: int) -> None:
+        tmp = self._path(seg, ".ack.tmp")
+        tmp.write_text(str(offset))
+        os.replace(tmp, self._path(seg, ".ack"))
+
+    # ----------------------- Schreiben -----------------------
+
+    def append(self, stream: str, payload: Any, rows: int) -> bool:
+        """Batch auf Platte legen. False, wenn das Spill-Log ihn nicht aufnehmen konnte."""
+        try:
+            data = json.dumps({"s": stream, "p": payload}, default=_default, separators=(",", ":")).encode("utf-8")
+            record = _RECORD.pack(len(data), zlib.crc32(data), time.time(), rows) + data
+            with self._lock:
+                self._load()
+                if not self._make_room(len(record)):
+                    metrics.spill_rows_dropped.labels(stream=stream, reason="spill_full").inc(rows)
+                    return False
+                seg = self._active_segment(len(record))
+                self._active.write(record)
+                self._active.flush()
+                if time.monotonic() - self._last_fsync >= self.fsync_interval_s:
+                    os.fsync(self._active.fileno())
+                    self._last_fsync = time.monotonic()
+                seg.size += len(record)
+                seg.rows += rows
+                seg.first_ts = seg.first_ts or time.time()
+                self._update_gauges()
+        except Exception as e:
+            log.error("Spill log: append of %d %s rows failed: %s", rows, stream, e)
+            metrics.spill_rows_dropped.labels(stream=stream, reason="spill_error").inc(rows)
+            return False
+        metrics.spill_rows_written.labels(stream=stream).inc(rows)
+        return True
+
+    def _active_segment(self, record_size: int) -> _Segment:
+        seg = self._segments[max(self._segments)] if self._segments else None
+        if self._active is None or seg is None or seg.size + record_size > self.segment_max_bytes:
+            self._close_active()
+            seg = _Segment(max(self._segments, default=0) + 1)
+            self._segments[seg.seq] = seg
+            self._active = open(self._path(seg), "ab")
+        return seg
+
+    def _close_active(self) -> None:
+        if self._active is not None:
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            self._active.close()
+            self._active = None
+
+    def _make_room(self, needed: int) -> bool:
+        """Älteste abgeschlossene Segmente verwerfen, bis needed noch in das Gesamtlimit passt."""
+        while sum(s.size for s in self._segments.values()) + needed > self.max_total_bytes:
+            closed = [s for s in self._segments.values()
+                      if (self._active is None or s.seq != max(self._segments)) and s.seq != self._replaying]
+            if not closed:
+                return False
+            oldest = closed[0]
+            log.warning("Spill log full: dropping segment %s (%d rows)", oldest.name, oldest.rows)
+            metrics.spill_rows_dropped.labels(stream="all", reason="spill_full").inc(oldest.rows)
+            self._remove(oldest)
+        return True
+
+    def _remove(self, seg: _Segment) -> None:
+        self._segments.pop(seg.seq, None)
+        self._failures = {k: v for k, v in self._failures.items() if k[0] != seg.seq}
+        for suffix in (".seg", ".ack"):
+            self._path(seg, suffix).unlink(missing_ok=True)
+
+    def quarantine(self, stream: str, payloads: List[Any], rows: int, error: BaseException) -> None:
+        """Von der DB abgelehnte Batches zur Analyse ablegen (nicht erneut abspielen)."""
+        metrics.spill_rows_dropped.labels(stream=stream, reason="quarantined").inc(rows)
+        try:
+            line = json.dumps({"ts": time.time(), "s": stream, "error": str(error)[:500], "p": payloads},
+                              default=_default, separators=(",", ":")) + "\n"
+            with self._lock:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                path = self.dir / QUARANTINE_FILE
+                if path.exists() and path.stat().st_size + len(line) > self.max_total_bytes:
+                    log.error("Spill log: quarantine full, discarding %d %s rows", rows, stream)
+                    return
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except Exception as e:
+            log.error("Spill log: quarantine of %d %s rows failed: %s", rows, stream, e)
+            return
+        log.error("Spill log: %d %s rows rejected by the database, moved to %s: %s",
+                  rows, stream, QUARANTINE_FILE, error)
+
+    def _update_gauges(self) -> None:
+        metrics.spill_bytes.set(sum(s.size for s in self._segments.values()))
+        metrics.spill_segments.set(len(self._segments))
+        oldest = next((s.first_ts for s in self._segments.values() if s.rows and s.first_ts), None)
+        metrics.spill_replay_lag.set(time.time() - oldest if oldest else 0)
+
+    # ----------------------- Replay -----------------------
+
+    def replay(self) -> int:
+        """Alle Segmente abarbeiten; bricht beim ersten Fehler ab (nächster Lauf versucht es erneut)."""
+        replayed = 0
+        with self._replay_lock:
+            with self._lock:
+                self._load()
+            while True:
+                with self._lock:
+                    seg = next(iter(self._segments.values()), None)
+                    if seg is None:
+                        break
+                    if self._active is not None and seg.seq == max(self._segments):
+                        if not seg.rows:
+                            break
+                        self._close_active()   # jüngstes Segment abschließen, Writer beginnt ein neues
+                    self._replaying = seg.seq   # _make_room lässt es in Ruhe
+                try:
+                    replayed += self._replay_segment(seg)
+                except Exception as e:
+                    log.warning("Spill replay paused (segment %s): %s", seg.name, e)
+                    break
+                else:
+                    with self._lock:
+                        self._remove(seg)
+                        self._update_gauges()
+                finally:
+                    with self._lock:
+                        self._replaying = None
+        return replayed
+
+    def _replay_segment(self, seg: _Segment) -> int:
+        replayed = 0
+        offset = self._read_ack(seg)
+        with open(self._path(seg), "rb") as f:
+            f.seek(offset)
+            single_until = offset
+            while True:
+                start = f.tell()
+                # abgelehnte Gruppe Record für Record wiederholen, um den schuldigen zu finden
+                single = start < single_until or (seg.seq, start) in self._failures
+                stream, payloads, rows, end, next_ts = self._read_group(f, single)
+                if not payloads:
+                    return replayed
+                handler = self._handlers.get(stream)
+                if handler is None:
+                    log.error("Spill replay: no handler for stream %r, skipping %d rows", stream, rows)
+                    metrics.spill_rows_dropped.labels(stream=stream, reason="no_handler").inc(rows)
+                else:
+                    try:
+                        handler(payloads)
+                    except Exception as e:
+                        if is_connection_error(e):
+                            raise
+                        if len(payloads) > 1:
+                            single_until = end
+                            f.seek(start)
+                            continue
+                        attempts = self._failures.get((seg.seq, start), 0) + 1
+                        self._failures[(seg.seq, start)] = attempts
+                        if attempts < self.replay_max_attempts:
+                            raise
+                        self.quarantine(stream, payloads, rows, e)
+                    else:
+                        metrics.spill_rows_replayed.labels(stream=stream).inc(rows)
+                    self._failures.pop((seg.seq, start), None)
+                self._write_ack(seg, end)
+                replayed += rows
+                with self._lock:
+                    seg.rows = max(0, seg.rows - rows)
+                    seg.first_ts = next_ts
+                    self._update_gauges()
+                f.seek(end)
+
+    def _read_group(self, f, single: bool = False) -> Tuple[Optional[str], List[Any], int, int, Optional[float]]:
+        """Aufeinanderfolgende Records desselben Streams bis replay_batch_rows zusammenfassen."""
+        stream, payloads, rows = None, [], 0
+        end = f.tell()
+        while rows < self.replay_batch_rows and not (single and payloads):
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return stream, payloads, rows, end, None
+            length, crc, ts, n = _RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return stream, payloads, rows, end, None
+            if zlib.crc32(data) != crc:
+                log.error("Spill replay: corrupt record at offset %d, skipping", end)
+                metrics.spill_rows_dropped.labels(stream="all", reason="corrupt").inc(n)
+                end = f.tell()
+                continue
+            record = json.loads(data, object_hook=_hook)
+            if stream is not None and record["s"] != stream:
+                f.seek(end)
+                return stream, payloads, rows, end, ts
+            stream = record["s"]
+            payloads.append(record["p"])
+            rows += n
+            end = f.tell()
+        header = f.read(_RECORD.size)
+        return stream, payloads, rows, end, _RECORD.unpack(header)[2] if len(header) == _RECORD.size else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_active()
+
+
+spill_log = SpillLog(
+    directory=settings.SPILL_DIR,
+    segment_max_bytes=settings.SPILL_SEGMENT_MAX_MB * 1024 * 1024,
+    max_total_bytes=settings.SPILL_MAX_TOTAL_MB * 1024 * 1024,
+    fsync_interval_s=settings.SPILL_FSYNC_INTERVAL_S,
+    replay_batch_rows=settings.SPILL_REPLAY_BATCH_ROWS,
+    replay_max_attempts=settings.SPILL_REPLAY_MAX_ATTEMPTS,
+)
+
+spill_replayer = PeriodicTask("spill-replay", spill_log.replay, interval_s=settings.SPILL_REPLAY_INTERVAL_S)
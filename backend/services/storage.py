@@ -1,48 +1,224 @@
 # backend/services/storage.py
-from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session as OrmSession
-from backend.db_settings import SessionLocal
-from backend.models import PoseFrame
+"""
+DbSink: Tracks/Keypoints → pose_frames.
+
+write() läuft auf dem Pipeline-Thread und hängt nur an spaltenweise Listen an.
+Volle Puffer (Größe ODER Zeit) gehen an einen Hintergrund-Thread, der per
+Postgres-COPY schreibt (psycopg2 copy_expert) und sonst auf executemany fällt.
+Keypoints werden dort pro Batch vektorisiert kodiert (services/keypoint_codec.py).
+Ist die DB nicht erreichbar, geht der Batch ins Spill-Log (services/spill_log.py),
+lehnt sie die Daten ab, in dessen Quarantäne.
+"""
+import csv
+import io
+import logging
+import queue
+import threading
 import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from backend.core.settings import settings
+from backend.db_settings import engine
+from backend.models import PoseFrame
+from backend.monitoring.metrics import metrics
+from backend.services.keypoint_codec import encode_keypoints_batch
+from backend.services.spill_log import is_connection_error, spill_log
+
+log = logging.getLogger("app")
+
+POSE_COLUMNS = ("session_id", "ts_ms", "track_id", "label", "score", "x", "y", "w", "h", "keypoints")
+_COPY_SQL = f"COPY pose_frames ({', '.join(POSE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+
+class PoseColumns:
+    """Spaltenpuffer: eine Liste pro Spalte statt ein ORM-Objekt pro Track."""
+    def __init__(self):
+        self.cols: Dict[str, List[Any]] = {c: [] for c in POSE_COLUMNS}
+        self._encoded: Optional[List[Optional[bytes]]] = None
+
+    def __len__(self) -> int:
+        return len(self.cols["ts_ms"])
+
+    def append_track(self, session_id: int, t: Dict[str, Any]) -> None:
+        bbox = t.get("bbox") or (None, None, None, None)
+        c = self.cols
+        c["session_id"].append(session_id)
+        c["ts_ms"].append(int(t.get("ts_ms")))
+        c["track_id"].append(t.get("track_id"))
+        c["label"].append(t.get("label"))
+        c["score"].append(t.get("score"))
+        c["x"].append(bbox[0])
+        c["y"].append(bbox[1])
+        c["w"].append(bbox[2])
+        c["h"].append(bbox[3])
+        c["keypoints"].append(t.get("keypoints"))
+
+    def encoded_keypoints(self) -> List[Optional[bytes]]:
+        """Keypoint-Spalte als Blobs (einmal pro Batch, im Writer-Thread)."""
+        if self._encoded is None:
+            self._encoded = encode_keypoints_batch(self.cols["keypoints"])
+        return self._encoded
+
+    def to_csv(self) -> io.StringIO:
+        buf = io.StringIO()
+        out = csv.writer(buf)
+        c = self.cols
+        # bytea im COPY-Textformat: \x + Hex
+        kps = [None if k is None else "\\x" + k.hex() for k in self.encoded_keypoints()]
+        out.writerows(zip(*(c[name] for name in POSE_COLUMNS[:-1]), kps))
+        buf.seek(0)
+        return buf
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        c = self.cols
+        columns = [c[name] for name in POSE_COLUMNS[:-1]] + [self.encoded_keypoints()]
+        return [dict(zip(POSE_COLUMNS, values)) for values in zip(*columns)]
+
+    def to_payload(self) -> Dict[str, List[Any]]:
+        """Spalten mit kodierten Keypoints (für das Spill-Log)."""
+        return {**self.cols, "keypoints": self.encoded_keypoints()}
+
+    @classmethod
+    def from_payloads(cls, payloads: List[Dict[str, List[Any]]]) -> "PoseColumns":
+        batch = cls()
+        for p in payloads:
+            for name in POSE_COLUMNS:
+                batch.cols[name].extend(p[name])
+        batch._encoded = batch.cols["keypoints"]
+        return batch
+
+
+def _write_copy(batch: PoseColumns) -> None:
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.copy_expert(_COPY_SQL, batch.to_csv())
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+def _write_executemany(batch: PoseColumns) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(PoseFrame.__table__), batch.to_rows())
+
+
+def _use_copy() -> bool:
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+def _write_batch(batch: PoseColumns) -> str:
+    """COPY (sonst executemany); liefert die verwendete Methode, wirft bei DB-Fehler."""
+    if _use_copy():
+        try:
+            _write_copy(batch)
+            return "copy"
+        except Exception as e:
+            log.warning("Pose COPY failed, falling back to executemany: %s", e)
+    _write_executemany(batch)
+    return "executemany"
+
+def _replay_pose(payloads: List[Dict[str, List[Any]]]) -> None:
+    batch = PoseColumns.from_payloads(payloads)
+    metrics.pose_rows_written.labels(method=_write_batch(batch)).inc(len(batch))
+
+spill_log.register("pose", _replay_pose)
+
 
 class DbSink:
-    """Schreibt Tracks/Keypoints in pose_frames (schlank)."""
-    def __init__(self, batch_size: int = 64):
-        self.batch_size = batch_size
-        self._buffer: List[PoseFrame] = []
+    """Schreibt Tracks/Keypoints in pose_frames (Puffer spaltenweise, Flush im Hintergrund)."""
+    def __init__(self, batch_size: Optional[int] = None, flush_interval_s: Optional[float] = None,
+                 max_pending_batches: Optional[int] = None):
+        self.batch_size = max(1, batch_size or settings.POSE_BATCH_SIZE)
+        self.flush_interval_s = flush_interval_s or settings.POSE_FLUSH_INTERVAL_S
+        self.db_backoff_s = settings.SPILL_DB_BACKOFF_S
+        self._db_down_until = 0.0
+        self._lock = threading.Lock()
+        self._buffer = PoseColumns()
+        self._last_flush = time.monotonic()
+        self._pending: "queue.Queue[Optional[PoseColumns]]" = queue.Queue(
+            maxsize=max_pending_batches or settings.POSE_MAX_PENDING_BATCHES)
+        self._thread = threading.Thread(target=self._run, name="pose-writer", daemon=True)
+        self._thread.start()
+
+    # ----------------------- Pipeline-Thread -----------------------
 
     def write(self, session_id: int, payload: Dict[str, Any]) -> None:
-        tracks = payload.get("tracks", [])
-        for t in tracks:
-            kp = t.get("keypoints")
-            bbox = t.get("bbox") or [None, None, None, None]
-            pf = PoseFrame(
-                session_id=session_id,
-                ts_ms=int(t.get("ts_ms")),
-                track_id=t.get("track_id"),
-                x=bbox[0], y=bbox[1], w=bbox[2], h=bbox[3],
-                keypoints=kp
-            )
-            self._buffer.append(pf)
-        if len(self._buffer) >= self.batch_size:
-            self._flush_once()
-
-    def _flush_once(self):
-        if not self._buffer:
+        tracks = payload.get("tracks") or ()
+        with self._lock:
+            for t in tracks:
+                self._buffer.append_track(session_id, t)
+            due = len(self._buffer) >= self.batch_size
+        if due:
+            self._hand_off()
+
+    def _hand_off(self) -> None:
+        """Aktuellen Puffer tauschen und an den Writer übergeben (drop-oldest bei Stau)."""
+        with self._lock:
+            batch, self._buffer = self._buffer, PoseColumns()
+            self._last_flush = time.monotonic()
+        if not len(batch):
+            return
+        while True:
+            try:
+                self._pending.put_nowait(batch)
+                return
+            except queue.Full:
+                try:
+                    old = self._pending.get_nowait()
+                    if old is not None:
+                        metrics.pose_rows_dropped.labels(reason="backlog").inc(len(old))
+                except queue.Empty:
+                    pass
+
+    # ----------------------- Writer-Thread -----------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = self._pending.get(timeout=self.flush_interval_s / 2)
+            except queue.Empty:
+                # Zeit-Schwelle: auch halbvolle Puffer regelmäßig rausschreiben
+                if time.monotonic() - self._last_flush >= self.flush_interval_s:
+                    self._hand_off()
+                continue
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch: PoseColumns) -> None:
+        t0 = time.perf_counter()
+        if time.monotonic() < self._db_down_until:
+            self._spill(batch)
             return
-        db: OrmSession = SessionLocal()
         try:
-            db.add_all(self._buffer)
-            db.commit()
-            self._buffer.clear()
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            db.close()
+            method = _write_batch(batch)
+        except Exception as e:
+            if not is_connection_error(e):
+                spill_log.quarantine("pose", [batch.to_payload()], len(batch), e)
+                metrics.pose_rows_dropped.labels(reason="rejected").inc(len(batch))
+                return
+            log.error("DbSink: writing %d pose rows failed, spilling to disk: %s", len(batch), e)
+            self._db_down_until = time.monotonic() + self.db_backoff_s
+            self._spill(batch)
+            return
+        metrics.pose_flush_latency.observe(time.perf_counter() - t0)
+        metrics.pose_rows_written.labels(method=method).inc(len(batch))
+
+    def _spill(self, batch: PoseColumns) -> None:
+        if not spill_log.append("pose", batch.to_payload(), len(batch)):
+            metrics.pose_rows_dropped.labels(reason="db_error").inc(len(batch))
 
     def flush(self) -> None:
-        self._flush_once()
+        self._hand_off()
 
     def close(self) -> None:
-        self._flush_once()
+        if not self._thread.is_alive():
+            return
+        self._hand_off()
+        self._pending.put(None)
+        self._thread.join(timeout=10.0)
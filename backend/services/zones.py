@@ -0,0 +1,376 @@
+# backend/services/zones.py
+"""
+Zonen und Zähllinien pro Kamera, ausgewertet auf getrackten Boxen.
+
+Pro Frame (auch ohne Boxen, damit Tracks auslaufen) übergibt process_frame alle
+Boxen mit Track-ID (-1 = ohne). Der Bodenpunkt jeder
+Box (Mitte der Unterkante, normiert) wird gegen ALLE Polygone und Linien der
+Kamera auf einmal getestet:
+
+- Punkt-in-Polygon: Bounding-Box-Test über (Tracks × Zonen), Ray-Casting über
+  alle Kanten nur für die Kandidaten; Polygone sind auf gleiche Kantenzahl mit
+  NaN-Kanten aufgefüllt (zählen nie).
+- Linienübertritt: Seitenwechsel relativ zu a → b über (Tracks × Linien),
+  Segmentschnitt nur für die Wechsler; "in" = Ende auf der Seite mit
+  (b − a) × (p − a) > 0.
+
+Daraus entstehen Events enter / exit (mit dwell_s) / dwell (einmal pro Besuch,
+sobald dwell_alert_s überschritten) / cross. Ein Track, der länger als
+ZONE_TRACK_TIMEOUT_S fehlt, verlässt seine Zonen. Events gehen an den
+Event-Writer (model_type "zone", class_name "<Zone>:<Event>") und als
+{"type": "zone_events"} an /ws/live; Zähler liegen im Speicher.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.core.settings import settings
+from backend.db_settings import SessionLocal
+from backend.models import ZONE_MODEL_TYPE, CameraZone
+from backend.monitoring.metrics import metrics
+from backend.services.event_writer import event_writer
+from backend.services.live_ws import hub
+
+log = logging.getLogger("app")
+
+
+@dataclass(frozen=True)
+class ZoneInfo:
+    id: int
+    camera_id: int
+    name: str
+    kind: str                       # "zone" (Polygon) oder "line" (2 Punkte)
+    points: tuple                   # ((x, y), ...) normiert
+    classes: Optional[frozenset]    # None = alle Klassen
+    dwell_alert_s: Optional[float]
+
+    @classmethod
+    def from_model(cls, z: CameraZone) -> "ZoneInfo":
+        classes = frozenset(c.strip() for c in z.classes.split(",") if c.strip()) if z.classes else None
+        return cls(z.id, z.camera_id, z.name, z.kind, tuple(tuple(p) for p in z.points), classes or None,
+                   z.dwell_alert_s)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "camera_id": self.camera_id, "name": self.name, "kind": self.kind,
+            "points": [list(p) for p in self.points],
+            "classes": sorted(self.classes) if self.classes else None,
+            "dwell_alert_s": self.dwell_alert_s,
+        }
+
+
+class _Geometry:
+    """Vorberechnete Arrays aller Zonen/Linien einer Kamera."""
+    def __init__(self, zones: Sequence[ZoneInfo]):
+        self.polygons = [z for z in zones if z.kind == "zone"]
+        self.lines = [z for z in zones if z.kind == "line"]
+        n_edges = max((len(z.points) for z in self.polygons), default=0)
+        # Kanten (Z, E): Start- und Endpunkt, aufgefüllt mit NaN
+        self.x1 = np.full((len(self.polygons), n_edges), np.nan)
+        self.y1, self.x2, self.y2 = self.x1.copy(), self.x1.copy(), self.x1.copy()
+        for i, z in enumerate(self.polygons):
+            pts = np.asarray(z.points, dtype=np.float64)
+            nxt = np.roll(pts, -1, axis=0)
+            k = len(pts)
+            self.x1[i, :k], self.y1[i, :k], self.x2[i, :k], self.y2[i, :k] = pts[:, 0], pts[:, 1], nxt[:, 0], nxt[:, 1]
+        # Bounding-Boxen (Z,) für den Vorfilter
+        self.xmin = np.array([min(p[0] for p in z.points) for z in self.polygons])
+        self.xmax = np.array([max(p[0] for p in z.points) for z in self.polygons])
+        self.ymin = np.array([min(p[1] for p in z.points) for z in self.polygons])
+        self.ymax = np.array([max(p[1] for p in z.points) for z in self.polygons])
+        self.dwell_alert = np.array([z.dwell_alert_s if z.dwell_alert_s else np.inf for z in self.polygons])
+        # Linien (L, 2)
+        self.a = np.array([z.points[0] for z in self.lines], dtype=np.float64).reshape(-1, 2)
+        self.b = np.array([z.points[1] for z in self.lines], dtype=np.float64).reshape(-1, 2)
+        self.restricted = any(z.classes is not None for z in zones)   # sonst gelten alle Zonen für alle Klassen
+        self._class_masks: Dict[str, np.ndarray] = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.slope = (self.x2 - self.x1) / (self.y2 - self.y1)   # x-Zuwachs pro y entlang der Kante
+
+    def _class_mask(self, class_name: str) -> np.ndarray:
+        mask = self._class_masks.get(class_name)
+        if mask is None:
+            mask = self._class_masks[class_name] = np.array(
+                [z.classes is None or class_name in z.classes for z in self.polygons + self.lines], dtype=bool)
+        return mask
+
+    def class_masks(self, class_names: Sequence[str]) -> tuple:
+        """(Zonen-Maske (T, Z), Linien-Maske (T, L)) für die Klassen der Tracks."""
+        if not self.restricted:
+            n = len(class_names)
+            return np.ones((n, len(self.polygons)), dtype=bool), np.ones((n, len(self.lines)), dtype=bool)
+        masks = np.array([self._class_mask(c) for c in class_names], dtype=bool).reshape(len(class_names), -1)
+        return masks[:, :len(self.polygons)], masks[:, len(self.polygons):]
+
+    def inside(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """(T,) Punkte → (T, Z) bool. Bounding-Box-Vorfilter, Ray-Casting nur für Kandidaten."""
+        result = np.zeros((len(px), len(self.polygons)), dtype=bool)
+        cand = ((px[:, None] >= self.xmin) & (px[:, None] <= self.xmax)
+                & (py[:, None] >= self.ymin) & (py[:, None] <= self.ymax))
+        ti, zi = np.nonzero(cand)
+        if len(ti):
+            x, y = px[ti, None], py[ti, None]
+            y1 = self.y1[zi]
+            with np.errstate(invalid="ignore"):
+                hits = ((y1 > y) != (self.y2[zi] > y)) & (x < self.slope[zi] * (y - y1) + self.x1[zi])
+            result[ti, zi] = np.count_nonzero(hits, axis=1) & 1
+        return result
+
+    def crossings(self, p0: np.ndarray, p1: np.ndarray) -> tuple:
+        """Bewegungen p0 → p1 (T, 2) gegen Linien → (gekreuzt (T, L), Richtung "in" (T, L))."""
+        ax, ay, bx, by = self.a[:, 0], self.a[:, 1], self.b[:, 0], self.b[:, 1]
+        # Seite von Start/Ende relativ zu a → b; Wechsel halboffen (> 0 gegen ≤ 0),
+        # damit ein Punkt genau auf der Linie einmal zählt und nicht nie
+        side0 = (bx - ax) * (p0[:, 1, None] - ay) - (by - ay) * (p0[:, 0, None] - ax)
+        side1 = (bx - ax) * (p1[:, 1, None] - ay) - (by - ay) * (p1[:, 0, None] - ax)
+        crossed = ((side0 > 0) != (side1 > 0)) & ~np.isnan(side0)
+        ti, li = np.nonzero(crossed)
+        if len(ti):   # nur Seitenwechsler: liegt der Schnitt auch innerhalb der Strecke a–b?
+            mx, my = p1[ti, 0] - p0[ti, 0], p1[ti, 1] - p0[ti, 1]
+            da = mx * (ay[li] - p0[ti, 1]) - my * (ax[li] - p0[ti, 0])
+            db = mx * (by[li] - p0[ti, 1]) - my * (bx[li] - p0[ti, 0])
+            crossed[ti, li] = (da > 0) != (db > 0)
+        return crossed, side1 > 0
+
+
+class _Tracks:
+    """Zustand aller aktiven Tracks einer Kamera als Arrays (Zeile = Slot)."""
+    def __init__(self, n_zones: int, capacity: int = 64):
+        self.n_zones = n_zones
+        self.slot: Dict[int, int] = {}                 # track_id → Zeile
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.point = np.full((capacity, 2), np.nan)
+        self.inside = np.zeros((capacity, n_zones), dtype=bool)
+        self.entered_at = np.zeros((capacity, n_zones))
+        self.alerted = np.zeros((capacity, n_zones), dtype=bool)
+        self.last_seen = np.full(capacity, -np.inf)
+        self.class_name: List[Optional[str]] = [None] * capacity
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def _grow(self) -> None:
+        n = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.full(n, -1, dtype=np.int64)])
+        self.point = np.concatenate([self.point, np.full((n, 2), np.nan)])
+        self.inside = np.concatenate([self.inside, np.zeros((n, self.n_zones), dtype=bool)])
+        self.entered_at = np.concatenate([self.entered_at, np.zeros((n, self.n_zones))])
+        self.alerted = np.concatenate([self.alerted, np.zeros((n, self.n_zones), dtype=bool)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(n, -np.inf)])
+        self.class_name += [None] * n
+        self._free = list(range(2 * n - 1, n - 1, -1))
+
+    def slots(self, track_ids: List[int], class_names: List[str]) -> np.ndarray:
+        """Zeilen zu den Track-IDs, neue Tracks bekommen eine frische Zeile."""
+        rows = []
+        for tid, cls in zip(track_ids, class_names):
+            row = self.slot.get(tid)
+            if row is None:
+                if not self._free:
+                    self._grow()
+                row = self.slot[tid] = self._free.pop()
+                self.ids[row] = tid
+            self.class_name[row] = cls
+            rows.append(row)
+        return np.array(rows, dtype=np.intp)
+
+    def release(self, rows: np.ndarray) -> None:
+        for row in rows.tolist():
+            del self.slot[int(self.ids[row])]
+            self.ids[row] = -1
+            self.point[row] = np.nan
+            self.inside[row] = False
+            self.alerted[row] = False
+            self.last_seen[row] = -np.inf
+            self._free.append(row)
+
+
+@dataclass
+class _CameraState:
+    geometry: _Geometry
+    tracks: _Tracks
+    counts: Dict[int, Dict[str, int]] = field(default_factory=dict)   # zone_id → Zähler
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ZoneEngine:
+    def __init__(self, track_timeout_s: float):
+        self.track_timeout_s = track_timeout_s
+        self._cameras: Dict[int, _CameraState] = {}
+        self._zones: Dict[int, List[ZoneInfo]] = {}
+
+    # ----------------------- Konfiguration -----------------------
+
+    def load(self) -> None:
+        """Alle Zonen aus camera_zones lesen (Start)."""
+        db = SessionLocal()
+        try:
+            rows = db.query(CameraZone).order_by(CameraZone.id).all()
+        finally:
+            db.close()
+        by_camera: Dict[int, List[ZoneInfo]] = {}
+        for z in rows:
+            by_camera.setdefault(z.camera_id, []).append(ZoneInfo.from_model(z))
+        for camera_id in set(self._zones) | set(by_camera):
+            self.set_zones(camera_id, by_camera.get(camera_id, []))
+
+    def set_zones(self, camera_id: int, zones: List[ZoneInfo]) -> None:
+        """Zonen einer Kamera ersetzen (nach CRUD). Track-Zustände beginnen neu, Zähler bleiben."""
+        old = self._cameras.get(camera_id)
+        self._zones[camera_id] = list(zones)
+        if not zones:
+            self._cameras.pop(camera_id, None)
+            return
+        geometry = _Geometry(zones)
+        state = _CameraState(geometry, _Tracks(len(geometry.polygons)))
+        if old is not None:
+            state.counts = {zid: c for zid, c in old.counts.items() if any(z.id == zid for z in zones)}
+        self._cameras[camera_id] = state
+
+    def zones(self, camera_id: int) -> List[ZoneInfo]:
+        return self._zones.get(camera_id, [])
+
+    def has_zones(self, camera_id: int) -> bool:
+        return camera_id in self._cameras
+
+    # ----------------------- Auswertung (Pipeline-Thread) -----------------------
+
+    def update(self, camera_id: int, boxes: np.ndarray, track_ids: np.ndarray,
+               class_names: Sequence[str], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """boxes (N, 4) normiert xyxy, track_ids (N,) (-1 = ohne ID). Liefert die erzeugten Events."""
+        state = self._cameras.get(camera_id)
+        if state is None:
+            return []
+        now = time.time() if now is None else now
+        geo = state.geometry
+        with state.lock:
+            events = self._evaluate(camera_id, state, geo, boxes, track_ids, class_names, now)
+            events += self._expire(camera_id, state, geo, now)
+        if events:
+            self._emit(camera_id, events, boxes)
+        return events
+
+    def _evaluate(self, camera_id, state, geo, boxes, track_ids, class_names, now) -> List[Dict[str, Any]]:
+        keep = np.flatnonzero(track_ids >= 0)
+        if not len(keep):
+            return []
+        points = np.empty((len(keep), 2))
+        points[:, 0] = (boxes[keep, 0] + boxes[keep, 2]) * 0.5
+        points[:, 1] = boxes[keep, 3]
+        tids = track_ids[keep].tolist()
+        names = [class_names[i] for i in keep]
+        tr = state.tracks
+        rows = tr.slots(tids, names)
+        zone_mask, line_mask = geo.class_masks(names)
+
+        prev_points = tr.point[rows]
+        prev_inside = tr.inside[rows]
+        inside = geo.inside(points[:, 0], points[:, 1]) & zone_mask
+        changed = inside != prev_inside
+        events: List[Dict[str, Any]] = []
+
+        if changed.any():
+            entered = changed & inside
+            entered_rows, entered_zones = np.nonzero(entered)
+            tr.entered_at[rows[entered_rows], entered_zones] = now
+            tr.alerted[rows[entered_rows], entered_zones] = False
+            for i, z in zip(*np.nonzero(changed)):
+                if entered[i, z]:
+                    events.append(self._event(camera_id, geo.polygons[z], "enter", tids[i], names[i], now, box=keep[i]))
+                else:
+                    dwell = now - tr.entered_at[rows[i], z]
+                    events.append(self._event(camera_id, geo.polygons[z], "exit", tids[i], names[i], now,
+                                              box=keep[i], dwell_s=dwell))
+
+        due = inside & ~tr.alerted[rows] & (now - tr.entered_at[rows] >= geo.dwell_alert)
+        for i, z in zip(*np.nonzero(due)):
+            tr.alerted[rows[i], z] = True
+            events.append(self._event(camera_id, geo.polygons[z], "dwell", tids[i], names[i], now,
+                                      box=keep[i], dwell_s=now - tr.entered_at[rows[i], z]))
+
+        if len(geo.lines):
+            crossed, inward = geo.crossings(prev_points, points)
+            for i, l in zip(*np.nonzero(crossed & line_mask)):
+                events.append(self._event(camera_id, geo.lines[l], "cross", tids[i], names[i], now,
+                                          box=keep[i], direction="in" if inward[i, l] else "out"))
+
+        tr.point[rows] = points
+        tr.inside[rows] = inside
+        tr.last_seen[rows] = now
+        return events
+
+    def _expire(self, camera_id, state, geo, now) -> List[Dict[str, Any]]:
+        """Verschwundene Tracks verlassen ihre Zonen."""
+        tr = state.tracks
+        stale = np.flatnonzero(now - tr.last_seen > self.track_timeout_s)
+        stale = stale[tr.ids[stale] >= 0]
+        if not len(stale):
+            return []
+        events: List[Dict[str, Any]] = []
+        for row, z in zip(*np.nonzero(tr.inside[stale])):
+            r = stale[row]
+            events.append(self._event(camera_id, geo.polygons[z], "exit", int(tr.ids[r]), tr.class_name[r], now,
+                                      dwell_s=tr.last_seen[r] - tr.entered_at[r, z]))
+        tr.release(stale)
+        return events
+
+    def _event(self, camera_id, zone: ZoneInfo, event: str, track_id: int, class_name: str, now: float,
+               box: Optional[int] = None, dwell_s: Optional[float] = None,
+               direction: Optional[str] = None) -> Dict[str, Any]:
+        state = self._cameras.get(camera_id)
+        if state is not None:   # Zonen können parallel per API ersetzt worden sein
+            counts = state.counts.setdefault(zone.id, {})
+            key = direction if event == "cross" else event
+            counts[key] = counts.get(key, 0) + 1
+        return {
+            "camera_id": camera_id, "zone_id": zone.id, "zone": zone.name, "kind": zone.kind,
+            "event": event, "direction": direction, "class_name": class_name,
+            "track_id": track_id, "dwell_s": round(float(dwell_s), 2) if dwell_s is not None else None,
+            "ts": now, "_box": box,
+        }
+
+    def _emit(self, camera_id: int, events: List[Dict[str, Any]], boxes: np.ndarray) -> None:
+        per_type: Dict[str, int] = {}
+        for ev in events:
+            per_type[ev["event"]] = per_type.get(ev["event"], 0) + 1
+            i = ev.pop("_box")
+            bbox = None
+            if i is not None:
+                x1, y1, x2, y2 = boxes[i]
+                bbox = [x1, y1, x2 - x1, y2 - y1]
+            event_writer.submit(
+                f"{ev['zone']}:{ev['event']}" + (f":{ev['direction']}" if ev["direction"] else ""),
+                ZONE_MODEL_TYPE, camera_id,
+                timestamp=datetime.fromtimestamp(ev["ts"], tz=timezone.utc),
+                bbox=bbox, track_id=ev["track_id"],
+            )
+        for event, n in per_type.items():
+            metrics.zone_events.labels(event=event).inc(n)
+        hub.publish({"type": "zone_events", "camera_id": camera_id, "events": events})
+
+    # ----------------------- Lesen -----------------------
+
+    def counts(self, camera_id: int) -> List[Dict[str, Any]]:
+        """Zähler seit Start plus aktuelle Belegung je Zone/Linie."""
+        state = self._cameras.get(camera_id)
+        if state is None:
+            return []
+        with state.lock:
+            occupancy = state.tracks.inside.sum(axis=0)
+            out = []
+            for i, z in enumerate(state.geometry.polygons):
+                c = state.counts.get(z.id, {})
+                out.append({"zone_id": z.id, "name": z.name, "kind": "zone",
+                            "enter": c.get("enter", 0), "exit": c.get("exit", 0), "dwell": c.get("dwell", 0),
+                            "occupancy": int(occupancy[i])})
+            for z in state.geometry.lines:
+                c = state.counts.get(z.id, {})
+                out.append({"zone_id": z.id, "name": z.name, "kind": "line",
+                            "in": c.get("in", 0), "out": c.get("out", 0)})
+        return out
+
+
+zone_engine = ZoneEngine(track_timeout_s=settings.ZONE_TRACK_TIMEOUT_S)
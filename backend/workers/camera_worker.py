@@ -1,12 +1,26 @@
 # backend/workers/camera_worker.py
+import logging
+import threading
 import time
 
+import cv2
+
 from backend.core.pipeline import Pipeline
 from backend.services.ingestion.video import VideoSource
 from backend.services.inference.dummy import DummyInference
 from backend.services.tracking.naive import NaiveTracker
 from backend.services.storage import DbSink
 from backend.services.live_ws import WebSocketSink
+from backend.services.frame_processor import process_frame
+from backend.services.detection_service import save_event
+from backend.services.camera_manager import (
+    camera_running, video_captures, set_latest, set_placeholder_frame, mark_started, record_frame,
+)
+from backend.services.clip_recorder import clip_recorder
+from backend.services.fmp4_live import fmp4_hub
+from backend.monitoring.metrics import metrics
+
+log = logging.getLogger("app")
 
 class CameraWorker:
     def __init__(self, stream_url: str, session_id: int, fps_target: int = 25):
@@ -17,7 +31,7 @@ class CameraWorker:
             source=VideoSource(stream_url),
             inference=DummyInference(),
             tracker=NaiveTracker(),
-            sinks=[DbSink(batch_size=64), WebSocketSink()]
+            sinks=[DbSink(), WebSocketSink()]
         )
         self._stop = False
 
@@ -41,3 +55,64 @@ class CameraWorker:
 
     def stop(self):
         self._stop = True
+
+
+def run_camera_loop(camera_id: int, src, adapter, model_task: str, thread_name: str):
+    """
+    Live-Gegenstück zu run_video_job: liest die Kamera, Inferenz + Tracking über den
+    ModelAdapter (eigene Instanz pro Kamera, der Tracker hält Zustand),
+    annotiertes JPEG → camera_manager.set_latest + Clip-Ringpuffer, Events → DB.
+    active_cameras wird hier am Ende dekrementiert (nicht in cleanup()).
+    """
+    threading.current_thread().name = thread_name
+    cap = cv2.VideoCapture(src)
+    video_captures[camera_id] = cap
+    if not cap.isOpened():
+        log.error("%s: could not open source %s", thread_name, src)
+        metrics.record_error(str(camera_id), "SourceOpenError", "camera_worker")
+        camera_running[camera_id] = False
+        metrics.active_cameras.dec()
+        return
+
+    set_placeholder_frame(camera_id)
+    clip_recorder.drop(camera_id)   # keine Frames aus einem früheren Lauf in neuen Clips
+    mark_started(camera_id)
+    metrics.camera_status.labels(camera_id=str(camera_id), camera_name=thread_name).set(1)
+    persisted_model_type = "objectDetection" if model_task == "detect" else model_task
+
+    try:
+        while camera_running.get(camera_id, False):
+            ok, frame = cap.read()
+            if not ok:
+                time.sleep(0.05)
+                continue
+            record_frame(camera_id)
+
+            try:
+                res = adapter.track(frame)   # Track-IDs für Zonen, track_id und eindeutige Tracks
+                events = []
+                for out in process_frame(frame, res.raw, camera_id, model_task):
+                    if "class_name" in out:
+                        events.append(out)
+                    elif "frame" in out:
+                        fmp4_hub.offer(camera_id, out["frame"])  # No-Op ohne fMP4-Viewer
+                        ok_jpg, buf = cv2.imencode(".jpg", out["frame"])
+                        if ok_jpg:
+                            jpeg = buf.tobytes()
+                            set_latest(camera_id, jpeg)
+                            clip_recorder.push(camera_id, jpeg)
+
+                for ev in events:
+                    clip_path = clip_recorder.trigger(camera_id, ev["class_name"])
+                    save_event(ev["class_name"], persisted_model_type, camera_id, clip_path=clip_path,
+                               bbox=ev.get("bbox"), score=ev.get("score"), track_id=ev.get("track_id"))
+
+            except Exception as e:
+                log.error("%s: frame failed: %s", thread_name, e)
+                metrics.record_error(str(camera_id), type(e).__name__, "camera_worker")
+
+    finally:
+        cap.release()
+        clip_recorder.drop(camera_id)
+        metrics.camera_status.labels(camera_id=str(camera_id), camera_name=thread_name).set(0)
+        metrics.active_cameras.dec()  # nur hier dec!
@@ -6,7 +6,6 @@ from backend.services.detection_service import save_event
 from backend.services.video_manager import (
     set_latest, set_progress, set_error, video_running
 )
-from backend.db_settings import SessionLocal
 from backend.monitoring.metrics import metrics
 
 
@@ -44,7 +43,7 @@ def run_video_job(job_id: str, file_path: str, adapter, model_task: str, camera_
                 # Frame verarbeiten (res.raw ist provider-spezifisch; bei YOLO results[0])
                 for out in process_frame(frame, res.raw, camera_id or -1, model_task):
                     if "class_name" in out:
-                        events.append(out["class_name"])
+                        events.append(out)
                     elif "frame" in out:
                         ok_jpg, buf = cv2.imencode(".jpg", out["frame"])
                         if ok_jpg:
@@ -56,13 +55,10 @@ def run_video_job(job_id: str, file_path: str, adapter, model_task: str, camera_
 
                 # Events persistieren (gleich wie Live)
                 if events:
-                    db = SessionLocal()
-                    try:
-                        persisted_model_type = "objectDetection" if model_task == "detect" else model_task
-                        for cls in events:
-                            save_event(db, cls, persisted_model_type, camera_id or -1)
-                    finally:
-                        db.close()
+                    persisted_model_type = "objectDetection" if model_task == "detect" else model_task
+                    for ev in events:
+                        save_event(ev["class_name"], persisted_model_type, camera_id or -1,
+                                   bbox=ev.get("bbox"), score=ev.get("score"), track_id=ev.get("track_id"))
 
             except Exception as e:
                 set_error(job_id, str(e))
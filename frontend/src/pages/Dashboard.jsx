@@ -251,57 +251,47 @@ const Dashboard = () => {
     }
   };
 
-  // Fetch all data
-  const fetchAllData = async () => {
-    try {
-      const [
-        dailyRes,
-        weeklyRes,
-        statsRes,
-        realTimeRes,
-        topClassesRes,
-        cameraRes,
-        hourlyRes,
-        classesRes
-      ] = await Promise.all([
-        axios.get(`http://localhost:8000/api/detection-stats/daily?model=${selectedModel}`),
-        axios.get(`http://localhost:8000/api/detection-stats/weekly?model=${selectedModel}`),
-        axios.get('http://localhost:8000/api/detection-stats/summary'),
-        axios.get('http://localhost:8000/api/detection-stats/real-time'),
-        axios.get('http://localhost:8000/api/detection-stats/top-classes'),
-        axios.get('http://localhost:8000/api/detection-stats/camera-performance'),
-        axios.get('http://localhost:8000/api/detection-stats/hourly-pattern'),
-        axios.get(`http://localhost:8000/api/detection-stats/classes?model=${selectedModel}`)
-      ]);
-
-      // Process daily data
-      setDailyData(dailyRes.data.map(item => ({
+  // Apply dashboard views (full snapshot or delta: only keys present are updated)
+  const applyDashboard = (data) => {
+    if (data.daily) {
+      setDailyData(data.daily.map(item => ({
         ...item,
         hour: format(parseISO(item.timestamp), 'HH:mm'),
         count: parseInt(item.count)
       })));
+    }
 
-      // Process weekly data
-      setWeeklyData(weeklyRes.data.map(item => ({
+    if (data.weekly) {
+      setWeeklyData(data.weekly.map(item => ({
         ...item,
         date: format(parseISO(item.date), 'MMM dd'),
         count: parseInt(item.count)
       })));
+    }
 
-      setStats(statsRes.data);
-      setRealTimeStats(realTimeRes.data);
-      
-      // Calculate percentages for pie chart
-      const total = topClassesRes.data.reduce((sum, item) => sum + item.count, 0);
-      setTopClasses(topClassesRes.data.map(item => ({
+    if (data.summary) setStats(data.summary);
+    if (data.realTime) setRealTimeStats(data.realTime);
+
+    // Calculate percentages for pie chart
+    if (data.topClasses) {
+      const total = data.topClasses.reduce((sum, item) => sum + item.count, 0);
+      setTopClasses(data.topClasses.map(item => ({
         ...item,
         percentage: ((item.count / total) * 100).toFixed(1)
       })));
+    }
+
+    if (data.cameraPerformance) setCameraPerformance(data.cameraPerformance);
+    if (data.hourlyPattern) setHourlyPattern(data.hourlyPattern);
+    if (data.classes) setClassOptions(data.classes);
+  };
+
+  // Fetch all data (one aggregated request)
+  const fetchAllData = async () => {
+    try {
+      const res = await axios.get(`http://localhost:8000/api/dashboard?model=${selectedModel}`);
+      applyDashboard(res.data);
 
-      setCameraPerformance(cameraRes.data);
-      setHourlyPattern(hourlyRes.data);
-      setClassOptions(classesRes.data);
-      
       // Trigger animation on data load
       setAnimationKey(prev => prev + 1);
     } catch (error) {
@@ -315,12 +305,14 @@ const Dashboard = () => {
     fetchAllData();
   }, [selectedModel]);
 
-  // Auto-refresh every 30 seconds
+  // Live updates: server pushes only changed views (replaces 30s polling)
   useEffect(() => {
-    if (autoRefresh) {
-      const interval = setInterval(fetchAllData, 30000);
-      return () => clearInterval(interval);
-    }
+    if (!autoRefresh) return undefined;
+    const source = new EventSource(`http://localhost:8000/api/dashboard/stream?model=${selectedModel}`);
+    source.addEventListener('snapshot', (e) => applyDashboard(JSON.parse(e.data)));
+    source.addEventListener('update', (e) => applyDashboard(JSON.parse(e.data)));
+    source.onerror = () => console.warn('Dashboard stream interrupted, reconnecting...');
+    return () => source.close();
   }, [autoRefresh, selectedModel]);
 
   // Calculate trend
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Container,
@@ -39,15 +39,37 @@ const Detections = () => {
   const [selectedCamera, setSelectedCamera] = useState('all');
   const [cameras, setCameras] = useState([]);
 
+  const FEED_SIZE = 100;
+  const DETECTION_URL = 'http://localhost:8000/api/detection';
+  // Refresh cursor from the last response (X-Since-Id, always sent; ids also cover rows written late)
+  const sinceRef = useRef(null);
+
+  const rememberSince = (headers) => {
+    if (headers['x-since-id']) {
+      sinceRef.current = { since_id: headers['x-since-id'] };
+    }
+  };
+
+  // Columnar payload (parallel arrays) -> row objects
+  const fromColumns = (cols) => cols.id.map((id, i) => ({
+    id,
+    class_name: cols.class_name[i],
+    model_type: cols.model_type[i],
+    camera_id: cols.camera_id[i],
+    camera_name: cols.camera_name[i],
+    timestamp: new Date(cols.timestamp[i]).toISOString(),
+  }));
+
   const fetchDetections = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('http://localhost:8000/api/detection', {
+      const response = await axios.get(DETECTION_URL, {
         params: {
-          limit: 100,
+          limit: FEED_SIZE,
           offset: 0
         }
       });
+      rememberSince(response.headers);
       setDetections(response.data || []);
     } catch (error) {
       console.error('Error fetching detections:', error);
@@ -57,6 +79,33 @@ const Detections = () => {
     }
   };
 
+  // Only rows newer than the last response, oldest first; wait > 0 long-polls until new ones are written.
+  // Returns true if the server has more new rows than fit in one page (X-More-Pending).
+  const fetchNewDetections = async (wait = 0) => {
+    const response = await axios.get(DETECTION_URL, {
+      params: { ...sinceRef.current, limit: FEED_SIZE, format: 'columns', wait },
+      timeout: (wait + 10) * 1000,
+    });
+    rememberSince(response.headers);
+    const fresh = fromColumns(response.data).reverse();  // newest first, like the table
+    if (fresh.length) {
+      setDetections((prev) => {
+        const known = new Set(prev.map((d) => d.id));  // manual refresh and long-poll may overlap
+        return [...fresh.filter((d) => !known.has(d.id)), ...prev].slice(0, FEED_SIZE);
+      });
+    }
+    return response.headers['x-more-pending'] === '1';
+  };
+
+  const refreshDetections = async () => {
+    if (!sinceRef.current) return fetchDetections();
+    try {
+      await fetchNewDetections();
+    } catch (error) {
+      console.error('Error refreshing detections:', error);
+    }
+  };
+
   const fetchCameras = async () => {
     try {
       const response = await axios.get('http://localhost:8000/api/cameras');
@@ -71,6 +120,32 @@ const Detections = () => {
     fetchCameras();
   }, []);
 
+  // Live feed: long-poll for new detections while the page is open
+  useEffect(() => {
+    let active = true;
+    const pause = () => new Promise((resolve) => setTimeout(resolve, 5000));
+    const poll = async () => {
+      let more = false;
+      while (active) {
+        try {
+          if (!sinceRef.current) {
+            // initial load still running or failed: retry it, it sets the cursor
+            await pause();
+            if (!sinceRef.current && active) await fetchDetections();
+            continue;
+          }
+          // catching up on a backlog: next page right away, otherwise wait for new rows
+          more = await fetchNewDetections(more ? 0 : 25);
+        } catch (error) {
+          more = false;
+          if (active) await pause();
+        }
+      }
+    };
+    poll();
+    return () => { active = false; };
+  }, []);
+
   const filteredDetections = detections.filter(detection => {
     const matchesSearch = detection.class_name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
                          detection.camera_name?.toLowerCase().includes(searchTerm.toLowerCase());
@@ -186,7 +261,7 @@ const Detections = () => {
           </Grid>
           <Grid item xs={12} md={2}>
             <IconButton
-              onClick={fetchDetections}
+              onClick={refreshDetections}
               sx={{
                 backgroundColor: alpha(theme.palette.primary.main, 0.1),
                 '&:hover': {
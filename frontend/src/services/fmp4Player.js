@@ -0,0 +1,77 @@
+// MSE-Player für /ws/fmp4/{cameraId} (H.264 als fragmentiertes MP4).
+// Ablauf: Text {"mime": ...} → Init-Segment → Media-Segmente (je ab Keyframe).
+
+const MAX_BUFFER_SECONDS = 10;
+
+/**
+ * Hängt den Live-Stream einer Kamera an ein <video>-Element.
+ * Gibt eine Funktion zum Beenden zurück. Fällt still aus (onError), wenn der
+ * Browser den Codec nicht kann – dann weiter mit /process_frame (JPEG).
+ */
+export const attachFmp4Stream = (video, baseUrl, cameraId, onError = () => {}) => {
+  const ws = new WebSocket(`${baseUrl.replace(/^http/, 'ws')}/ws/fmp4/${cameraId}`);
+  ws.binaryType = 'arraybuffer';
+
+  const mediaSource = new MediaSource();
+  const queue = [];
+  let sourceBuffer = null;
+  let closed = false;
+
+  video.src = URL.createObjectURL(mediaSource);
+
+  const pump = () => {
+    if (!sourceBuffer || sourceBuffer.updating || queue.length === 0) return;
+    const buffered = sourceBuffer.buffered;
+    if (buffered.length && buffered.end(0) - buffered.start(0) > MAX_BUFFER_SECONDS) {
+      // alten Puffer wegwerfen, damit der Speicher nicht wächst
+      sourceBuffer.remove(buffered.start(0), buffered.end(0) - MAX_BUFFER_SECONDS / 2);
+      return;
+    }
+    sourceBuffer.appendBuffer(queue.shift());
+  };
+
+  const jumpToLiveEdge = () => {
+    const buffered = sourceBuffer.buffered;
+    if (buffered.length && video.currentTime < buffered.start(0)) {
+      video.currentTime = buffered.start(0);
+    }
+    video.play().catch(() => {});
+  };
+
+  ws.onmessage = (event) => {
+    if (typeof event.data === 'string') {
+      const { mime } = JSON.parse(event.data);
+      if (!MediaSource.isTypeSupported(mime)) {
+        onError(new Error(`Codec not supported: ${mime}`));
+        ws.close();
+        return;
+      }
+      const init = () => {
+        sourceBuffer = mediaSource.addSourceBuffer(mime);
+        sourceBuffer.addEventListener('updateend', () => {
+          jumpToLiveEdge();
+          pump();
+        });
+        pump();
+      };
+      if (mediaSource.readyState === 'open') init();
+      else mediaSource.addEventListener('sourceopen', init, { once: true });
+      return;
+    }
+    queue.push(event.data);
+    pump();
+  };
+
+  ws.onclose = (event) => {
+    if (!closed && event.code !== 1000) onError(new Error(event.reason || 'fMP4 stream closed'));
+  };
+
+  return () => {
+    closed = true;
+    ws.close();
+    if (mediaSource.readyState === 'open') {
+      try { mediaSource.endOfStream(); } catch { /* ignore */ }
+    }
+    URL.revokeObjectURL(video.src);
+  };
+};
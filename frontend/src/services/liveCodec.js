@@ -0,0 +1,96 @@
+// Decoder für das binäre Live-Format (VSL1) von /ws/live?format=binary.
+// Layout siehe backend/services/live_codec.py – beide Seiten immer zusammen ändern.
+
+const MAGIC = 'VSL1';
+const HEADER_SIZE = 32;
+const FLAG_KEYPOINTS = 0x01;
+const FLAG_FRAME = 0x02;
+
+const pad4 = (n) => (4 - (n % 4)) % 4;
+
+/**
+ * Dekodiert eine Binärnachricht.
+ * Arrays sind Views auf den ArrayBuffer (kein Kopieren):
+ *   boxes: Float32Array(n*4)  [x, y, w, h, ...]
+ *   scores: Float32Array(n)
+ *   trackIds: Int32Array(n)    -1 = ohne ID
+ *   keypoints: Float32Array(n*nKp*3) | null   [x, y, conf, ...]
+ *   frame: Blob(image/jpeg) | null
+ */
+export const decodeLiveMessage = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+  );
+  if (magic !== MAGIC || view.getUint8(4) !== 1) {
+    throw new Error('Unsupported live message');
+  }
+
+  const flags = view.getUint8(5);
+  const n = view.getUint16(6, true);
+  const nKp = view.getUint16(8, true);
+  const schemaLen = view.getUint16(10, true);
+  const sessionId = view.getInt32(12, true);
+  const cameraId = view.getInt32(16, true);
+  const tsMs = view.getFloat64(20, true);
+  const frameLen = view.getUint32(28, true);
+
+  let offset = HEADER_SIZE;
+  const schema = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, offset, schemaLen))
+  );
+  offset += schemaLen + pad4(schemaLen);
+
+  const boxes = new Float32Array(buffer, offset, n * 4);
+  offset += boxes.byteLength;
+  const scores = new Float32Array(buffer, offset, n);
+  offset += scores.byteLength;
+  const trackIds = new Int32Array(buffer, offset, n);
+  offset += trackIds.byteLength;
+  const labelIds = new Uint16Array(buffer, offset, n);
+  offset += labelIds.byteLength + pad4(labelIds.byteLength);
+
+  let keypoints = null;
+  if (flags & FLAG_KEYPOINTS) {
+    keypoints = new Float32Array(buffer, offset, n * nKp * 3);
+    offset += keypoints.byteLength;
+  }
+
+  let frame = null;
+  if (flags & FLAG_FRAME) {
+    frame = new Blob([new Uint8Array(buffer, offset, frameLen)], { type: 'image/jpeg' });
+  }
+
+  return {
+    sessionId,
+    cameraId: cameraId < 0 ? null : cameraId,
+    tsMs,
+    count: n,
+    labels: Array.from(labelIds, (i) => schema.labels[i]),
+    kpNames: schema.kp_names,
+    boxes,
+    scores,
+    trackIds,
+    keypoints,
+    frame,
+  };
+};
+
+/**
+ * Öffnet /ws/live im Binärmodus und ruft onMessage mit dekodierten Nachrichten auf.
+ * Gibt den WebSocket zurück (zum Schließen).
+ */
+export const openLiveSocket = (baseUrl, { sessionId, cameraId } = {}, onMessage) => {
+  const params = new URLSearchParams({ format: 'binary' });
+  if (sessionId != null) params.set('session_id', sessionId);
+  if (cameraId != null) params.set('camera_id', cameraId);
+
+  const ws = new WebSocket(`${baseUrl.replace(/^http/, 'ws')}/ws/live?${params}`);
+  ws.binaryType = 'arraybuffer';
+  ws.onmessage = (event) => {
+    if (event.data instanceof ArrayBuffer) {
+      onMessage(decodeLiveMessage(event.data));
+    }
+  };
+  return ws;
+};
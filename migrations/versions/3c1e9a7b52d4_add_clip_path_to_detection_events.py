@@ -0,0 +1,26 @@
+"""add clip_path to detection_events
+
+Revision ID: 3c1e9a7b52d4
+Revises: 0f1db616da92
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e9a7b52d4'
+down_revision: Union[str, None] = '0f1db616da92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('detection_events', sa.Column('clip_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('detection_events', 'clip_path')
@@ -0,0 +1,42 @@
+"""create pose_frames
+
+Revision ID: 7a4d2f9c1e63
+Revises: 3c1e9a7b52d4
+Create Date: 2026-10-19 13:20:07.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2f9c1e63'
+down_revision: Union[str, None] = '3c1e9a7b52d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pose_frames',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('ts_ms', sa.BigInteger(), nullable=False),
+        sa.Column('track_id', sa.Integer(), nullable=True),
+        sa.Column('label', sa.String(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('x', sa.Float(), nullable=True),
+        sa.Column('y', sa.Float(), nullable=True),
+        sa.Column('w', sa.Float(), nullable=True),
+        sa.Column('h', sa.Float(), nullable=True),
+        sa.Column('keypoints', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+    )
+    op.create_index('ix_pose_frames_session_ts', 'pose_frames', ['session_id', 'ts_ms'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pose_frames_session_ts', table_name='pose_frames')
+    op.drop_table('pose_frames')
@@ -0,0 +1,87 @@
+"""partition detection_events by timestamp
+
+Revision ID: 9b3f6e2a8c17
+Revises: 7a4d2f9c1e63
+Create Date: 2026-10-19 14:02:51.117340
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.core.settings import settings
+from backend.services.partitions import create_partition_sql, period_end, period_start
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6e2a8c17'
+down_revision: Union[str, None] = '7a4d2f9c1e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, model_type, timestamp, class_name, camera_id, camera_name, clip_path"
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute("ALTER TABLE detection_events RENAME TO detection_events_legacy")
+    op.execute("""
+        CREATE TABLE detection_events (
+            id INTEGER NOT NULL DEFAULT nextval('detection_events_id_seq'),
+            model_type VARCHAR,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            class_name VARCHAR,
+            camera_id INTEGER,
+            camera_name VARCHAR,
+            clip_path VARCHAR,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    # Sequenz an die neue Tabelle hängen, sonst fällt sie mit der alten weg
+    op.execute("ALTER SEQUENCE detection_events_id_seq OWNED BY detection_events.id")
+    op.execute("CREATE TABLE detection_events_default PARTITION OF detection_events DEFAULT")
+
+    # Partitionen vom ältesten Bestandsdatum bis DETECTION_PARTITIONS_AHEAD in die Zukunft
+    interval = settings.DETECTION_PARTITION_INTERVAL
+    today = datetime.now(timezone.utc).date()
+    oldest = conn.execute(sa.text("SELECT min(timestamp) FROM detection_events_legacy")).scalar()
+    start = period_start(oldest.astimezone(timezone.utc).date() if oldest else today, interval)
+    last = period_start(today, interval) + timedelta(days=(7 if interval == "week" else 1) * settings.DETECTION_PARTITIONS_AHEAD)
+    while start <= last:
+        end = period_end(start, interval)
+        op.execute(create_partition_sql(start, end))
+        start = end
+
+    op.execute(f"""
+        INSERT INTO detection_events ({COLUMNS})
+        SELECT id, model_type, COALESCE(timestamp, now()), class_name, camera_id, camera_name, clip_path
+        FROM detection_events_legacy
+    """)
+    op.execute("DROP TABLE detection_events_legacy")
+    op.create_index('ix_detection_events_model_type', 'detection_events', ['model_type'])
+    op.create_index('ix_detection_events_camera_id', 'detection_events', ['camera_id'])
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE detection_events RENAME TO detection_events_partitioned")
+    op.execute("ALTER INDEX ix_detection_events_model_type RENAME TO ix_detection_events_partitioned_model_type")
+    op.execute("ALTER INDEX ix_detection_events_camera_id RENAME TO ix_detection_events_partitioned_camera_id")
+    op.execute("""
+        CREATE TABLE detection_events (
+            id INTEGER NOT NULL DEFAULT nextval('detection_events_id_seq') PRIMARY KEY,
+            model_type VARCHAR,
+            timestamp TIMESTAMP WITH TIME ZONE,
+            class_name VARCHAR,
+            camera_id INTEGER,
+            camera_name VARCHAR,
+            clip_path VARCHAR
+        )
+    """)
+    op.execute("ALTER SEQUENCE detection_events_id_seq OWNED BY detection_events.id")
+    op.execute(f"INSERT INTO detection_events ({COLUMNS}) SELECT {COLUMNS} FROM detection_events_partitioned")
+    op.execute("DROP TABLE detection_events_partitioned")
+    op.create_index('ix_detection_events_id', 'detection_events', ['id'])
+    op.create_index('ix_detection_events_model_type', 'detection_events', ['model_type'])
+    op.create_index('ix_detection_events_camera_id', 'detection_events', ['camera_id'])
@@ -0,0 +1,36 @@
+"""add detection_sketches (persisted DDSketch/HyperLogLog state)
+
+Revision ID: a7c3e5f91d24
+Revises: f4a9c2e7b318
+Create Date: 2026-10-19 19:12:08.114530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f91d24'
+down_revision: Union[str, None] = 'f4a9c2e7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'detection_sketches',
+        sa.Column('camera_id', sa.Integer(), nullable=False),
+        sa.Column('model_type', sa.String(), nullable=False),
+        sa.Column('class_name', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('confidence', sa.LargeBinary(), nullable=False),
+        sa.Column('tracks', sa.LargeBinary(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('camera_id', 'model_type', 'class_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('detection_sketches')
@@ -0,0 +1,40 @@
+"""add camera_zones (polygon zones and counting lines per camera)
+
+Revision ID: b9e1d3a6c752
+Revises: a7c3e5f91d24
+Create Date: 2026-10-19 20:31:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e1d3a6c752'
+down_revision: Union[str, None] = 'a7c3e5f91d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'camera_zones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('camera_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('points', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+        sa.Column('classes', sa.String(), nullable=True),
+        sa.Column('dwell_alert_s', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_camera_zones_camera_id', 'camera_zones', ['camera_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_camera_zones_camera_id', table_name='camera_zones')
+    op.drop_table('camera_zones')
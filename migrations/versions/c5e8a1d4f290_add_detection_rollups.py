@@ -0,0 +1,46 @@
+"""add detection rollup tables
+
+Revision ID: c5e8a1d4f290
+Revises: 9b3f6e2a8c17
+Create Date: 2026-10-19 15:10:32.640581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1d4f290'
+down_revision: Union[str, None] = '9b3f6e2a8c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUPS = (('detection_rollup_minute', 'minute'), ('detection_rollup_hour', 'hour'))
+
+
+def upgrade() -> None:
+    for table, unit in ROLLUPS:
+        op.create_table(
+            table,
+            sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('camera_id', sa.Integer(), nullable=False),
+            sa.Column('model_type', sa.String(), nullable=False),
+            sa.Column('class_name', sa.String(), nullable=False),
+            sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('bucket', 'camera_id', 'model_type', 'class_name'),
+        )
+        # Bestand einmalig verdichten (danach schreibt der Event-Writer fort)
+        op.execute(f"""
+            INSERT INTO {table} (bucket, camera_id, model_type, class_name, count)
+            SELECT date_trunc('{unit}', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', COALESCE(camera_id, -1),
+                   COALESCE(model_type, ''), COALESCE(class_name, ''), count(*)
+            FROM detection_events
+            GROUP BY 1, 2, 3, 4
+        """)
+
+
+def downgrade() -> None:
+    for table, _ in reversed(ROLLUPS):
+        op.drop_table(table)
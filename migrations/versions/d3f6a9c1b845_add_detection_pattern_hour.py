@@ -0,0 +1,36 @@
+"""add detection_pattern_hour (local day x hour counts)
+
+Revision ID: d3f6a9c1b845
+Revises: b9e1d3a6c752
+Create Date: 2026-10-19 22:04:18.517230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f6a9c1b845'
+down_revision: Union[str, None] = 'b9e1d3a6c752'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Befüllt wird beim Start der App (services/patterns.py, abhängig von PATTERN_TIMEZONE)
+    op.create_table(
+        'detection_pattern_hour',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hour', sa.SmallInteger(), nullable=False),
+        sa.Column('camera_id', sa.Integer(), nullable=False),
+        sa.Column('model_type', sa.String(), nullable=False),
+        sa.Column('class_name', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'hour', 'camera_id', 'model_type', 'class_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('detection_pattern_hour')
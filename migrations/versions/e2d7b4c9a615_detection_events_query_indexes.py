@@ -0,0 +1,37 @@
+"""detection_events indexes matching the query shapes
+
+Revision ID: e2d7b4c9a615
+Revises: c5e8a1d4f290
+Create Date: 2026-10-19 15:48:19.205774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d7b4c9a615'
+down_revision: Union[str, None] = 'c5e8a1d4f290'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Auf der partitionierten Tabelle angelegt → Postgres legt sie pro Partition an
+    # (CONCURRENTLY geht auf dem Parent nicht). id als Tie-Breaker für Keyset-Pagination.
+    op.create_index('ix_detection_events_ts_id', 'detection_events', ['timestamp', 'id'])
+    op.create_index('ix_detection_events_camera_ts', 'detection_events', ['camera_id', 'timestamp', 'id'])
+    op.create_index('ix_detection_events_model_class_ts', 'detection_events',
+                    ['model_type', 'class_name', 'timestamp'])
+    # durch die zusammengesetzten Indizes abgedeckt (gleicher Präfix)
+    op.drop_index('ix_detection_events_camera_id', table_name='detection_events')
+    op.drop_index('ix_detection_events_model_type', table_name='detection_events')
+
+
+def downgrade() -> None:
+    op.create_index('ix_detection_events_model_type', 'detection_events', ['model_type'])
+    op.create_index('ix_detection_events_camera_id', 'detection_events', ['camera_id'])
+    op.drop_index('ix_detection_events_model_class_ts', table_name='detection_events')
+    op.drop_index('ix_detection_events_camera_ts', table_name='detection_events')
+    op.drop_index('ix_detection_events_ts_id', table_name='detection_events')
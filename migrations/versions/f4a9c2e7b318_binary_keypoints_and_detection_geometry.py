@@ -0,0 +1,61 @@
+"""binary keypoints in pose_frames, bbox/score/track_id on detection_events
+
+Revision ID: f4a9c2e7b318
+Revises: e2d7b4c9a615
+Create Date: 2026-10-19 17:05:41.318204
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from backend.services.keypoint_codec import encode_keypoints_batch, keypoints_to_dict
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2e7b318'
+down_revision: Union[str, None] = 'e2d7b4c9a615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 5000
+
+
+def _convert(convert, new_type) -> None:
+    """pose_frames.keypoints blockweise (Keyset über id) in eine neue Spalte umrechnen und tauschen."""
+    op.add_column('pose_frames', sa.Column('keypoints_new', new_type, nullable=True))
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT id, keypoints FROM pose_frames WHERE id > :last AND keypoints IS NOT NULL "
+            "ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": BATCH}).all()
+        if not rows:
+            break
+        values = convert([r.keypoints for r in rows])
+        conn.execute(sa.text("UPDATE pose_frames SET keypoints_new = :v WHERE id = :id"),
+                     [{"id": r.id, "v": v} for r, v in zip(rows, values)])
+        last_id = rows[-1].id
+    op.drop_column('pose_frames', 'keypoints')
+    op.alter_column('pose_frames', 'keypoints_new', new_column_name='keypoints')
+
+
+def upgrade() -> None:
+    # JSONB kommt über psycopg2 bereits als dict an
+    _convert(lambda kps: encode_keypoints_batch([json.loads(k) if isinstance(k, str) else k for k in kps]),
+             sa.LargeBinary())
+    # ADD COLUMN auf dem Parent gilt für alle Partitionen; ohne Default → kein Rewrite
+    op.add_column('detection_events', sa.Column('bbox', sa.LargeBinary(), nullable=True))
+    op.add_column('detection_events', sa.Column('score', sa.REAL(), nullable=True))
+    op.add_column('detection_events', sa.Column('track_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('detection_events', 'track_id')
+    op.drop_column('detection_events', 'score')
+    op.drop_column('detection_events', 'bbox')
+    _convert(lambda kps: [json.dumps(keypoints_to_dict(k)) for k in kps], postgresql.JSONB())